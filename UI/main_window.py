@@ -1,23 +1,47 @@
 ﻿import sys
 import os
-import shutil
-from PyQt6.QtCore import Qt, QSize, QTimer, QThreadPool
-from PyQt6.QtGui import QPixmap, QColor, QIcon, QKeyEvent, QFontMetrics
+import time
+from PyQt6.QtCore import Qt, QSize, QTimer, QThread, QThreadPool
+from PyQt6.QtGui import QPixmap, QColor, QIcon, QKeyEvent, QFont, QFontMetrics
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QGridLayout, QTreeWidget, QTreeWidgetItem, 
                              QPushButton, QLabel, QFileDialog, QMessageBox, 
                              QHeaderView, QLineEdit, QAbstractItemView, QCheckBox, 
-                             QFrame, QInputDialog, QTreeWidgetItemIterator, QDialog)
-
-from constants import (VERSION, COL_CAT, COL_CHECK, COL_PREVIEW, COL_NAME, COL_ACTION,
-                       COLUMN_PROPORTIONS, ROLE_REL_PATH, ROLE_ITEM_TYPE, ROLE_DEPTH,
-                       CONFIG_FILE, MAX_PREVIEW_SIZE)
-from config import ConfigManager
+                             QFrame, QInputDialog, QTreeWidgetItemIterator, QDialog,
+                             QComboBox, QProgressDialog, QApplication, QMenu)
+
+from constants import (VERSION, COL_CAT, COL_CHECK, COL_PREVIEW, COL_NAME, COL_ACTION, COL_TARGETS,
+                       COL_SIZE, COL_MODIFIED, OPTIONAL_COLUMNS, COLUMN_PROPORTIONS,
+                       ROLE_REL_PATH, ROLE_ITEM_TYPE, ROLE_DEPTH, ROLE_MOD_ID, ROLE_SORT_KEY, ROOT_FOLDER,
+                       CONFIG_FILE, JOURNAL_FILE, STALL_LOG_FILE, MAX_PREVIEW_SIZE,
+                       THUMB_BASE_SIZE, THUMB_TIERS, THUMB_FRAME_MS, THUMB_FRAME_BUDGET_MS, PREVIEW_COMPRESS_LEVEL,
+                       THUMB_IO_THREADS, THUMB_PRIORITY_VISIBLE, THUMB_PRIORITY_OFFSCREEN, THUMB_PRIORITIZE_DELAY_MS,
+                       PAK_INDEX_CACHE_FILE, ASSET_INDEX_FILE, DELETE_UNDO_SECONDS,
+                       HASH_CACHE_FILE)
+from config import ConfigManager, DEFAULT_TARGET
 from languages import I18nManager
-from UI.widgets import CustomDelegate, DropLabel
+from UI.widgets import CustomDelegate, DropLabel, ModTreeItem, ZoomStyle
+from UI.perf_panel import PerfPanel
+from UI.watchdog import StallWatchdog
 from UI.styles import STYLE_TEMPLATE, ICON_CLOSED_PATH, ICON_OPEN_PATH
-from core.mod_manager import ModManagerCore
-from core.workers import ImageLoadSignals, ImageLoadWorker
+from core.mod_manager import ModManagerCore, mod_key, format_size, set_deploy_links, dir_snapshots
+from core.profiles import enabled_mod_keys, plan_profile_switch, apply_profile_switch
+from core.journal import (BatchJournal, plan_batch_steps, run_journaled, resume_journal,
+                          discard_journal, pending_step_count)
+from core.workers import (ImageLoadSignals, ImageReadWorker, ThumbnailQueue, PreviewImportWorker,
+                          AssetScanSignals, AssetConflictWorker, MoveSignals, MoveWorker,
+                          DedupSignals, DedupScanWorker, MirrorSignals, MirrorWorker)
+from core.pak_index import PakIndexCache, conflicts_by_mod
+from core.asset_index import AssetSearchIndex
+from core.trash import TrashBin, TrashPurger
+from core.move import plan_moves
+from core.dedup import HashCache, apply_dedup
+from core.preview_import import collect_images, match_previews
+from core.mod_table import ModTable
+from core.image_decode import ProcessDecoder
+from core.memory import MemoryReport, process_rss, start_tracemalloc, top_allocations
+from core.profiling import startup_profiler
+from core.tracing import tracer
 
 
 class ModManager3(QMainWindow):
@@ -25,6 +49,7 @@ class ModManager3(QMainWindow):
         super().__init__()
         self.config = ConfigManager(CONFIG_FILE)
         self.config.load()
+        set_deploy_links(self.config.link_on_enable)
         
         self.repo_path = self.config.repo_path
         self.game_path = self.config.game_path
@@ -32,6 +57,7 @@ class ModManager3(QMainWindow):
         self.is_batch_op = False
         self.i18n = I18nManager(self.config.lang)
         self.known_mods = self.config.known_mods
+        self.migrate_folder_states()
 
         base_path = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.abspath(".")
         icon_path = os.path.join(base_path, "app.ico")
@@ -47,27 +73,112 @@ class ModManager3(QMainWindow):
             self.resize(ws[0], ws[1])
         else:
             self.resize(1200, 850)
-        self.qimage_cache, self.selected_mods = {}, set()
-        self.is_first_scan, self.all_mods_in_repo, self.is_all_selected = True, set(), False
+        self.qimage_cache = {}
+        # 模组以 ModTable 中的整数编号引用；repo_mod_ids 为当前仓库中的全部模组，selected_ids 为勾选的模组
+        self.mod_table = ModTable()
+        self.repo_mod_ids, self.selected_ids = set(), set()
+        self.is_first_scan, self.is_all_selected = True, False
         self.task_counter = 0
         self.thread_pool = QThreadPool()
+        # 缩略图的读取与解码各用一个线程池，读取慢时不占用解码线程；任务按可见 / 屏幕外分优先级
+        self.io_pool = QThreadPool(self)
+        self.io_pool.setMaxThreadCount(THUMB_IO_THREADS)
+        self.decode_pool = QThreadPool(self)
+        self.decode_pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))
+        # {tid: ImageReadWorker}，完成前保留，以便提升可见行任务的优先级
+        self.thumb_tasks = {}
+        # 重建树时未能取回 (已在执行) 的任务，保留引用直到结果显示，线程池仍持有它们时不能被回收
+        self.retired_thumb_tasks = {}
+        self.process_decoder = None
+        self.prioritize_timer = QTimer(self)
+        self.prioritize_timer.setSingleShot(True)
+        self.prioritize_timer.setInterval(THUMB_PRIORITIZE_DELAY_MS)
+        self.prioritize_timer.timeout.connect(self.prioritize_visible_thumbs)
         self.image_load_signals = ImageLoadSignals()
-        self.image_load_signals.image_loaded.connect(self.on_img_loaded)
+        # 缩略图结果由工作线程放入队列，按帧定时器在每帧预算内分批显示
+        self.thumb_queue = ThumbnailQueue()
+        self.thumb_frame_timer = QTimer(self)
+        self.thumb_frame_timer.setInterval(THUMB_FRAME_MS)
+        self.thumb_frame_timer.timeout.connect(self.apply_thumb_batch)
+        self.thumb_queue.ready.connect(self.on_thumbs_ready)
+        self.image_load_signals.preview_imported.connect(self.on_preview_imported)
+        self.pending_imports = {}
+        self.bulk_import = None
+
+        self.asset_scan_signals = AssetScanSignals()
+        self.asset_scan_signals.finished.connect(self.on_asset_conflicts)
+        self.pak_index_cache = None
+        self.asset_search_index = None
+        self.asset_scan_gen = 0
+        self.asset_scan_running = False
+        self.asset_scan_pending = False
+        self.name_conflict_groups = 0
+        self.asset_conflict_count = 0
+        # {模组标识: {冲突模组: [资源路径]}}，切换语言时据此重建提示文字
+        self.asset_clashes = {}
+
+        self.move_signals = None
+        self.dedup_signals = None
+        self.mirror_signals = None
+        self.trash_purger = TrashPurger()
+        self.pending_delete = None
+        self.undo_delete_timer = QTimer(self)
+        self.undo_delete_timer.setSingleShot(True)
+        self.undo_delete_timer.setInterval(DELETE_UNDO_SECONDS * 1000)
+        self.undo_delete_timer.timeout.connect(self.expire_undo_delete)
         self.preview_win = QWidget()
         self.preview_win.setWindowFlags(Qt.WindowType.ToolTip | Qt.WindowType.FramelessWindowHint)
         self.preview_win_lbl = QLabel(self.preview_win)
         self.item_map = {}
+        self.pending_initial_load = True
+        self.pending_images = 0
+        # 以 --trace 启动时，关闭性能面板不停止追踪
+        self.keep_tracing = tracer.enabled
+        self.watchdog = None
+        self.memory_log_timer = None
         
         self.mod_core = ModManagerCore(self.repo_path, self.game_path)
-        
+        self.batch_journal = BatchJournal(JOURNAL_FILE)
+
+        # 多次触发的列宽调整合并为一次
+        self.adjust_cols_timer = QTimer(self)
+        self.adjust_cols_timer.setSingleShot(True)
+        self.adjust_cols_timer.setInterval(10)
+        self.adjust_cols_timer.timeout.connect(self.adjust_cols)
+        startup_profiler.mark("window state")
+
+        # 勾选框与滚动条尺寸随缩放变化，由应用级代理样式提供，样式表中不含缩放相关的尺寸
+        self.zoom_style = ZoomStyle()
+        QApplication.setStyle(self.zoom_style)
         self.init_ui()
+        startup_profiler.mark("init_ui")
+        # 首次建树推迟到首帧绘制之后 (见 paintEvent)
+        self.applied_qss = None
         self.apply_zoom()
+        startup_profiler.mark("stylesheet")
+
+        if self.config.watchdog_ms > 0:
+            self.start_watchdog(self.config.watchdog_ms)
+        if self.config.decode_processes > 0:
+            self.start_process_decode(self.config.decode_processes)
+
+    def start_watchdog(self, threshold_ms):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        self.watchdog = StallWatchdog(threshold_ms, STALL_LOG_FILE, self)
+        self.watchdog.start()
+
+    def start_process_decode(self, processes=0):
+        # 屏幕外的缩略图改由子进程解码；processes 为 0 时使用 CPU 核心数 - 1
+        if self.process_decoder is not None:
+            self.process_decoder.shutdown()
+        self.process_decoder = ProcessDecoder(processes or None)
     def sync_selection_to_checkboxes(self):
         if self.is_batch_op:
             return
 
         self.is_batch_op = True
-        self.selected_mods.clear()
+        self.selected_ids.clear()
 
         it = QTreeWidgetItemIterator(self.tree)
         while it.value():
@@ -85,9 +196,7 @@ class ModManager3(QMainWindow):
                         cb.blockSignals(False)
 
                 if is_sel:
-                    rel = item.data(COL_CAT, ROLE_REL_PATH)
-                    pak = item.text(COL_NAME)
-                    self.selected_mods.add((rel, pak))
+                    self.selected_ids.add(item.data(COL_CAT, ROLE_MOD_ID))
             it += 1
 
         it = QTreeWidgetItemIterator(self.tree)
@@ -124,13 +233,27 @@ class ModManager3(QMainWindow):
         self.repo_open_btn.clicked.connect(lambda: self.open_folder_explorer(self.repo_path))
         self.game_btn = QPushButton(self.i18n.t("btn_set_game"))
         self.game_btn.clicked.connect(self.select_game)
+
+        # 部署目标：共用同一个仓库的多个游戏目录
+        self.target_combo = QComboBox()
+        self.target_combo.setToolTip(self.i18n.t("tip_target"))
+        self.target_combo.currentTextChanged.connect(self.switch_target)
+        self.btn_add_target = QPushButton(self.i18n.t("btn_add_target"))
+        self.btn_add_target.clicked.connect(self.add_target)
+        self.btn_remove_target = QPushButton(self.i18n.t("btn_remove_target"))
+        self.btn_remove_target.clicked.connect(self.remove_target)
+        game_path_layout = QHBoxLayout()
+        game_path_layout.addWidget(self.target_combo)
+        game_path_layout.addWidget(self.game_path_lbl, 1)
         self.repo_btn = QPushButton(self.i18n.t("btn_set_repo"))
         self.repo_btn.clicked.connect(self.select_repo)
 
         path_bar_layout.addWidget(self.game_title_lbl, 0, 0)
-        path_bar_layout.addWidget(self.game_path_lbl, 0, 1)
+        path_bar_layout.addLayout(game_path_layout, 0, 1)
         path_bar_layout.addWidget(self.game_open_btn, 0, 2)
         path_bar_layout.addWidget(self.game_btn, 0, 3)
+        path_bar_layout.addWidget(self.btn_add_target, 0, 4)
+        path_bar_layout.addWidget(self.btn_remove_target, 0, 5)
         
         path_bar_layout.addWidget(self.repo_title_lbl, 1, 0)
         path_bar_layout.addWidget(self.repo_path_lbl, 1, 1)
@@ -143,7 +266,17 @@ class ModManager3(QMainWindow):
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText(self.i18n.t("search_placeholder"))
         self.search_bar.textChanged.connect(self.filter_list)
-        layout.addWidget(self.search_bar)
+
+        # 资源搜索模式：按 pak 内的资源路径而不是文件名过滤
+        self.btn_search_assets = QPushButton(self.i18n.t("btn_search_assets"))
+        self.btn_search_assets.setCheckable(True)
+        self.btn_search_assets.setToolTip(self.i18n.t("tip_search_assets"))
+        self.btn_search_assets.toggled.connect(self.on_search_mode_changed)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_bar, 1)
+        search_layout.addWidget(self.btn_search_assets)
+        layout.addLayout(search_layout)
 
         batch_layout = QHBoxLayout()
         self.all_sel_btn = QPushButton(self.i18n.t("btn_select_all"))
@@ -167,6 +300,11 @@ class ModManager3(QMainWindow):
         self.btn_batch_del.clicked.connect(self.batch_delete_logic)
         batch_layout.addWidget(self.btn_batch_del)
         batch_layout.addStretch()
+
+        self.btn_undo_delete = QPushButton("")
+        self.btn_undo_delete.clicked.connect(self.undo_delete)
+        self.btn_undo_delete.hide()
+        batch_layout.addWidget(self.btn_undo_delete)
         
         self.conflict_label = QLabel("")
         self.conflict_label.setStyleSheet("color: #FF4444; font-weight: bold; margin-right: 10px;")
@@ -176,6 +314,18 @@ class ModManager3(QMainWindow):
         self.selection_label.setStyleSheet("color: #FFFFFF; font-weight: bold; margin-right: 10px;")
         batch_layout.addWidget(self.selection_label)
         
+        self.btn_import_previews = QPushButton(self.i18n.t("btn_import_previews"))
+        self.btn_import_previews.clicked.connect(self.import_previews_from_folder)
+        batch_layout.addWidget(self.btn_import_previews)
+
+        self.btn_dedup = QPushButton(self.i18n.t("btn_dedup"))
+        self.btn_dedup.clicked.connect(self.start_dedup_scan)
+        batch_layout.addWidget(self.btn_dedup)
+
+        self.btn_mirror = QPushButton(self.i18n.t("btn_mirror"))
+        self.btn_mirror.clicked.connect(self.start_mirror)
+        batch_layout.addWidget(self.btn_mirror)
+
         self.btn_new = QPushButton(self.i18n.t("btn_new_folder"))
         self.btn_new.clicked.connect(self.create_folder)
         self.btn_new.setStyleSheet("background-color: #2E5A2E;")
@@ -191,8 +341,35 @@ class ModManager3(QMainWindow):
         batch_layout.addWidget(self.btn_ref)
         layout.addLayout(batch_layout)
 
+        profile_layout = QHBoxLayout()
+        self.profile_lbl = QLabel(self.i18n.t("profile_label"))
+        profile_layout.addWidget(self.profile_lbl)
+
+        self.profile_combo = QComboBox()
+        self.profile_combo.setMinimumWidth(200)
+        profile_layout.addWidget(self.profile_combo)
+
+        self.btn_profile_switch = QPushButton(self.i18n.t("btn_profile_switch"))
+        self.btn_profile_switch.clicked.connect(self.switch_profile)
+        profile_layout.addWidget(self.btn_profile_switch)
+
+        self.btn_profile_save = QPushButton(self.i18n.t("btn_profile_save"))
+        self.btn_profile_save.clicked.connect(self.save_profile)
+        profile_layout.addWidget(self.btn_profile_save)
+
+        self.btn_profile_del = QPushButton(self.i18n.t("btn_profile_delete"))
+        self.btn_profile_del.clicked.connect(self.delete_profile)
+        profile_layout.addWidget(self.btn_profile_del)
+
+        self.profile_status_lbl = QLabel("")
+        self.profile_status_lbl.setStyleSheet("color: #AAA; margin-left: 10px;")
+        profile_layout.addWidget(self.profile_status_lbl)
+        profile_layout.addStretch()
+        layout.addLayout(profile_layout)
+        self.refresh_profile_combo()
+
         self.tree = QTreeWidget()
-        self.tree.setColumnCount(5)
+        self.tree.setColumnCount(8)
         self.update_tree_headers()
         self.tree.setRootIsDecorated(True)
         self.tree.setIndentation(20)
@@ -207,29 +384,87 @@ class ModManager3(QMainWindow):
 
         self.tree.itemExpanded.connect(self.update_single_folder_state)
         self.tree.itemCollapsed.connect(self.update_single_folder_state)
-
-        self.tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.tree.header().setSectionsMovable(False)
-        self.tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        self.tree.setSortingEnabled(False)
-        self.tree.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
-        self.tree.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
-        self.tree.header().setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.tree)
+        # 滚动 / 展开后可见行变化，合并触发一次缩略图优先级调整
+        self.tree.itemExpanded.connect(self.prioritize_timer.start)
+        self.tree.verticalScrollBar().valueChanged.connect(self.prioritize_timer.start)
+
+        self.tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tree.header().setSectionsMovable(False)
+        self.tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        # 点击表头按该列的 ROLE_SORT_KEY 在模型内排序；默认按分类列升序，即扫描时的逻辑顺序。
+        # 不使用 setSortingEnabled()：排序由 sort_rows() 先为每行准备排序元组再交给模型，比较时不回调表头
+        header = self.tree.header()
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(COL_CAT, Qt.SortOrder.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.sort_rows)
+        self.tree.header().setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.header().customContextMenuRequested.connect(self.show_header_menu)
+        self.apply_optional_columns()
+        self.tree.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.tree.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.tree.header().setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.tree)
+        self.refresh_target_combo()
+
+        self.perf_panel = PerfPanel(self.i18n)
+        self.perf_panel.hide()
+        layout.addWidget(self.perf_panel)
 
     def update_single_folder_state(self, item):
         item_type = item.data(COL_CAT, ROLE_ITEM_TYPE)
         if item_type == "folder":
             rel_path = item.data(COL_CAT, ROLE_REL_PATH)
-            if rel_path:
+            if rel_path is not None:
                 self.folder_states[rel_path] = item.isExpanded()
 
     def update_tree_headers(self):
         self.tree.setHeaderLabels([
             self.i18n.t("header_folder"), "", self.i18n.t("header_preview"), 
-            self.i18n.t("header_name"), self.i18n.t("header_action")
+            self.i18n.t("header_name"), self.i18n.t("header_action"), self.i18n.t("header_targets"),
+            self.i18n.t("header_size"), self.i18n.t("header_modified")
         ])
 
+    def apply_optional_columns(self):
+        for name, col in OPTIONAL_COLUMNS.items():
+            self.tree.setColumnHidden(col, name not in self.config.optional_columns)
+
+    def show_header_menu(self, pos):
+        menu = QMenu(self)
+        for name, col in OPTIONAL_COLUMNS.items():
+            action = menu.addAction(self.i18n.t(f"header_{name}"))
+            action.setCheckable(True)
+            action.setChecked(not self.tree.isColumnHidden(col))
+            action.toggled.connect(lambda on, n=name: self.toggle_optional_column(n, on))
+        menu.exec(self.tree.header().mapToGlobal(pos))
+
+    def toggle_optional_column(self, name, on):
+        columns = [c for c in self.config.optional_columns if c != name]
+        if on:
+            columns.append(name)
+        self.config.optional_columns = columns
+        self.apply_optional_columns()
+        self.save_cfg()
+        self.adjust_cols_timer.start()
+
+    def sort_rows(self, col=None, order=None):
+        header = self.tree.header()
+        if col is None:
+            col, order = header.sortIndicatorSection(), header.sortIndicatorOrder()
+        descending = order == Qt.SortOrder.DescendingOrder
+        with tracer.span("ui.sort_rows"):
+            iterator = QTreeWidgetItemIterator(self.tree)
+            while iterator.value():
+                iterator.value().prepare_sort(col, descending)
+                iterator += 1
+            self.tree.model().sort(col, order)
+
+    def set_sort_key(self, item, col, value):
+        # 排序键变化不是用户编辑，不触发 itemChanged
+        blocked = self.tree.blockSignals(True)
+        item.setData(col, ROLE_SORT_KEY, value)
+        self.tree.blockSignals(blocked)
+
     def _dialog_window_flags(self):
         return (
             Qt.WindowType.Dialog
@@ -264,21 +499,70 @@ class ModManager3(QMainWindow):
         self.repo_open_btn.setText(self.i18n.t("btn_open"))
         self.game_btn.setText(self.i18n.t("btn_set_game"))
         self.repo_btn.setText(self.i18n.t("btn_set_repo"))
-        self.search_bar.setPlaceholderText(self.i18n.t("search_placeholder"))
+        self.target_combo.setToolTip(self.i18n.t("tip_target"))
+        self.btn_add_target.setText(self.i18n.t("btn_add_target"))
+        self.btn_remove_target.setText(self.i18n.t("btn_remove_target"))
+        self.btn_search_assets.setText(self.i18n.t("btn_search_assets"))
+        self.btn_search_assets.setToolTip(self.i18n.t("tip_search_assets"))
+        self.search_bar.setPlaceholderText(self.i18n.t(
+            "search_assets_placeholder" if self.btn_search_assets.isChecked() else "search_placeholder"))
         self.all_sel_btn.setText(self.i18n.t("btn_select_all" if not self.is_all_selected else "btn_deselect_all"))
         self.btn_batch_en.setText(self.i18n.t("btn_batch_enable"))
         self.btn_batch_dis.setText(self.i18n.t("btn_batch_disable"))
         self.btn_batch_move.setText(self.i18n.t("btn_batch_move"))
         self.btn_batch_del.setText(self.i18n.t("btn_delete"))
         self.btn_new.setText(self.i18n.t("btn_new_folder"))
+        self.btn_import_previews.setText(self.i18n.t("btn_import_previews"))
+        self.btn_dedup.setText(self.i18n.t("btn_dedup"))
+        self.btn_mirror.setText(self.i18n.t("btn_mirror"))
+        if self.pending_delete:
+            self.btn_undo_delete.setText(self.i18n.t("btn_undo_delete", len(self.pending_delete["batch"].entries)))
         self.btn_ref.setText(self.i18n.t("btn_refresh"))
         self.lang_btn.setText(self.i18n.t("btn_lang_toggle"))
+        self.profile_lbl.setText(self.i18n.t("profile_label"))
+        self.perf_panel.retranslate()
+        self.btn_profile_switch.setText(self.i18n.t("btn_profile_switch"))
+        self.btn_profile_save.setText(self.i18n.t("btn_profile_save"))
+        self.btn_profile_del.setText(self.i18n.t("btn_profile_delete"))
         
         self.update_tree_headers()
         self.apply_zoom()
-        self.refresh_data()
+        self.retranslate_tree()
+        self.update_conflict_label()
         self.sync_all_sel_state()
 
+    def retranslate_tree(self):
+        # 行数据以分类路径与模组编号标识，与语言无关；切换语言只更新显示文字，不重建树
+        uncat_display = f"📂 {self.i18n.t('cat_uncategorized')}"
+        self.tree.blockSignals(True)
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            item = iterator.value()
+            item_type = item.data(COL_CAT, ROLE_ITEM_TYPE)
+            if item_type == "folder" and item.data(COL_CAT, ROLE_REL_PATH) == ROOT_FOLDER:
+                item.setText(COL_CAT, uncat_display)
+                item.setData(COL_CAT, Qt.ItemDataRole.UserRole, uncat_display)
+            elif item_type == "file":
+                w = self.tree.itemWidget(item, COL_ACTION)
+                btn = w.findChild(QPushButton) if w else None
+                if btn:
+                    btn.setText(self.i18n.t("mod_enabled" if btn.property("modState") == "enabled" else "mod_disabled"))
+                clashes = self.asset_clashes.get(self.mod_table.get(item.data(COL_CAT, ROLE_MOD_ID)).key)
+                if clashes:
+                    item.setToolTip(COL_NAME, self.format_asset_clashes(clashes))
+            iterator += 1
+        self.tree.blockSignals(False)
+
+    def migrate_folder_states(self):
+        # 旧版配置以翻译后的“未分类”名称记录根目录的展开状态；仓库中没有同名文件夹时迁移为 ROOT_FOLDER
+        for name in self.i18n.all_translations("cat_uncategorized"):
+            if name not in self.folder_states:
+                continue
+            if self.repo_path and os.path.isdir(os.path.join(self.repo_path, name)):
+                continue
+            expanded = self.folder_states.pop(name)
+            self.folder_states.setdefault(ROOT_FOLDER, expanded)
+
     def open_folder_explorer(self, path):
         if not path or not os.path.exists(path):
             return
@@ -289,11 +573,11 @@ class ModManager3(QMainWindow):
             subprocess.Popen(['open' if sys.platform == 'darwin' else 'xdg-open', path])
 
     def manual_refresh_action(self):
-        for r, p in self.all_mods_in_repo:
+        for r, p in self.mod_table.pairs(self.repo_mod_ids):
             self.known_mods.add(p)
         self.save_cfg()
         
-        self.selected_mods.clear()
+        self.selected_ids.clear()
         self.is_all_selected = False
         self.refresh_data()
 
@@ -306,8 +590,104 @@ class ModManager3(QMainWindow):
             elif event.key() == Qt.Key.Key_0:
                 self.zoom_level = 1.0
                 self.apply_zoom()
+        elif event.modifiers() == (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier):
+            if event.key() == Qt.Key.Key_P:
+                self.toggle_perf_panel()
+            elif event.key() == Qt.Key.Key_M:
+                self.show_memory_report()
         super().keyPressEvent(event)
 
+    # ---------- 内存报告 ----------
+    @tracer.traced("ui.memory_report")
+    def collect_memory_report(self, top=10):
+        report = MemoryReport()
+        report.add("process", "rss", process_rss())
+
+        report.add("images", "qimage_cache",
+                   sum(img.sizeInBytes() for img in self.qimage_cache.values()), len(self.qimage_cache))
+        report.add("images", "thumb_queue", None, len(self.thumb_queue))
+        report.add("images", "thumb_tasks", None, len(self.thumb_tasks) + len(self.retired_thumb_tasks))
+        thumb_bytes = pix_bytes = labels = 0
+        tree_items = 0
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            item = iterator.value()
+            tree_items += 1
+            w = self.tree.itemWidget(item, COL_PREVIEW)
+            lbl = w.findChild(DropLabel) if w else None
+            if lbl:
+                labels += 1
+                if lbl.thumb_image is not None:
+                    thumb_bytes += lbl.thumb_image.sizeInBytes()
+                pix = lbl.pixmap()
+                if pix is not None and not pix.isNull():
+                    pix_bytes += pix.width() * pix.height() * pix.depth() // 8
+            iterator += 1
+        report.add("images", "thumbnail_tiers", thumb_bytes, labels)
+        report.add("images", "label_pixmaps", pix_bytes, labels)
+
+        report.add("widgets", "live_widgets", None, len(QApplication.allWidgets()))
+        report.add("widgets", "tree_items", None, tree_items)
+        report.add_container("widgets", "item_map", self.item_map)
+        report.add_container("widgets", "pending_imports", self.pending_imports)
+
+        report.add("mods", "mod_table", self.mod_table.memory_bytes(), len(self.mod_table))
+        report.add_container("mods", "repo_mod_ids", self.repo_mod_ids)
+        report.add_container("mods", "selected_ids", self.selected_ids)
+        report.add_container("mods", "known_mods", self.known_mods)
+        report.add_container("mods", "folder_states", self.folder_states)
+
+        if self.pak_index_cache is not None:
+            report.add_container("indexes", "pak_index_cache", self.pak_index_cache.entries)
+        if self.asset_search_index is not None:
+            report.add_rows("indexes", self.asset_search_index.memory_stats())
+        report.add_rows("indexes", dir_snapshots.memory_stats())
+
+        report.allocations = top_allocations(top)
+        report.publish()
+        return report
+
+    def memory_label(self, key):
+        # 报告中的类别与名称为固定标识，显示时按界面语言翻译；没有对应文字的标识原样显示
+        text = self.i18n.t(f"mem_{key}")
+        return key if text == f"mem_{key}" else text
+
+    def show_memory_report(self):
+        # 首次打开时开始 tracemalloc，之后的报告才有分配位置统计
+        start_tracemalloc()
+        report = self.collect_memory_report()
+        text = report.format(self.memory_label)
+        print(text)
+
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Information)
+        box.setText(self.i18n.t(
+            "msg_memory_summary",
+            format_size(report.section_bytes("process")),
+            format_size(report.section_bytes("images")),
+            format_size(report.section_bytes("indexes")),
+        ))
+        box.setDetailedText(text)
+        self._apply_dialog_chrome(box, self.i18n.t("dialog_memory_title"))
+        box.exec()
+
+    def start_memory_log(self, interval_s):
+        # 调试用：定期把内存报告打印到日志
+        start_tracemalloc()
+        if self.memory_log_timer is None:
+            self.memory_log_timer = QTimer(self)
+            self.memory_log_timer.timeout.connect(
+                lambda: print(self.collect_memory_report().format(self.memory_label)))
+        self.memory_log_timer.start(int(interval_s * 1000))
+
+    def toggle_perf_panel(self):
+        show = not self.perf_panel.isVisible()
+        if show:
+            tracer.enable()
+        elif not self.keep_tracing:
+            tracer.disable()
+        self.perf_panel.setVisible(show)
+
     def change_zoom(self, delta):
         new_zoom = self.zoom_level + delta
         if 0.5 <= new_zoom <= 2.5:
@@ -315,38 +695,24 @@ class ModManager3(QMainWindow):
             self.apply_zoom()
 
     def apply_zoom(self):
-        f = int(self.base_font_size * self.zoom_level)
-        padding = int(2 * self.zoom_level)
-        item_h = int(68 * self.zoom_level)
-        btn_v_p = int(6 * self.zoom_level)
-        btn_h_p = int(12 * self.zoom_level)
-        small_f = int(13 * self.zoom_level)
-        scroll_w = int(12 * self.zoom_level)
-        scroll_r = int(6 * self.zoom_level)
-
-        check_s = int(20 * self.zoom_level)
-        branch_s = int(20 * self.zoom_level)
-
-
+        # 样式表与缩放无关，只在首次调用时设置；缩放只更新字体与尺寸，不重新 polish 整个窗口
         try:
-            new_qss = STYLE_TEMPLATE.format(
-                font_size=f, 
-                padding=padding, 
-                item_height=item_h,
-                btn_v_padding=btn_v_p, 
-                btn_h_padding=btn_h_p,
-                check_size=check_s,
-                branch_size=branch_s,
-                small_font=small_f,
-                scroll_width=scroll_w, 
-                scroll_radius=scroll_r,
-                branch_closed=ICON_CLOSED_PATH, 
-                branch_open=ICON_OPEN_PATH
-            )
-            self.setStyleSheet(new_qss)
+            new_qss = STYLE_TEMPLATE.format(branch_closed=ICON_CLOSED_PATH, branch_open=ICON_OPEN_PATH)
+            if new_qss != self.applied_qss:
+                self.setStyleSheet(new_qss)
+                self.applied_qss = new_qss
         except KeyError as e:
             print(self.i18n.t("log_style_format_failed", e))
 
+        self.zoom_style.zoom = self.zoom_level
+        font = QFont(self.font())
+        font.setPixelSize(int(self.base_font_size * self.zoom_level))
+        self.setFont(font)
+        small_font = QFont(font)
+        small_font.setPixelSize(int(13 * self.zoom_level))
+        for lbl in (self.game_title_lbl, self.repo_title_lbl, self.game_path_lbl, self.repo_path_lbl):
+            lbl.setFont(small_font)
+
         base_title_w = 150 if self.i18n.current_lang == "en" else 115
         self.game_title_lbl.setFixedWidth(int(base_title_w * self.zoom_level))
         self.repo_title_lbl.setFixedWidth(int(base_title_w * self.zoom_level))
@@ -356,7 +722,126 @@ class ModManager3(QMainWindow):
             btn.setMinimumWidth(min_btn_w)
             btn.setMaximumWidth(250)
 
-        self.refresh_data()
+        self.relayout_rows()
+
+    def thumb_size(self):
+        return int(THUMB_BASE_SIZE * self.zoom_level)
+
+    def thumb_tier(self, size):
+        for tier in THUMB_TIERS:
+            if tier >= size:
+                return tier
+        return THUMB_TIERS[-1]
+
+    def relayout_rows(self):
+        # 缩放只调整现有行的尺寸，不重建树、不重新解码图片
+        row_h = int(68 * self.zoom_level)
+        thumb_s = self.thumb_size()
+        btn_w = int(100 * self.zoom_level)
+
+        self.tree.setUpdatesEnabled(False)
+        font = QFont(self.tree.font())
+        font.setPixelSize(int(self.base_font_size * self.zoom_level))
+        self.tree.setFont(font)
+        self.tree.setIndentation(int(20 * self.zoom_level))
+        # 滚动条宽度来自 ZoomStyle，缩放后重新布局
+        self.tree.verticalScrollBar().updateGeometry()
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            item = iterator.value()
+            if item.data(COL_CAT, ROLE_ITEM_TYPE) == "folder":
+                item.setSizeHint(0, QSize(0, row_h))
+
+            for col in (COL_CHECK, COL_PREVIEW, COL_ACTION):
+                w = self.tree.itemWidget(item, col)
+                if w:
+                    w.setFixedHeight(row_h)
+
+            w = self.tree.itemWidget(item, COL_PREVIEW)
+            lbl = w.findChild(DropLabel) if w else None
+            if lbl:
+                lbl.setFixedSize(thumb_s, thumb_s)
+                self._rescale_thumb(lbl, thumb_s)
+
+            w = self.tree.itemWidget(item, COL_ACTION)
+            btn = w.findChild(QPushButton) if w else None
+            if btn:
+                btn.setMinimumWidth(btn_w)
+            iterator += 1
+
+        self.tree.doItemsLayout()
+        self.tree.setUpdatesEnabled(True)
+        self.adjust_cols_timer.start()
+        self.prioritize_timer.start()
+
+    def _rescale_thumb(self, lbl, size):
+        if lbl.thumb_image is None:
+            return
+        tier = self.thumb_tier(size)
+        if tier > lbl.thumb_tier:
+            full = self.qimage_cache.get(lbl.pak_name.replace(".pak", ""))
+            if full is not None and not full.isNull():
+                lbl.set_thumb(full.scaled(tier, tier, Qt.AspectRatioMode.KeepAspectRatio,
+                                          Qt.TransformationMode.SmoothTransformation), tier)
+            else:
+                self._request_thumb(lbl, tier)
+        lbl.show_thumb(size)
+
+    def _request_thumb(self, lbl, tier, priority=THUMB_PRIORITY_OFFSCREEN):
+        self.task_counter += 1
+        tid = str(self.task_counter)
+        self.item_map[tid] = lbl
+        lbl.requested_tier = tier
+        lbl.pending_tid = tid
+        img_path = os.path.join(self.repo_path, lbl.rel_dir, lbl.pak_name.replace(".pak", ".png"))
+        # 只有屏幕外的任务交给子进程解码；可见行在线程中解码，省去进程间传输的延迟
+        decoder = self.process_decoder if priority < THUMB_PRIORITY_VISIBLE else None
+        task = ImageReadWorker(img_path, lbl.pak_name.replace(".pak", ""), tid, self.thumb_queue,
+                               self.decode_pool, tier, self.thumb_size(), priority, decoder)
+        self.thumb_tasks[tid] = task
+        self.io_pool.start(task, priority)
+        self.pending_images += 1
+        tracer.gauge("image_queue_depth", self.pending_images)
+
+    def visible_preview_labels(self):
+        labels = []
+        bottom = self.tree.viewport().height()
+        item = self.tree.itemAt(0, 0)
+        while item is not None and self.tree.visualItemRect(item).top() < bottom:
+            w = self.tree.itemWidget(item, COL_PREVIEW)
+            lbl = w.findChild(DropLabel) if w else None
+            if lbl:
+                labels.append(lbl)
+            item = self.tree.itemBelow(item)
+        return labels
+
+    def prioritize_visible_thumbs(self):
+        # 可见行尚未开始的读取 / 解码任务从线程池取回，以较高优先级重新提交；已在执行的任务不受影响
+        promoted = 0
+        for lbl in self.visible_preview_labels():
+            task = self.thumb_tasks.get(lbl.pending_tid)
+            if task is None or task.priority >= THUMB_PRIORITY_VISIBLE:
+                continue
+            task.priority = THUMB_PRIORITY_VISIBLE
+            task.process_decoder = None
+            if self.io_pool.tryTake(task):
+                self.io_pool.start(task, THUMB_PRIORITY_VISIBLE)
+                promoted += 1
+            elif task.decode_task is not None and self.decode_pool.tryTake(task.decode_task):
+                self.decode_pool.start(task.decode_task, THUMB_PRIORITY_VISIBLE)
+                promoted += 1
+        tracer.count("thumbs_prioritized", promoted)
+
+    def cancel_thumb_tasks(self):
+        # 重建树前丢弃尚未开始读取 / 解码的任务，旧行的缩略图不再需要
+        for tid, task in self.thumb_tasks.items():
+            if self.io_pool.tryTake(task) or (
+                    task.decode_task is not None and self.decode_pool.tryTake(task.decode_task)):
+                self.pending_images -= 1
+            else:
+                self.retired_thumb_tasks[tid] = task
+        self.thumb_tasks.clear()
+        tracer.gauge("image_queue_depth", self.pending_images)
 
     def wrap_center(self, widget, height=None):
         if height is None:
@@ -371,12 +856,16 @@ class ModManager3(QMainWindow):
         return c
 
     def get_pak_counts(self):
-        counts = {}
-        if not self.all_mods_in_repo:
-            return counts
-        for rel_path, pak_name in self.all_mods_in_repo:
-            counts[pak_name] = counts.get(pak_name, 0) + 1
-        return counts
+        return self.mod_table.name_counts()
+
+    def folder_mod_ids(self, rel_path):
+        # 分类下的模组编号；根目录只包含直接位于其中的模组
+        if rel_path == ROOT_FOLDER:
+            return self.mod_table.in_folder("", recursive=False)
+        return self.mod_table.in_folder(rel_path)
+
+    def selected_pairs(self):
+        return self.mod_table.pairs(self.selected_ids)
     
     def get_item_checkbox(self, item):
         w = self.tree.itemWidget(item, COL_CHECK)
@@ -405,13 +894,12 @@ class ModManager3(QMainWindow):
             parent_cb.blockSignals(False)
             
 
+    @tracer.traced("ui.refresh_data")
     def refresh_data(self):
         self.mod_core = ModManagerCore(self.repo_path, self.game_path)
         
         scroll_pos = self.tree.verticalScrollBar().value()
-        not_set_html = f'<span style="color: #FF4444;">{self.i18n.t("not_set")}</span>'
-        self.game_path_lbl.setText(f"{self.game_path if self.game_path else not_set_html}")
-        self.repo_path_lbl.setText(f"{self.repo_path if self.repo_path else not_set_html}")
+        self.update_path_labels()
 
         if not self.repo_path or not self.game_path:
             return
@@ -419,9 +907,11 @@ class ModManager3(QMainWindow):
         self.qimage_cache.clear()
         
         self.tree.blockSignals(True)
+        # 建树期间逐行插入不触发排序；结束时按当前排序列整体排序一次
         self.tree.clear()
+        self.cancel_thumb_tasks()
         self.item_map.clear()
-        self.all_mods_in_repo.clear()
+        live_ids = set()
         
         game_files = self.mod_core.get_game_files()
         uncat_key = self.i18n.t("cat_uncategorized")
@@ -431,25 +921,28 @@ class ModManager3(QMainWindow):
         root_paks, root_dirs = self.mod_core.scan_repository()
 
         if root_paks:
-            uncat_item = QTreeWidgetItem(self.tree)
+            uncat_item = ModTreeItem(self.tree)
+            uncat_item.setData(COL_CAT, ROLE_SORT_KEY, -1)
             uncat_display = f"📂 {uncat_key}"
             uncat_item.setText(COL_CAT, uncat_display)
             uncat_item.setData(COL_CAT, Qt.ItemDataRole.UserRole, uncat_display)
             uncat_item.setData(COL_CAT, ROLE_ITEM_TYPE, "folder")
-            uncat_item.setData(COL_CAT, ROLE_REL_PATH, uncat_key)
+            uncat_item.setData(COL_CAT, ROLE_REL_PATH, ROOT_FOLDER)
             uncat_item.setData(COL_CAT, ROLE_DEPTH, 0)
             
             uncat_item.setFlags(uncat_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            uncat_item.setExpanded(self.folder_states.get(uncat_key, True))
+            uncat_item.setExpanded(self.folder_states.get(ROOT_FOLDER, True))
             
-            self._add_folder_checkbox(uncat_item, row_h, uncat_key)
+            self._add_folder_checkbox(uncat_item, row_h, ROOT_FOLDER)
 
             for pak in root_paks:
-                self.all_mods_in_repo.add((uncat_key, pak))
-                self._add_pak_item(uncat_item, pak, uncat_key, game_files, row_h)
+                mod_id = self.mod_table.add("", pak)
+                live_ids.add(mod_id)
+                self._add_pak_item(uncat_item, mod_id, game_files, row_h)
 
-        for dir_name in root_dirs:
-            cat_item = QTreeWidgetItem(self.tree)
+        for order, dir_name in enumerate(root_dirs):
+            cat_item = ModTreeItem(self.tree)
+            cat_item.setData(COL_CAT, ROLE_SORT_KEY, order)
             cat_display = f"📂 {dir_name}"
             cat_item.setText(COL_CAT, cat_display)
             cat_item.setData(COL_CAT, Qt.ItemDataRole.UserRole, cat_display)
@@ -466,12 +959,14 @@ class ModManager3(QMainWindow):
             sub_paks, sub_dirs = self.mod_core.scan_directory(full_path)
                 
             for pak in sub_paks:
-                self.all_mods_in_repo.add((dir_name, pak))
-                self._add_pak_item(cat_item, pak, dir_name, game_files, row_h)
+                mod_id = self.mod_table.add(dir_name, pak)
+                live_ids.add(mod_id)
+                self._add_pak_item(cat_item, mod_id, game_files, row_h)
             
-            for sub_dir in sub_dirs:
+            for sub_order, sub_dir in enumerate(sub_dirs):
                 sub_rel_path = os.path.join(dir_name, sub_dir)
-                sub_item = QTreeWidgetItem(cat_item)
+                sub_item = ModTreeItem(cat_item)
+                sub_item.setData(COL_CAT, ROLE_SORT_KEY, sub_order)
                 sub_display = f"📂 {sub_dir}"
                 sub_item.setText(COL_CAT, sub_display)
                 sub_item.setData(COL_CAT, Qt.ItemDataRole.UserRole, sub_display)
@@ -487,25 +982,47 @@ class ModManager3(QMainWindow):
                 sub_full_path = os.path.join(self.repo_path, sub_rel_path)
                 sub_paks2, _ = self.mod_core.scan_directory(sub_full_path)
                 for f in sub_paks2:
-                    self.all_mods_in_repo.add((sub_rel_path, f))
-                    self._add_pak_item(sub_item, f, sub_rel_path, game_files, row_h)
+                    mod_id = self.mod_table.add(sub_rel_path, f)
+                    live_ids.add(mod_id)
+                    self._add_pak_item(sub_item, mod_id, game_files, row_h)
+
+        # 消失的模组移出模组表；勾选状态只保留仍然存在的编号
+        remap = self.mod_table.retain(live_ids)
+        self.selected_ids &= live_ids
+        if remap is not None:
+            # 模组表已压缩，行数据与勾选状态改用新编号
+            live_ids = set(remap.values())
+            self.selected_ids = {remap[i] for i in self.selected_ids}
+            iterator = QTreeWidgetItemIterator(self.tree)
+            while iterator.value():
+                item = iterator.value()
+                mod_id = item.data(COL_CAT, ROLE_MOD_ID)
+                if mod_id is not None:
+                    item.setData(COL_CAT, ROLE_MOD_ID, remap[mod_id])
+                iterator += 1
+        self.repo_mod_ids = live_ids
 
         if self.is_first_scan:
-            if not self.known_mods and self.all_mods_in_repo:
-                 for r, p in self.all_mods_in_repo:
+            if not self.known_mods and self.repo_mod_ids:
+                 for r, p in self.mod_table.pairs(self.repo_mod_ids):
                      self.known_mods.add(p)
                  self.save_cfg()
             self.is_first_scan = False
 
         counts = self.get_pak_counts()
-        conflict_groups = sum(1 for pak_name in counts if counts[pak_name] > 1)
-        self.conflict_label.setText(self.i18n.t("conflict_warn", conflict_groups) if conflict_groups > 0 else "")
+        self.name_conflict_groups = sum(1 for pak_name in counts if counts[pak_name] > 1)
+        self.asset_conflict_count = 0
+        self.asset_clashes = {}
+        self.update_conflict_label()
+        other_targets = self.other_target_files()
         
         iterator = QTreeWidgetItemIterator(self.tree)
         while iterator.value():
             item = iterator.value()
             if item.data(COL_CAT, ROLE_ITEM_TYPE) == "file":
                 pak = item.text(COL_NAME)
+                if other_targets:
+                    item.setText(COL_TARGETS, self.format_target_states(pak, other_targets))
                 if counts.get(pak, 0) > 1:
                     item.setForeground(COL_NAME, QColor("#FF4444"))
                 elif pak not in self.known_mods:
@@ -514,64 +1031,246 @@ class ModManager3(QMainWindow):
                     item.setForeground(COL_NAME, QColor("#EEEEEE"))
             iterator += 1
 
+        self.sort_rows()
         self.tree.blockSignals(False)
+        tracer.count("rows_built", len(self.repo_mod_ids))
         self.sync_all_sel_state()
-        QTimer.singleShot(0, self.adjust_cols)
+        self.adjust_cols_timer.start()
         QTimer.singleShot(10, lambda: self.tree.verticalScrollBar().setValue(scroll_pos))
+        # 恢复滚动位置后按实际可见行调整优先级 (滚动位置未变时不会触发 valueChanged)
+        self.prioritize_timer.start()
+        self.start_asset_scan()
+
+    def update_path_labels(self):
+        not_set_html = f'<span style="color: #FF4444;">{self.i18n.t("not_set")}</span>'
+        self.game_path_lbl.setText(f"{self.game_path if self.game_path else not_set_html}")
+        self.repo_path_lbl.setText(f"{self.repo_path if self.repo_path else not_set_html}")
+
+    # ---------- 部署目标 ----------
+    def refresh_target_combo(self):
+        self.target_combo.blockSignals(True)
+        self.target_combo.clear()
+        self.target_combo.addItems(list(self.config.targets))
+        self.target_combo.setCurrentText(self.config.active_target)
+        self.target_combo.blockSignals(False)
+        self.target_combo.setVisible(bool(self.config.targets))
+        self.btn_remove_target.setEnabled(bool(self.config.targets))
+        self.tree.setColumnHidden(COL_TARGETS, len(self.config.targets) < 2)
+
+    def other_target_files(self):
+        return [
+            (name, self.mod_core.get_target_files(path))
+            for name, path in self.config.targets.items()
+            if name != self.config.active_target
+        ]
+
+    def format_target_states(self, pak, other_targets):
+        return ", ".join(name for name, files in other_targets if pak in files)
+
+    def switch_target(self, name):
+        if name == self.config.active_target or not self.config.use_target(name):
+            return
+        self.game_path = self.config.game_path
+        self.save_cfg()
+        self.apply_target_states()
+
+    def add_target(self):
+        name_dialog = QInputDialog(self)
+        name_dialog.setLabelText(self.i18n.t("dialog_target_label"))
+        self._apply_dialog_chrome(name_dialog, self.i18n.t("dialog_target_title"))
+        if name_dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        name = name_dialog.textValue().strip()
+        if not name:
+            return
+        p = QFileDialog.getExistingDirectory(self, self.i18n.t("btn_set_game"))
+        if not p:
+            return
+        self.config.set_target(name, p)
+        self.config.use_target(name)
+        self.game_path = self.config.game_path
+        self.save_cfg()
+        self.refresh_target_combo()
+        self.apply_target_states()
+
+    def remove_target(self):
+        # 只从配置中移除，目标目录中已部署的文件保持不变
+        name = self.target_combo.currentText()
+        if not name:
+            return
+        self.config.remove_target(name)
+        self.game_path = self.config.game_path
+        self.save_cfg()
+        self.refresh_target_combo()
+        self.apply_target_states()
+
+    @tracer.traced("ui.apply_target_states")
+    def apply_target_states(self):
+        # 切换目标不重新扫描仓库：已建好的行按各目标目录快照更新启用状态
+        self.mod_core.game_path = self.game_path
+        self.update_path_labels()
+        if not self.repo_path or not self.game_path:
+            return
+        if not self.repo_mod_ids:
+            self.refresh_data()
+            return
+
+        game_files = self.mod_core.get_target_files(self.game_path)
+        other_targets = self.other_target_files()
+
+        self.tree.blockSignals(True)
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            item = iterator.value()
+            if item.data(COL_CAT, ROLE_ITEM_TYPE) == "file":
+                rec = self.mod_table.get(item.data(COL_CAT, ROLE_MOD_ID))
+                pak = rec.pak
+                w = self.tree.itemWidget(item, COL_ACTION)
+                btn = w.findChild(QPushButton) if w else None
+                if btn:
+                    src = os.path.join(self.repo_path, rec.rel, pak)
+                    self.set_mod_button(btn, src, pak, pak in game_files)
+                item.setText(COL_TARGETS, self.format_target_states(pak, other_targets))
+            iterator += 1
+        self.tree.blockSignals(False)
+        self.adjust_cols_timer.start()
+
+    def set_mod_button(self, btn_widget, src, pak, is_en):
+        btn_widget.setText(self.i18n.t("mod_enabled" if is_en else "mod_disabled"))
+        self.set_style_property(btn_widget, "modState", "enabled" if is_en else "disabled")
+        item = getattr(btn_widget, "tree_item", None)
+        if item is not None:
+            self.set_sort_key(item, COL_ACTION, int(is_en))
+        try:
+            btn_widget.clicked.disconnect()
+        except TypeError:
+            pass
+        btn_widget.clicked.connect(lambda chk=False, s=src, p=pak, en=is_en, b=btn_widget: self.toggle_mod(s, p, en, b))
+
+    def update_conflict_label(self):
+        parts = []
+        if self.name_conflict_groups > 0:
+            parts.append(self.i18n.t("conflict_warn", self.name_conflict_groups))
+        if self.asset_conflict_count > 0:
+            parts.append(self.i18n.t("asset_conflict_warn", self.asset_conflict_count))
+        self.conflict_label.setText("  ".join(parts))
+
+    # ---------- pak 资源覆盖冲突 ----------
+    def start_asset_scan(self):
+        # 同一时间只运行一个扫描任务 (共享索引缓存)，期间的刷新请求在结束后合并为一次
+        if self.asset_scan_running:
+            self.asset_scan_pending = True
+            return
+        if self.pak_index_cache is None:
+            self.pak_index_cache = PakIndexCache(PAK_INDEX_CACHE_FILE)
+            self.asset_search_index = AssetSearchIndex(ASSET_INDEX_FILE)
+        mods = self.mod_table.pairs(self.repo_mod_ids)
+        self.asset_scan_gen += 1
+        self.asset_scan_running = True
+        self.thread_pool.start(AssetConflictWorker(
+            self.mod_core, mods, self.pak_index_cache, self.asset_scan_gen, self.asset_scan_signals,
+            self.asset_search_index
+        ))
+
+    def on_asset_conflicts(self, generation, conflicts, errors):
+        self.asset_scan_running = False
+        if self.asset_scan_pending:
+            self.asset_scan_pending = False
+            self.start_asset_scan()
+            return
+        if generation != self.asset_scan_gen:
+            return
+        if errors:
+            print(self.i18n.t("log_pak_index_unreadable", len(errors)))
+        if self.btn_search_assets.isChecked() and self.search_bar.text():
+            self.filter_list()
+
+        by_mod = conflicts_by_mod(conflicts)
+        self.asset_clashes = by_mod
+        self.asset_conflict_count = len(conflicts)
+        self.update_conflict_label()
+
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            item = iterator.value()
+            if item.data(COL_CAT, ROLE_ITEM_TYPE) == "file":
+                clashes = by_mod.get(self.mod_table.get(item.data(COL_CAT, ROLE_MOD_ID)).key)
+                colour = item.foreground(COL_NAME).color()
+                if clashes:
+                    item.setToolTip(COL_NAME, self.format_asset_clashes(clashes))
+                    if colour != QColor("#FF4444"):
+                        item.setForeground(COL_NAME, QColor("#FFA040"))
+                elif colour == QColor("#FFA040"):
+                    item.setToolTip(COL_NAME, "")
+                    item.setForeground(COL_NAME, QColor("#EEEEEE"))
+            iterator += 1
+
+    def format_asset_clashes(self, clashes, per_mod=5):
+        lines = [self.i18n.t("asset_clash_tooltip")]
+        for other, assets in sorted(clashes.items()):
+            shown = ", ".join(assets[:per_mod]) + (" …" if len(assets) > per_mod else "")
+            lines.append(f"  {other} ({len(assets)}): {shown}")
+        return "\n".join(lines)
 
     def _add_folder_checkbox(self, item, row_h, rel_path):
         item.setSizeHint(0, QSize(0, row_h))
         cb = QCheckBox()
-        related_items = [(r, p) for r, p in self.all_mods_in_repo if r == rel_path or r.startswith(rel_path + os.sep)]
-        if related_items and all(x in self.selected_mods for x in related_items):
+        related_ids = self.folder_mod_ids(rel_path)
+        if related_ids and related_ids <= self.selected_ids:
             cb.setChecked(True)
         cb.stateChanged.connect(lambda st, it=item: self.on_folder_cb(it, st))
         self.tree.setItemWidget(item, COL_CHECK, self.wrap_center(cb, height=row_h))
 
-    def _add_pak_item(self, parent, pak, rel_path, game_files, row_h):
-        item = QTreeWidgetItem(parent)
+    def _add_pak_item(self, parent, mod_id, game_files, row_h):
+        rec = self.mod_table.get(mod_id)
+        pak, phys_rel = rec.pak, rec.rel
+        size, mtime, has_preview = self.mod_core.mod_stat(phys_rel, pak)
+        self.mod_table.set_stat(mod_id, size, mtime, has_preview)
+        item = ModTreeItem(parent)
+        item.setData(COL_CAT, ROLE_SORT_KEY, parent.childCount() - 1)
         item.setText(COL_NAME, pak)
         item.setData(COL_NAME, Qt.ItemDataRole.UserRole, pak)
-        item.setData(COL_CAT, ROLE_REL_PATH, rel_path)
+        item.setData(COL_CAT, ROLE_MOD_ID, mod_id)
         item.setData(COL_CAT, ROLE_ITEM_TYPE, "file")
         item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
+
+        # 排序键取自扫描时记录的 stat 结果，排序时不再访问文件系统
+        is_en = pak in game_files
+        item.setData(COL_NAME, ROLE_SORT_KEY, pak.lower())
+        item.setData(COL_PREVIEW, ROLE_SORT_KEY, int(has_preview))
+        item.setData(COL_ACTION, ROLE_SORT_KEY, int(is_en))
+        item.setData(COL_SIZE, ROLE_SORT_KEY, size if size is not None else -1)
+        item.setData(COL_MODIFIED, ROLE_SORT_KEY, mtime if mtime is not None else -1)
+        if size is not None:
+            item.setText(COL_SIZE, format_size(size))
+            item.setText(COL_MODIFIED, time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime / 1e9)))
         
-        counts = self.get_pak_counts()
-        if counts.get(pak, 0) > 1:
-            item.setForeground(COL_NAME, QColor("#FF4444"))
-        elif pak not in self.known_mods:
-            item.setForeground(COL_NAME, QColor("#00A3FF"))
-        else:
-            item.setForeground(COL_NAME, QColor("#EEEEEE"))
+        # 冲突 / 新模组的文字颜色在 refresh_data 建树完成后统一设置
 
         m_cb = QCheckBox()
-        if (rel_path, pak) in self.selected_mods:
+        if mod_id in self.selected_ids:
             m_cb.setChecked(True)
-        m_cb.stateChanged.connect(lambda st, r=rel_path, p=pak, it=item: self.on_mod_cb(r, p, st, it))
+        # 编号从行数据读取：模组表压缩后行数据会更新为新编号
+        m_cb.stateChanged.connect(lambda st, it=item: self.on_mod_cb(it.data(COL_CAT, ROLE_MOD_ID), st, it))
         self.tree.setItemWidget(item, COL_CHECK, self.wrap_center(m_cb, row_h))
         
-        thumb_s = int(60 * self.zoom_level)
-        uncat_key = self.i18n.t("cat_uncategorized")
-        phys_rel = "" if rel_path == uncat_key else rel_path
+        thumb_s = self.thumb_size()
         
         lbl = DropLabel(pak, phys_rel, self)
+        lbl.tree_item = item
         lbl.setFixedSize(thumb_s, thumb_s)
         self.tree.setItemWidget(item, COL_PREVIEW, self.wrap_center(lbl, row_h))
         
-        is_en = pak in game_files
         btn_txt = self.i18n.t("mod_enabled") if is_en else self.i18n.t("mod_disabled")
         btn = QPushButton(btn_txt)
+        btn.tree_item = item
         btn.setMinimumWidth(int(100 * self.zoom_level))
-        btn.setStyleSheet("background-color: #0078D4;" if is_en else "background-color: #3A3A3A; color: #AAA;")
+        btn.setProperty("modState", "enabled" if is_en else "disabled")
         src_path = os.path.join(self.repo_path, phys_rel, pak)
         btn.clicked.connect(lambda chk, s=src_path, p=pak, en=is_en, b=btn: self.toggle_mod(s, p, en, b))
         self.tree.setItemWidget(item, COL_ACTION, self.wrap_center(btn, row_h))
         
-        self.task_counter += 1
-        tid = str(self.task_counter)
-        self.item_map[tid] = lbl
-        img_path = os.path.join(self.repo_path, phys_rel, pak.replace(".pak", ".png"))
-        self.thread_pool.start(ImageLoadWorker(img_path, pak.replace(".pak", ""), tid, self.image_load_signals.image_loaded))
+        self._request_thumb(lbl, self.thumb_tier(thumb_s))
 
     def toggle_all_selection(self):
         if not self.repo_path:
@@ -579,10 +1278,7 @@ class ModManager3(QMainWindow):
         self.is_batch_op = True
         try:
             self.is_all_selected = not self.is_all_selected
-            self.selected_mods.clear()
-            if self.is_all_selected:
-                for rel, pak in self.all_mods_in_repo:
-                    self.selected_mods.add((rel, pak))
+            self.selected_ids = set(self.repo_mod_ids) if self.is_all_selected else set()
             
             self.tree.blockSignals(True)
             iterator = QTreeWidgetItemIterator(self.tree)
@@ -602,7 +1298,15 @@ class ModManager3(QMainWindow):
 
     def update_all_sel_btn_style(self):
         self.all_sel_btn.setText(self.i18n.t("btn_deselect_all" if self.is_all_selected else "btn_select_all"))
-        self.all_sel_btn.setStyleSheet("background-color: #0078D4; color: white;" if self.is_all_selected else "")
+        self.set_style_property(self.all_sel_btn, "active", self.is_all_selected)
+
+    def set_style_property(self, widget, name, value):
+        # 动态属性变化后需重新 polish，样式表选择器才会重新匹配
+        if widget.property(name) == value:
+            return
+        widget.setProperty(name, value)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
 
     def on_folder_cb(self, it, st):
         if self.is_batch_op:
@@ -624,12 +1328,10 @@ class ModManager3(QMainWindow):
                     cb.blockSignals(False)
 
             if curr.data(COL_CAT, ROLE_ITEM_TYPE) == "file":
-                rel = curr.data(COL_CAT, ROLE_REL_PATH)
-                pak = curr.text(COL_NAME)
                 if is_checked:
-                    self.selected_mods.add((rel, pak))
+                    self.selected_ids.add(curr.data(COL_CAT, ROLE_MOD_ID))
                 else:
-                    self.selected_mods.discard((rel, pak))
+                    self.selected_ids.discard(curr.data(COL_CAT, ROLE_MOD_ID))
 
             for i in range(curr.childCount()):
                 stack.append(curr.child(i))
@@ -638,22 +1340,22 @@ class ModManager3(QMainWindow):
         self.is_batch_op = False
         self.sync_all_sel_state()
 
-    def on_mod_cb(self, r, p, st, item):
+    def on_mod_cb(self, mod_id, st, item):
         if self.is_batch_op: return
         is_checked = (st == Qt.CheckState.Checked.value)
 
         item.setSelected(is_checked)
 
         if is_checked:
-            self.selected_mods.add((r, p))
+            self.selected_ids.add(mod_id)
         else:
-            self.selected_mods.discard((r, p))
+            self.selected_ids.discard(mod_id)
         self.update_ancestor_checkboxes(item)
         self.sync_all_sel_state()
 
     def sync_all_sel_state(self):
-        total = len(self.all_mods_in_repo)
-        selected_count = len(self.selected_mods)
+        total = len(self.repo_mod_ids)
+        selected_count = len(self.selected_ids)
         self.is_all_selected = (total > 0 and selected_count >= total)
         self.update_all_sel_btn_style()
         self.selection_label.setText(self.i18n.t("selected_count", selected_count) if selected_count > 0 else "")
@@ -663,7 +1365,7 @@ class ModManager3(QMainWindow):
         if item_type == "folder" and col == COL_CAT:
              if item.childCount() > 0:
                  item.setExpanded(not item.isExpanded())
-        QTimer.singleShot(10, self.adjust_cols)
+        self.adjust_cols_timer.start()
 
     def on_item_data_changed(self, item, column):
         new_val = item.text(column).strip()
@@ -672,7 +1374,6 @@ class ModManager3(QMainWindow):
             return
 
         item_type = item.data(COL_CAT, ROLE_ITEM_TYPE)
-        uncat_key = self.i18n.t("cat_uncategorized")
 
         try:
             if item_type == "folder" and column == COL_CAT:
@@ -683,15 +1384,13 @@ class ModManager3(QMainWindow):
                 old_name = old_display.replace("棣冩惃 ", "").strip()
                 new_name = new_val.replace("棣冩惃 ", "").strip()
                 
-                if old_name == new_name:
-                    self.refresh_data()
-                    return
-                if old_name == uncat_key:
+                full_rel_path = item.data(COL_CAT, ROLE_REL_PATH)
+                if old_name == new_name or full_rel_path == ROOT_FOLDER:
                     self.refresh_data()
                     return
                 
-                full_rel_path = item.data(COL_CAT, ROLE_REL_PATH)
                 new_rel_path = self.mod_core.rename_folder(full_rel_path, new_name)
+                self.mod_table.rename_folder(full_rel_path, new_rel_path)
                 
                 if full_rel_path in self.folder_states:
                     self.folder_states[new_rel_path] = self.folder_states.pop(full_rel_path)
@@ -705,14 +1404,16 @@ class ModManager3(QMainWindow):
                 if not new_val.lower().endswith(".pak"):
                     new_val += ".pak"
                 
-                rel = item.data(COL_CAT, ROLE_REL_PATH)
+                mod_id = item.data(COL_CAT, ROLE_MOD_ID)
+                rel = self.mod_table.get(mod_id).rel
                 
                 if self.game_path:
                     old_game_pak = os.path.join(self.game_path, old_val)
                     if os.path.exists(old_game_pak):
                         os.remove(old_game_pak)
                 
-                self.mod_core.rename_mod(rel, old_val, new_val, uncat_key)
+                self.mod_core.rename_mod(rel, old_val, new_val)
+                self.mod_table.rename(mod_id, pak=new_val)
                 
                 self.known_mods.discard(old_val)
                 self.known_mods.add(new_val)
@@ -728,10 +1429,9 @@ class ModManager3(QMainWindow):
             self.refresh_data()
 
     def batch_move_mods(self):
-        if not self.selected_mods:
+        if not self.selected_ids:
             return
         
-        uncat_key = self.i18n.t("cat_uncategorized")
         other_targets = set()
         
         iterator = QTreeWidgetItemIterator(self.tree)
@@ -739,12 +1439,18 @@ class ModManager3(QMainWindow):
             it = iterator.value()
             if it.data(COL_CAT, ROLE_ITEM_TYPE) == "folder":
                 rp = it.data(COL_CAT, ROLE_REL_PATH)
-                if rp and rp != uncat_key:
+                if rp != ROOT_FOLDER:
                     other_targets.add(rp)
             iterator += 1
 
         # Keep "Uncategorized" pinned to top, and sort the rest logically.
-        targets = [uncat_key] + self.mod_core.logical_sort(list(other_targets))
+        # 显示名与同名文件夹冲突时加上分隔符区分，选中项按显示名映射回分类路径
+        root_label = self.i18n.t("cat_uncategorized")
+        if root_label in other_targets:
+            root_label = f"{root_label} ({os.sep})"
+        dest_by_label = {root_label: ROOT_FOLDER}
+        dest_by_label.update((rp, rp) for rp in other_targets)
+        targets = [root_label] + self.mod_core.logical_sort(list(other_targets))
         
         move_dialog = QInputDialog(self)
         move_title = self.i18n.t("dialog_move_title")
@@ -754,36 +1460,130 @@ class ModManager3(QMainWindow):
         self._apply_dialog_chrome(move_dialog, move_title)
 
         if move_dialog.exec() == QDialog.DialogCode.Accepted and move_dialog.textValue():
-            dest_rel = move_dialog.textValue()
-            phys_dest = "" if dest_rel == uncat_key else dest_rel
+            phys_dest = dest_by_label[move_dialog.textValue()]
             dest_dir = os.path.join(self.repo_path, phys_dest)
             os.makedirs(dest_dir, exist_ok=True)
-            
-            failed_moves = []
-            for src_rel, pak in list(self.selected_mods):
-                if src_rel != dest_rel:
-                    try:
-                        self.mod_core.move_mod(src_rel, pak, dest_rel, uncat_key)
-                        self.known_mods.add(pak)
-                    except Exception as e:
-                        failed_moves.append(f"{pak}: {str(e)}")
-            
-            if failed_moves:
-                print(self.i18n.t("log_move_failed", len(failed_moves), ", ".join(failed_moves[:5])))
-            self.selected_mods.clear()
-            self.save_cfg()
-            self.refresh_data()
+
+            units = plan_moves(self.repo_path, self.selected_pairs(), phys_dest)
+            if not units:
+                return
+
+            # 同设备改名与跨设备复制都在线程池中执行，进度对话框为模态，期间树不会被修改
+            progress = QProgressDialog(self.i18n.t("progress_move"), "", 0, 1000, self)
+            progress.setCancelButton(None)
+            progress.setWindowModality(Qt.WindowModality.WindowModal)
+            progress.setMinimumDuration(300)
+
+            self.move_signals = MoveSignals()
+            self.move_signals.progress.connect(
+                lambda done, total: progress.setValue(done * 1000 // total if total else 0))
+            self.move_signals.finished.connect(
+                lambda moved, failed: self.on_batch_moved(progress, moved, failed))
+            self.thread_pool.start(MoveWorker(units, self.move_signals))
+
+    # ---------- 重复内容去重 ----------
+    def start_dedup_scan(self):
+        if not self.repo_path or self.dedup_signals is not None:
+            return
+        mods = self.mod_table.pairs(self.repo_mod_ids)
+
+        progress = QProgressDialog(self.i18n.t("progress_dedup_scan"), "", 0, 1000, self)
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+
+        self.dedup_signals = DedupSignals()
+        self.dedup_signals.progress.connect(
+            lambda done, total: progress.setValue(done * 1000 // total if total else 0))
+        self.dedup_signals.finished.connect(lambda plan: self.on_dedup_scanned(progress, plan))
+        self.btn_dedup.setEnabled(False)
+        self.thread_pool.start(DedupScanWorker(self.mod_core, mods, HashCache(HASH_CACHE_FILE), self.dedup_signals))
+
+    def on_dedup_scanned(self, progress, plan):
+        progress.close()
+        self.dedup_signals = None
+        self.btn_dedup.setEnabled(True)
+        for err in plan.errors[:5]:
+            print(self.i18n.t("log_dedup_failed", err))
+        title = self.i18n.t("dialog_dedup_title")
+        if not plan.groups:
+            QMessageBox.information(self, title, self.i18n.t("msg_no_duplicates"))
+            return
+
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Question)
+        box.setWindowTitle(title)
+        box.setText(self.i18n.t("confirm_dedup", plan.redundant, len(plan.groups), format_size(plan.reclaimable)))
+        box.setDetailedText("\n\n".join("\n".join(key for key, _ in group) for group in plan.groups))
+        box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        # 链接替换只涉及元数据操作，直接在界面线程执行
+        reclaimed, linked, failed = apply_dedup(plan, HashCache(HASH_CACHE_FILE))
+        for err in failed[:5]:
+            print(self.i18n.t("log_dedup_failed", err))
+        QMessageBox.information(self, title, self.i18n.t("msg_dedup_done", len(linked), format_size(reclaimed), len(failed)))
+        self.refresh_data()
+
+    # ---------- 增量备份 ----------
+    def start_mirror(self):
+        if not self.repo_path or self.mirror_signals is not None:
+            return
+        dest = QFileDialog.getExistingDirectory(self, self.i18n.t("dialog_mirror_title"), self.config.mirror_path)
+        if not dest:
+            return
+        self.config.mirror_path = dest
+        self.save_cfg()
+
+        progress = QProgressDialog(self.i18n.t("progress_mirror"), "", 0, 1000, self)
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+
+        self.mirror_signals = MirrorSignals()
+        self.mirror_signals.progress.connect(
+            lambda done, total: progress.setValue(done * 1000 // total if total else 0))
+        self.mirror_signals.finished.connect(lambda result: self.on_mirror_done(progress, result))
+        self.btn_mirror.setEnabled(False)
+        self.thread_pool.start(MirrorWorker(self.mod_core, dest, HashCache(HASH_CACHE_FILE), self.mirror_signals))
+
+    def on_mirror_done(self, progress, result):
+        progress.close()
+        self.mirror_signals = None
+        self.btn_mirror.setEnabled(True)
+        for err in result["failed"][:5]:
+            print(self.i18n.t("log_mirror_failed", err))
+        QMessageBox.information(self, self.i18n.t("dialog_mirror_title"), self.i18n.t(
+            "msg_mirror_done", len(result["copied"]), len(result["renamed"]), len(result["deleted"]),
+            result["unchanged"], format_size(result["bytes_copied"]), len(result["failed"])))
+
+    def on_batch_moved(self, progress, moved, failed):
+        progress.close()
+        for unit in moved:
+            self.known_mods.add(unit.pak)
+            mod_id = self.mod_table.find(unit.src_rel, unit.pak)
+            if mod_id is not None:
+                self.mod_table.rename(mod_id, rel=unit.dest_rel)
+        if failed:
+            print(self.i18n.t("log_move_failed", len(failed), ", ".join(failed[:5])))
+        leftovers = [path for unit in moved for path in unit.leftovers]
+        if leftovers:
+            print(self.i18n.t("log_move_source_left", len(leftovers), ", ".join(leftovers[:5])))
+        self.move_signals = None
+        self.selected_ids.clear()
+        self.save_cfg()
+        self.refresh_data()
 
     def batch_delete_logic(self):
         items = self.tree.selectedItems()
-        files_to_delete = list(self.selected_mods)
+        files_to_delete = set(self.selected_ids)
         folders_to_delete = []
         
-        uncat_key = self.i18n.t("cat_uncategorized")
         for item in items:
             if item.data(COL_CAT, ROLE_ITEM_TYPE) == "folder":
                 rp = item.data(COL_CAT, ROLE_REL_PATH)
-                if rp != uncat_key:
+                if rp != ROOT_FOLDER:
                     folders_to_delete.append(rp)
 
         total = len(files_to_delete) + len(folders_to_delete)
@@ -809,44 +1609,43 @@ class ModManager3(QMainWindow):
         except Exception:
             enabled_files = set()
 
-        folder_paks_to_disable = set()
+        # 所选文件夹内的模组随文件夹一起删除，不再单独处理
+        covered_ids = set()
         for folder_rel in folders_to_delete:
-            for rel, pak in self.all_mods_in_repo:
-                if rel == folder_rel or rel.startswith(folder_rel + os.sep):
-                    folder_paks_to_disable.add(pak)
-
-        for pak in folder_paks_to_disable:
-            if pak in enabled_files and self.game_path:
-                try:
-                    os.remove(os.path.join(self.game_path, pak))
-                    enabled_files.discard(pak)
-                except (PermissionError, OSError) as e:
-                    failed_disable_ops.append(f"{pak}: {str(e)}")
-
-        for rel, pak in files_to_delete:
-            skip = False
-            for f in folders_to_delete:
-                if rel == f or rel.startswith(f + os.sep):
-                    skip = True
-                    break
-            if skip:
-                continue
+            covered_ids |= self.mod_table.in_folder(folder_rel)
+        files_to_delete -= covered_ids
 
+        # 从游戏目录移除的模组记入暂存批次，撤销删除时重新部署
+        disabled = []
+        for rel, pak in self.mod_table.pairs(covered_ids) + self.mod_table.pairs(files_to_delete):
             if pak in enabled_files and self.game_path:
                 try:
                     os.remove(os.path.join(self.game_path, pak))
                     enabled_files.discard(pak)
+                    disabled.append((rel, pak))
                 except (PermissionError, OSError) as e:
                     failed_disable_ops.append(f"{pak}: {str(e)}")
 
         if failed_disable_ops:
             print(self.i18n.t("log_batch_failed", len(failed_disable_ops), ", ".join(failed_disable_ops[:5])))
 
-        # 2) After disable stage, continue original delete stage.
+        # 2) After disable stage, move everything into the repo's staging dir (rename only);
+        # the actual removal happens on the purge thread once the undo window has passed.
+        self.expire_undo_delete()
+        try:
+            trash_batch = TrashBin(self.repo_path).new_batch()
+        except OSError as e:
+            print(self.i18n.t("log_trash_unavailable", str(e)))
+            trash_batch = None
+        if trash_batch is not None:
+            for rel, pak in disabled:
+                trash_batch.record_deployed(self.game_path, rel, pak)
+        forgotten = set()
+
         failed_folder_deletes = []
         for f in folders_to_delete:
             try:
-                self.mod_core.delete_folder(f)
+                self.mod_core.delete_folder(f, trash_batch)
                 if f in self.folder_states:
                     self.folder_states.pop(f)
             except Exception as e:
@@ -855,25 +1654,63 @@ class ModManager3(QMainWindow):
         if failed_folder_deletes:
             print(self.i18n.t("log_folder_delete_failed", len(failed_folder_deletes), ", ".join(failed_folder_deletes[:5])))
             
-        for rel, pak in files_to_delete:
-            skip = False
-            for f in folders_to_delete:
-                if rel == f or rel.startswith(f + os.sep):
-                    skip = True
-                    break
-            if skip:
-                continue
-
+        for rel, pak in self.mod_table.pairs(files_to_delete):
             try:
-                self.mod_core.delete_mod(rel, pak, uncat_key)
+                self.mod_core.delete_mod(rel, pak, trash_batch)
+                if pak in self.known_mods:
+                    forgotten.add(pak)
                 self.known_mods.discard(pak)
             except Exception as e:
                 print(self.i18n.t("log_file_delete_failed", pak, str(e)))
+
+        if trash_batch is not None:
+            self.begin_undo_delete(trash_batch, forgotten)
             
-        self.selected_mods.clear()
+        self.selected_ids.clear()
         self.save_cfg()
         self.refresh_data()
 
+    # ---------- 删除撤销 / 后台清理 ----------
+    def begin_undo_delete(self, batch, forgotten):
+        if not batch.entries:
+            self.trash_purger.submit(batch)
+            return
+        try:
+            batch.save_manifest()
+        except OSError:
+            pass
+        self.trash_purger.submit(batch, DELETE_UNDO_SECONDS)
+        self.pending_delete = {"batch": batch, "known": forgotten}
+        self.btn_undo_delete.setText(self.i18n.t("btn_undo_delete", len(batch.entries)))
+        self.btn_undo_delete.show()
+        self.undo_delete_timer.start()
+
+    def expire_undo_delete(self):
+        self.undo_delete_timer.stop()
+        self.pending_delete = None
+        self.btn_undo_delete.hide()
+
+    def undo_delete(self):
+        pending = self.pending_delete
+        self.expire_undo_delete()
+        if not pending or not self.trash_purger.cancel(pending["batch"]):
+            return
+        failed = pending["batch"].restore()
+        if failed:
+            print(self.i18n.t("log_undo_delete_failed", len(failed), ", ".join(failed[:5])))
+        failed_deploy = pending["batch"].redeploy()
+        if failed_deploy:
+            print(self.i18n.t("log_batch_failed", len(failed_deploy), ", ".join(failed_deploy[:5])))
+        self.known_mods |= pending["known"]
+        self.save_cfg()
+        self.refresh_data()
+
+    def purge_leftover_trash(self):
+        if not self.repo_path:
+            return
+        for batch in TrashBin(self.repo_path).leftover_batches():
+            self.trash_purger.submit(batch)
+
     def create_folder(self):
         if not self.repo_path:
             return
@@ -886,7 +1723,6 @@ class ModManager3(QMainWindow):
             item_type = current_item.data(COL_CAT, ROLE_ITEM_TYPE)
             rel_path = current_item.data(COL_CAT, ROLE_REL_PATH)
             depth = current_item.data(COL_CAT, ROLE_DEPTH)
-            uncat_key = self.i18n.t("cat_uncategorized")
 
             if depth is None:
                 depth = 0
@@ -900,9 +1736,9 @@ class ModManager3(QMainWindow):
                     QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("err_depth_limit"))
                     return
             elif item_type == "file":
-                phys_rel = "" if rel_path == uncat_key else rel_path
-                parts = rel_path.replace("\\", "/").split("/")
-                if len(parts) >= 2 and rel_path != uncat_key:
+                phys_rel = self.mod_table.get(current_item.data(COL_CAT, ROLE_MOD_ID)).rel
+                parts = phys_rel.replace("\\", "/").split("/")
+                if len(parts) >= 2 and phys_rel:
                      QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("err_depth_limit"))
                      return
                 target_dir = os.path.join(self.repo_path, phys_rel)
@@ -913,26 +1749,15 @@ class ModManager3(QMainWindow):
         except (PermissionError, OSError) as e:
             QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("msg_create_folder_fail_detail", str(e)))
 
+    @tracer.traced("ui.exec_batch")
     def exec_batch(self, en):
-        if not self.selected_mods:
+        if not self.selected_ids:
             return
-        uncat_key = self.i18n.t("cat_uncategorized")
         
-        failed_ops = []
-        for rel, pak in list(self.selected_mods):
-            phys_rel = "" if rel == uncat_key else rel
-            src = os.path.join(self.repo_path, phys_rel, pak)
-            
-            if os.path.exists(src):
-                target = os.path.join(self.game_path, pak)
-                try:
-                    if en:
-                        shutil.copy2(src, target)
-                    elif os.path.exists(target):
-                        os.remove(target)
-                    self.known_mods.add(pak)
-                except (PermissionError, OSError) as e:
-                    failed_ops.append(f"{pak}: {str(e)}")
+        steps = plan_batch_steps(self.repo_path, self.selected_pairs(), en)
+        completed, failed_ops = run_journaled(self.batch_journal, self.game_path, steps)
+        for step in completed:
+            self.known_mods.add(step["pak"])
         
         if failed_ops:
             print(self.i18n.t("log_batch_failed", len(failed_ops), ", ".join(failed_ops[:5])))
@@ -940,6 +1765,93 @@ class ModManager3(QMainWindow):
         self.save_cfg()
         self.refresh_data()
 
+    def _phys_mods(self):
+        return self.mod_table.pairs(self.repo_mod_ids)
+
+    def refresh_profile_combo(self, current=None):
+        current = current or self.profile_combo.currentText()
+        self.profile_combo.clear()
+        names = self.mod_core.logical_sort(list(self.config.profiles))
+        self.profile_combo.addItems(names)
+        if current in names:
+            self.profile_combo.setCurrentText(current)
+
+    def save_profile(self):
+        if not self.repo_path or not self.game_path:
+            return
+
+        name_dialog = QInputDialog(self)
+        name_dialog.setLabelText(self.i18n.t("dialog_profile_label"))
+        name_dialog.setTextValue(self.profile_combo.currentText())
+        self._apply_dialog_chrome(name_dialog, self.i18n.t("dialog_profile_title"))
+        if name_dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        name = name_dialog.textValue().strip()
+        if not name:
+            return
+
+        if self.selected_ids:
+            keys = sorted(self.mod_table.keys(self.selected_ids))
+        else:
+            keys = enabled_mod_keys(self.mod_core, self._phys_mods())
+
+        self.config.profiles[name] = keys
+        self.save_cfg()
+        self.refresh_profile_combo(name)
+
+    def delete_profile(self):
+        name = self.profile_combo.currentText()
+        if name and self.config.profiles.pop(name, None) is not None:
+            self.save_cfg()
+            self.refresh_profile_combo()
+
+    def switch_profile(self):
+        name = self.profile_combo.currentText()
+        if not name or name not in self.config.profiles:
+            return
+        if not self.repo_path or not self.game_path:
+            QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("tip_select_path"))
+            return
+
+        plan = plan_profile_switch(self.mod_core, self._phys_mods(), self.config.profiles[name])
+        removed, deployed, failed = apply_profile_switch(self.mod_core, plan, self.batch_journal)
+        failed.extend(plan.missing + plan.clashes)
+        if failed:
+            print(self.i18n.t("log_profile_failed", len(failed), ", ".join(failed[:5])))
+
+        for rel, pak, _ in plan.to_deploy:
+            self.known_mods.add(pak)
+        self.profile_status_lbl.setText(self.i18n.t(
+            "profile_switched", len(removed), len(deployed), len(plan.kept), format_size(plan.bytes_avoided)
+        ))
+        self.save_cfg()
+        self.refresh_data()
+
+    def check_unfinished_batch(self):
+        if not self.batch_journal.exists():
+            return
+        remaining, total = pending_step_count(self.batch_journal)
+        if remaining == 0:
+            discard_journal(self.batch_journal)
+            return
+
+        confirm_box = QMessageBox(self)
+        confirm_box.setIcon(QMessageBox.Icon.Question)
+        confirm_box.setText(self.i18n.t("confirm_resume_batch", remaining, total))
+        confirm_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        self._apply_dialog_chrome(confirm_box, self.i18n.t("confirm_resume_title"))
+
+        if confirm_box.exec() != QMessageBox.StandardButton.Yes:
+            discard_journal(self.batch_journal)
+            return
+
+        completed, failed_ops = resume_journal(self.batch_journal)
+        for step in completed:
+            self.known_mods.add(step["pak"])
+        if failed_ops:
+            print(self.i18n.t("log_batch_failed", len(failed_ops), ", ".join(failed_ops[:5])))
+        self.save_cfg()
+
     def show_large_preview(self, pak, pos):
         rn = pak.replace(".pak", "")
         if rn in self.qimage_cache:
@@ -950,28 +1862,153 @@ class ModManager3(QMainWindow):
             self.preview_win.move(pos.x()+20, pos.y()-20)
             self.preview_win.show()
 
-    def on_img_loaded(self, n, thumb, full, tid):
-        if tid in self.item_map and not thumb.isNull():
-            ts = int(60 * self.zoom_level)
-            pix = QPixmap.fromImage(thumb).scaled(ts, ts, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.item_map[tid].setPixmap(pix)
-            self.item_map[tid].setText("")
+    def on_thumbs_ready(self):
+        if not self.thumb_frame_timer.isActive():
+            self.thumb_frame_timer.start()
+
+    @tracer.traced("ui.apply_thumb_batch")
+    def apply_thumb_batch(self):
+        # 每帧只用 THUMB_FRAME_BUDGET_MS 显示缩略图，剩余结果留到下一帧，滚动与输入不会被整批结果阻塞
+        deadline = time.perf_counter() + THUMB_FRAME_BUDGET_MS / 1000
+        applied = 0
+        while True:
+            result = self.thumb_queue.take()
+            if result is None:
+                self.thumb_frame_timer.stop()
+                break
+            self.on_img_loaded(*result)
+            applied += 1
+            if time.perf_counter() >= deadline:
+                break
+        tracer.count("thumbs_applied", applied)
+        tracer.gauge("image_queue_depth", self.pending_images)
+
+    def on_img_loaded(self, n, thumb, display, display_size, full, tid):
+        self.pending_images -= 1
+        # 任务完成即移出 item_map，否则每次缩放 / 重新请求缩略图都会留下一条记录
+        lbl = self.item_map.pop(tid, None)
+        self.thumb_tasks.pop(tid, None)
+        self.retired_thumb_tasks.pop(tid, None)
+        if lbl is not None and not thumb.isNull():
+            lbl.set_thumb(thumb, lbl.requested_tier)
+            size = self.thumb_size()
+            # 请求后缩放过界面时，预缩放的图片尺寸不再适用，改由档位图缩放
+            lbl.show_thumb(size, display if display_size == size else None)
             if len(self.qimage_cache) > 1000:
                 first_key = next(iter(self.qimage_cache))
                 del self.qimage_cache[first_key]
             self.qimage_cache[n] = full
 
-    def handle_img_drop(self, pak, rel, src):
-        try:
-            dest_img_path = os.path.join(self.repo_path, rel, pak.replace(".pak", ".png"))
-            self.mod_core.save_preview_image(src, dest_img_path)
-            self.known_mods.add(pak)
+    def handle_img_drop(self, pak, rel, src, lbl=None):
+        # 解码、缩小与保存在线程池中完成，回调只更新被拖入的这一行
+        self.task_counter += 1
+        tid = str(self.task_counter)
+        if lbl:
+            self.item_map[tid] = lbl
+        self.pending_imports[tid] = pak
+        dest_img_path = os.path.join(self.repo_path, rel, pak.replace(".pak", ".png"))
+        self.thread_pool.start(PreviewImportWorker(
+            self.mod_core, src, dest_img_path, tid, self.image_load_signals.preview_imported,
+            MAX_PREVIEW_SIZE, PREVIEW_COMPRESS_LEVEL, self.thumb_tier(self.thumb_size())
+        ))
+        return tid
+
+    # ---------- 批量导入预览图 ----------
+    def import_previews_from_folder(self):
+        if not self.repo_path:
+            return
+        p = QFileDialog.getExistingDirectory(self, self.i18n.t("btn_import_previews"))
+        if p:
+            self.bulk_import_previews([p])
+
+    def bulk_import_previews(self, paths):
+        if not self.repo_path or self.bulk_import:
+            return
+        labels = {}
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            w = self.tree.itemWidget(iterator.value(), COL_PREVIEW)
+            lbl = w.findChild(DropLabel) if w else None
+            if lbl:
+                labels[(lbl.rel_dir, lbl.pak_name)] = lbl
+            iterator += 1
+
+        plan = match_previews(collect_images(paths), list(labels))
+        if not plan.matches:
+            QMessageBox.information(self, self.i18n.t("dialog_import_previews_title"),
+                                    self.i18n.t("msg_no_preview_matches", len(plan.unmatched)))
+            return
+
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Question)
+        box.setWindowTitle(self.i18n.t("dialog_import_previews_title"))
+        box.setText(self.i18n.t("confirm_import_previews", plan.image_count, plan.mod_count,
+                                len(plan.unmatched) + len(plan.duplicates)))
+        details = [f"{os.path.basename(src)} -> {mod_key(rel, pak)}" for src, rel, pak in plan.matches]
+        details += [f"{os.path.basename(src)} -> ?" for src in plan.unmatched + plan.duplicates]
+        box.setDetailedText("\n".join(details))
+        box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        progress = QProgressDialog(self.i18n.t("progress_import_previews"), "", 0, plan.mod_count, self)
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+
+        self.bulk_import = {"tids": set(), "done": 0, "failed": 0, "dialog": progress}
+        for src, rel, pak in plan.matches:
+            self.bulk_import["tids"].add(self.handle_img_drop(pak, rel, src, labels[(rel, pak)]))
+
+    def _advance_bulk_import(self, tid, failed):
+        bulk = self.bulk_import
+        if not bulk or tid not in bulk["tids"]:
+            return
+        bulk["done"] += 1
+        bulk["failed"] += failed
+        bulk["dialog"].setValue(bulk["done"])
+        if bulk["done"] == len(bulk["tids"]):
+            bulk["dialog"].close()
+            self.bulk_import = None
             self.save_cfg()
-            QTimer.singleShot(100, self.refresh_data)
-        except (PermissionError, OSError) as e:
-            print(self.i18n.t("log_preview_failed", str(e)))
-        except Exception as e:
-            print(self.i18n.t("log_preview_exception", str(e)))
+            print(self.i18n.t("log_previews_imported", bulk["done"] - bulk["failed"], bulk["failed"]))
+
+    def on_preview_imported(self, tid, thumb, full, error):
+        pak = self.pending_imports.pop(tid, None)
+        lbl = self.item_map.pop(tid, None)
+        if pak is None:
+            return
+        if error:
+            print(self.i18n.t("log_preview_failed", error))
+            self._advance_bulk_import(tid, True)
+            return
+
+        self.qimage_cache[pak.replace(".pak", "")] = full
+        if lbl:
+            lbl.requested_tier = self.thumb_tier(self.thumb_size())
+            lbl.set_thumb(thumb, lbl.requested_tier)
+            lbl.show_thumb(self.thumb_size())
+            if lbl.tree_item is not None:
+                self.set_sort_key(lbl.tree_item, COL_PREVIEW, 1)
+                mod_id = lbl.tree_item.data(COL_CAT, ROLE_MOD_ID)
+                if mod_id in self.mod_table:
+                    self.mod_table.get(mod_id).preview = True
+
+        in_bulk = bool(self.bulk_import) and tid in self.bulk_import["tids"]
+        if pak not in self.known_mods:
+            self.known_mods.add(pak)
+            if not in_bulk:
+                self.save_cfg()
+            item = lbl.tree_item if lbl else None
+            if item is not None and item.foreground(COL_NAME).color() == QColor("#00A3FF"):
+                item.setForeground(COL_NAME, QColor("#EEEEEE"))
+        self._advance_bulk_import(tid, False)
+
+    def on_search_mode_changed(self, assets):
+        self.search_bar.setPlaceholderText(self.i18n.t("search_assets_placeholder" if assets else "search_placeholder"))
+        self.filter_list()
+
+    @tracer.traced("ui.filter_list")
     def filter_list(self):
         t = self.search_bar.text().lower()
         if not t:
@@ -981,6 +2018,12 @@ class ModManager3(QMainWindow):
                 iterator += 1
             return
 
+        asset_matches = None
+        if self.btn_search_assets.isChecked():
+            asset_matches = set()
+            if self.asset_search_index is not None:
+                asset_matches = self.asset_search_index.search(t, self.pak_index_cache)
+
         iterator = QTreeWidgetItemIterator(self.tree)
         items_to_show_ids = set()
         parent_ids_to_expand = set()
@@ -989,7 +2032,10 @@ class ModManager3(QMainWindow):
             item = iterator.value()
             item_type = item.data(COL_CAT, ROLE_ITEM_TYPE)
 
-            if item_type == "folder":
+            if asset_matches is not None:
+                match = item_type == "file" and \
+                    self.mod_table.get(item.data(COL_CAT, ROLE_MOD_ID)).key in asset_matches
+            elif item_type == "folder":
                 match = t in item.text(COL_CAT).lower()
             else:
                 match = t in item.text(COL_NAME).lower()
@@ -1013,44 +2059,41 @@ class ModManager3(QMainWindow):
             item.setHidden(id(item) not in items_to_show_ids)
             iterator += 1
         self.tree.blockSignals(False)
-    def toggle_mod(self, src, pak, is_en, btn_widget):
-        if not btn_widget.isEnabled():
-            return
-        btn_widget.setEnabled(False)
-        try:
-            new_en = self.mod_core.toggle_mod(src, pak, is_en)
-            
-            self.known_mods.add(pak)
-            self.save_cfg()
-
-            btn_widget.setText(self.i18n.t("mod_enabled" if new_en else "mod_disabled"))
-            btn_widget.setStyleSheet("background-color: #0078D4;" if new_en else "background-color: #3A3A3A; color: #AAA;")
-            try:
-                btn_widget.clicked.disconnect()
-            except TypeError:
-                pass
-            btn_widget.clicked.connect(lambda chk=False, s=src, p=pak, en=new_en, b=btn_widget: self.toggle_mod(s, p, en, b))
-        except (PermissionError, OSError) as e:
-            QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("msg_file_op_detail", str(e)))
-        except Exception as e:
-            QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("msg_unknown_error_detail", str(e)))
-        finally:
-            btn_widget.setEnabled(True)
+    def toggle_mod(self, src, pak, is_en, btn_widget):
+        if not btn_widget.isEnabled():
+            return
+        btn_widget.setEnabled(False)
+        try:
+            new_en = self.mod_core.toggle_mod(src, pak, is_en)
+            
+            self.known_mods.add(pak)
+            self.save_cfg()
+            self.set_mod_button(btn_widget, src, pak, new_en)
+        except (PermissionError, OSError) as e:
+            QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("msg_file_op_detail", str(e)))
+        except Exception as e:
+            QMessageBox.warning(self, self.i18n.t("msg_op_fail"), self.i18n.t("msg_unknown_error_detail", str(e)))
+        finally:
+            btn_widget.setEnabled(True)
 
     def select_repo(self):
         p = QFileDialog.getExistingDirectory(self, self.i18n.t("btn_set_repo"))
         if p:
+            self.expire_undo_delete()
             self.repo_path = p
             self.config.repo_path = p
             self.save_cfg()
+            self.purge_leftover_trash()
             self.refresh_data()
 
     def select_game(self):
         p = QFileDialog.getExistingDirectory(self, self.i18n.t("btn_set_game"))
         if p:
-            self.game_path = p
-            self.config.game_path = p
+            # 设置的是当前部署目标的目录；尚无目标时创建默认目标
+            self.config.set_target(self.config.active_target or DEFAULT_TARGET, p)
+            self.game_path = self.config.game_path
             self.save_cfg()
+            self.refresh_target_combo()
             self.refresh_data()
 
     def save_cfg(self):
@@ -1063,13 +2106,34 @@ class ModManager3(QMainWindow):
 
     def showEvent(self, event):
         super().showEvent(event)
-        QTimer.singleShot(50, self.adjust_cols)
-        
+        self.adjust_cols_timer.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.pending_initial_load:
+            self.pending_initial_load = False
+            QTimer.singleShot(0, self.initial_load)
+
+    def initial_load(self):
+        startup_profiler.mark("first paint")
+        self.check_unfinished_batch()
+        self.purge_leftover_trash()
+        self.refresh_data()
+        startup_profiler.mark("refresh_data")
+        self.adjust_cols()
+        startup_profiler.mark("adjust_cols")
+        startup_profiler.finish()
+
     def resizeEvent(self, e):
         super().resizeEvent(e)
-        QTimer.singleShot(10, self.adjust_cols)
+        self.adjust_cols_timer.start()
         
     def closeEvent(self, event):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        self.trash_purger.stop()
+        if self.process_decoder is not None:
+            self.process_decoder.shutdown()
         self.save_cfg()
         super().closeEvent(event)
   
@@ -1088,6 +2152,9 @@ class ModManager3(QMainWindow):
             header.setSectionResizeMode(COL_ACTION, QHeaderView.ResizeMode.ResizeToContents)
             if header.sectionSize(COL_ACTION) < int(tw * COLUMN_PROPORTIONS[COL_ACTION]):
                 header.setSectionResizeMode(COL_ACTION, QHeaderView.ResizeMode.Stretch)
+            for col in (COL_TARGETS, COL_SIZE, COL_MODIFIED):
+                if not self.tree.isColumnHidden(col):
+                    header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
             header.setUpdatesEnabled(True)
 
 
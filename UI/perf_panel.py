@@ -0,0 +1,102 @@
+"""
+perf_panel.py
+
+包含：
+- 性能面板 (PerfPanel，QFrame 子类)
+  (QTableWidget 展示各追踪区间的滚动分位数，QLabel 展示计数器与瞬时值)
+
+实现：
+- 面板可见时由 QTimer 每秒读取 tracer.snapshot() 刷新，隐藏时停止计时器
+- 导出按钮调用 tracer.export_chrome_trace() 写出 Chrome Trace JSON
+- 重置按钮清空已记录的事件与统计
+"""
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog,
+                             QAbstractItemView)
+
+from core.tracing import tracer
+
+
+class PerfPanel(QFrame):
+
+    COLUMNS = ["count", "p50 ms", "p90 ms", "p99 ms", "max ms"]
+
+    def __init__(self, i18n, parent=None):
+        super().__init__(parent)
+        self.i18n = i18n
+        self.setObjectName("PerfPanel")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 4, 0, 0)
+
+        top = QHBoxLayout()
+        self.counter_lbl = QLabel("")
+        self.counter_lbl.setObjectName("PathLabel")
+        top.addWidget(self.counter_lbl, 1)
+
+        self.export_btn = QPushButton(self.i18n.t("btn_export_trace"))
+        self.export_btn.clicked.connect(self.export_trace)
+        top.addWidget(self.export_btn)
+
+        self.reset_btn = QPushButton(self.i18n.t("btn_reset_trace"))
+        self.reset_btn.clicked.connect(self.reset_trace)
+        top.addWidget(self.reset_btn)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, len(self.COLUMNS) + 1)
+        self.table.setHorizontalHeaderLabels([self.i18n.t("perf_header_span")] + self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setMaximumHeight(220)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def retranslate(self):
+        self.export_btn.setText(self.i18n.t("btn_export_trace"))
+        self.reset_btn.setText(self.i18n.t("btn_reset_trace"))
+        self.table.setHorizontalHeaderLabels([self.i18n.t("perf_header_span")] + self.COLUMNS)
+
+    # ---------- 显示 / 隐藏 ----------
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    # ---------- 数据刷新 ----------
+    def refresh(self):
+        snap = tracer.snapshot()
+        spans = [(name, stats) for name, stats in snap["spans"].items() if stats]
+
+        self.table.setRowCount(len(spans))
+        for row, (name, stats) in enumerate(spans):
+            values = [name, str(stats["count"])] + [
+                f"{stats[k]:.2f}" for k in ("p50", "p90", "p99", "max")
+            ]
+            for col, text in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+        parts = [f"{k}={v}" for k, v in sorted(snap["counters"].items())]
+        parts += [f"{k}={v}" for k, v in sorted(snap["gauges"].items())]
+        self.counter_lbl.setText("  ".join(parts))
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, self.i18n.t("btn_export_trace"), "trace.json", "JSON (*.json)")
+        if path:
+            try:
+                tracer.export_chrome_trace(path)
+            except OSError as e:
+                print(self.i18n.t("log_trace_export_failed", str(e)))
+
+    def reset_trace(self):
+        tracer.reset()
+        self.refresh()
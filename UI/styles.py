@@ -1,6 +1,10 @@
 """
 styles.py
 
+说明：
+- 样式表与缩放无关，只在启动 / 切换语言时设置一次；缩放相关的字号、行高、勾选框与滚动条尺寸
+  由主窗口 apply_zoom() / relayout_rows() 直接设置字体与尺寸，并由 ZoomStyle (UI/widgets.py) 提供，
+  缩放时不会重新 polish 整个窗口
 """
 
 import os
@@ -30,14 +34,12 @@ QTreeWidget {{
     background-color: #242424;
     border: none;
     color: #EEE;
-    font-size: {font_size}px;
     outline: none;
 }}
 
 QTreeWidget::item {{
-    padding: {padding}px;
+    padding: 2px;
     border-bottom: 1px solid #2D2D2D;
-    min-height: {item_height}px;
 }}
 
 QTreeWidget::item:selected,
@@ -52,8 +54,6 @@ QTreeView::branch {{
     background: transparent;
     border-image: none;
     image: none;
-    width: {branch_size}px;
-    height: {branch_size}px;
 }}
 
 
@@ -72,7 +72,6 @@ QHeaderView::section {{
     padding: 6px;
     border: none;
     border-bottom: 1px solid #333;
-    font-size: {font_size}px;
 }}
 
 QCheckBox {{
@@ -80,8 +79,6 @@ QCheckBox {{
 }}
 
 QCheckBox::indicator {{
-    width: {check_size}px;
-    height: {check_size}px;
     border: 2px solid #555;
     border-radius: 4px;
 }}
@@ -95,15 +92,33 @@ QPushButton {{
     background-color: #3A3A3A;
     color: white;
     border-radius: 4px;
-    padding: {btn_v_padding}px {btn_h_padding}px;
+    padding: 6px 12px;
     font-weight: bold;
-    font-size: {font_size}px;
 }}
 
 QPushButton:hover {{
     background-color: #4A4A4A;
 }}
 
+/* 行内启用按钮与全选按钮的状态通过动态属性选择，不再逐个控件 setStyleSheet */
+QPushButton[modState="enabled"],
+QPushButton[active="true"] {{
+    background-color: #0078D4;
+    color: white;
+}}
+
+QPushButton[modState="disabled"] {{
+    background-color: #3A3A3A;
+    color: #AAA;
+}}
+
+#PreviewLabel {{
+    background: #2d2d2d;
+    border-radius: 5px;
+    color: #777;
+    border: 1px dashed #444;
+}}
+
 #btn_delete {{
     background-color: #7D0000;
 }}
@@ -120,28 +135,25 @@ QPushButton:hover {{
 
 #PathLabel {{
     color: #AAA;
-    font-size: {small_font}px;
 }}
 
 QLineEdit {{
-    padding: {btn_v_padding}px;
+    padding: 6px;
     background-color: #2D2D2D;
     color: white;
     border: 1px solid #444;
     border-radius: 5px;
-    font-size: {font_size}px;
 }}
 
 QScrollBar:vertical {{
     background: #1A1A1A;
-    width: {scroll_width}px;
     margin: 0px;
 }}
 
 QScrollBar::handle:vertical {{
     background: #4F4F4F;
     min-height: 30px;
-    border-radius: {scroll_radius}px;
+    border-radius: 4px;
     margin: 2px;
 }}
 
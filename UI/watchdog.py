@@ -0,0 +1,102 @@
+"""
+watchdog.py
+
+包含：
+- 界面事件循环卡顿监测 (StallWatchdog，QObject 子类)
+
+实现：
+- 主线程 QTimer 定时刷新心跳时间戳 (time.monotonic)
+- 后台守护线程 (threading.Thread) 周期检查心跳间隔
+- 间隔超过阈值时通过 sys._current_frames() 抓取主线程 Python 调用栈
+- 卡顿记录 (时间、持续时长、调用栈) 追加写入日志文件并打印，同时写入追踪事件
+- 事件循环恢复后再记录一次卡顿总时长
+
+说明：
+- 默认关闭；通过 config.json 的 watchdog_ms 或启动参数 --watchdog [MS] 开启
+- 必须在主线程中创建，创建时记录的线程即被监测的线程
+"""
+
+import sys
+import threading
+import time
+import traceback
+
+from PyQt6.QtCore import QObject, QTimer
+
+from core.tracing import tracer
+
+
+class StallWatchdog(QObject):
+
+    def __init__(self, threshold_ms, log_path, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self.main_ident = threading.get_ident()
+
+        self.last_beat = time.monotonic()
+        self.stall_start = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(max(10, threshold_ms // 5))
+        self.heartbeat.timeout.connect(self._beat)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.last_beat = time.monotonic()
+        self.heartbeat.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.heartbeat.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # ---------- 主线程心跳 ----------
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            stall_start = self.stall_start
+            self.stall_start = None
+            self.last_beat = now
+        if stall_start is not None:
+            self._write(f"[{self._timestamp()}] 界面事件循环已恢复，卡顿 {(now - stall_start) * 1000:.0f} ms\n")
+
+    # ---------- 监测线程 ----------
+    def _watch(self):
+        check_interval = max(0.01, self.threshold / 4)
+        while not self._stop.wait(check_interval):
+            with self._lock:
+                if self.stall_start is not None:
+                    continue
+                lag = time.monotonic() - self.last_beat
+                if lag < self.threshold:
+                    continue
+                self.stall_start = self.last_beat
+
+            frame = sys._current_frames().get(self.main_ident)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "  <无 Python 调用帧>\n"
+            tracer.instant("ui.stall", lag_ms=round(lag * 1000))
+            self._write(
+                f"[{self._timestamp()}] 界面事件循环卡顿 {lag * 1000:.0f} ms "
+                f"(阈值 {self.threshold * 1000:.0f} ms)，主线程调用栈:\n{stack}"
+            )
+
+    def _timestamp(self):
+        return time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _write(self, text):
+        print(text, end="")
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError:
+            pass
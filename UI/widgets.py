@@ -6,17 +6,28 @@ widgets.py
   (重写 initStyleOption() / setEditorData() / createEditor()
    控制文本颜色与单元格编辑行为)
 
+- 可排序的树节点 ModTreeItem
+  (排序前由 prepare_sort() 按排序列与方向把 ROLE_SORT_KEY 预先组合为一个元组，
+   __lt__() 只比较元组，不再查询表头或读取 data()；分类行始终在模组行之前并保持扫描顺序，
+   排序在模型内移动行，不重建行控件)
+
+- 缩放样式 ZoomStyle
+  (QProxyStyle，按缩放比例返回勾选框与滚动条尺寸；样式表不再包含这些尺寸，缩放时无需重设样式表)
+
 - 可拖拽预览 QLabel
   (使用 QTimer 实现悬停延迟
    重写 enterEvent() / leaveEvent()
-   实现 dragEnterEvent() / dropEvent() 处理图片拖拽)
+   实现 dragEnterEvent() / dropEvent() 处理图片拖拽，多个文件或文件夹转为批量导入
+   保存已解码的缩略图档位 QImage，缩放时直接重新缩放显示)
 """
 
+import os
+
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QColor, QPalette
-from PyQt6.QtWidgets import QLabel, QStyledItemDelegate, QLineEdit
+from PyQt6.QtGui import QColor, QPalette, QPixmap
+from PyQt6.QtWidgets import QLabel, QStyledItemDelegate, QLineEdit, QTreeWidgetItem, QProxyStyle, QStyle
 
-from constants import COL_CAT, ROLE_ITEM_TYPE
+from constants import COL_CAT, ROLE_ITEM_TYPE, ROLE_REL_PATH, ROLE_SORT_KEY, ROOT_FOLDER
 
 
 class CustomDelegate(QStyledItemDelegate):
@@ -51,12 +62,10 @@ class CustomDelegate(QStyledItemDelegate):
             return None
 
         col = index.column()
-        i18n = self.parent().window().i18n
         item_type = item.data(COL_CAT, ROLE_ITEM_TYPE)
 
         if item_type == "folder":
-            cat_text = item.text(COL_CAT).replace("📂 ", "").strip()
-            if col != COL_CAT or cat_text == i18n.t("cat_uncategorized"):
+            if col != COL_CAT or item.data(COL_CAT, ROLE_REL_PATH) == ROOT_FOLDER:
                 return None
 
         elif item_type == "file":
@@ -70,6 +79,53 @@ class CustomDelegate(QStyledItemDelegate):
         return QLineEdit(parent)
 
 
+# =========================
+# Sortable Tree Item
+# =========================
+class ModTreeItem(QTreeWidgetItem):
+
+    # 尚未参与过排序的行 (排序后新建的行) 使用默认值
+    sort_tuple = (0, 0, 0)
+
+    def prepare_sort(self, col, descending):
+        # 降序时 Qt 交换参数比较，结果整体反转：分类行的分组值与顺序号随方向取反，
+        # 使分类行在两种方向下都位于模组行之前，且分类行与相同键的行都保持扫描顺序
+        order = self.data(COL_CAT, ROLE_SORT_KEY) or 0
+        if self.data(COL_CAT, ROLE_ITEM_TYPE) == "folder":
+            self.sort_tuple = (1, 0, -order) if descending else (0, 0, order)
+            return
+        key = self.data(col, ROLE_SORT_KEY)
+        if key is None:
+            key = 0
+        self.sort_tuple = (0, key, -order) if descending else (1, key, order)
+
+    def __lt__(self, other):
+        return self.sort_tuple < other.sort_tuple
+
+
+# =========================
+# Zoom Style
+# =========================
+class ZoomStyle(QProxyStyle):
+
+    # 缩放 1.0 时的尺寸 (像素)
+    BASE_METRICS = {
+        QStyle.PixelMetric.PM_IndicatorWidth: 20,
+        QStyle.PixelMetric.PM_IndicatorHeight: 20,
+        QStyle.PixelMetric.PM_ScrollBarExtent: 12,
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.zoom = 1.0
+
+    def pixelMetric(self, metric, option=None, widget=None):
+        base = self.BASE_METRICS.get(metric)
+        if base is not None:
+            return int(base * self.zoom)
+        return super().pixelMetric(metric, option, widget)
+
+
 # =========================
 # Drop Preview Label
 # =========================
@@ -81,15 +137,16 @@ class DropLabel(QLabel):
         self.pak_name = pak_name
         self.rel_dir = rel_dir
         self.mgr = parent_mgr
+        self.thumb_image = None
+        self.thumb_tier = 0
+        self.requested_tier = 0
+        # 尚未完成的缩略图任务编号 (见 ModManager3.thumb_tasks)
+        self.pending_tid = None
+        self.tree_item = None
 
         self.setAcceptDrops(True)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.setStyleSheet(
-            "background: #2d2d2d; "
-            "border-radius: 5px; "
-            "color: #777; "
-            "border: 1px dashed #444;"
-        )
+        self.setObjectName("PreviewLabel")
 
         # ---------- 悬停定时器 ----------
         from constants import HOVER_DELAY_MS
@@ -103,6 +160,27 @@ class DropLabel(QLabel):
             )
         )
 
+    # ---------- 缩略图 ----------
+    def set_thumb(self, image, tier):
+        self.thumb_image = image
+        self.thumb_tier = tier
+
+    def show_thumb(self, size, ready=None):
+        # ready 为工作线程已缩放到 size 的图片，直接转换显示，不在界面线程缩放
+        if ready is not None and not ready.isNull():
+            self.setPixmap(QPixmap.fromImage(ready))
+            self.setText("")
+            return
+        if self.thumb_image is None or self.thumb_image.isNull():
+            return
+        pix = QPixmap.fromImage(self.thumb_image).scaled(
+            size, size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.setPixmap(pix)
+        self.setText("")
+
     # ---------- 鼠标事件 ----------
     def enterEvent(self, event):
         from constants import HOVER_DELAY_MS
@@ -119,9 +197,14 @@ class DropLabel(QLabel):
 
     def dropEvent(self, event):
         urls = event.mimeData().urls()
-        if urls:
+        paths = [u.toLocalFile() for u in urls]
+        # 多个文件或文件夹按批量导入处理，按名称匹配到各自的模组
+        if len(paths) > 1 or (paths and os.path.isdir(paths[0])):
+            self.mgr.bulk_import_previews(paths)
+        elif urls:
             self.mgr.handle_img_drop(
                 self.pak_name,
                 self.rel_dir,
-                urls[0].toLocalFile()
+                urls[0].toLocalFile(),
+                self
             )
\ No newline at end of file
@@ -0,0 +1,499 @@
+"""
+run_benchmarks.py
+
+包含：
+- 合成模组库上的性能基准 (扫描 / pak 索引冲突 / 建树 / 缩略图 / 搜索过滤 / 批量复制)
+- 缩略图解码方式对比 (单线程池 / 读取与解码分池 / 子进程解码)
+- 内存文件系统上的大规模基准 (扫描 / 启用禁用 / 移动 / 重命名 / 删除) 与故障注入后的残留文件检查
+- 行内控件样式 polish 耗时 (逐控件 setStyleSheet 与动态属性选择器对比；缩放时重设样式表与 ZoomStyle + 字体对比)
+- 结果写入 JSON，并可与保存的基线结果比较
+
+用法 (在仓库根目录执行)：
+    python -m benchmarks.run_benchmarks --mods 5000 --output bench_results.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline bench_baseline.json
+    python -m benchmarks.run_benchmarks --only memfs --memfs-mods 100000 --memfs-latency-us 20
+
+说明：
+- 界面相关项目使用 Qt offscreen 平台运行，未安装 PyQt6 / PIL 时对应项目记为 skipped
+- 每个项目重复 --repeat 次，value 取中位数，samples 保留全部样本
+- 与基线比较时，变差超过 --tolerance (默认 10%) 的项目记为回归，退出码为 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from constants import VERSION
+from core.mod_manager import ModManagerCore
+from core.fs_backend import MemoryFileSystem
+from core.journal import BatchJournal, plan_batch_steps, run_journaled
+from core.pak_index import PakIndexCache, scan_asset_conflicts
+from core.asset_index import AssetSearchIndex
+from benchmarks.synthetic_repo import generate_repository, populate_memory_repository
+
+
+def _record(results, name, samples, unit="s", better="lower"):
+    results[name] = {
+        "value": statistics.median(samples),
+        "unit": unit,
+        "better": better,
+        "samples": samples,
+    }
+
+
+def _timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# =========================
+# 核心层
+# =========================
+def bench_scan(results, repo, workdir, repeat):
+    core = ModManagerCore(repo, "")
+    _record(results, "core.scan_repository", _timed(core.scan_repository, repeat))
+    _record(results, "core.list_all_mods", _timed(core.list_all_mods, repeat))
+
+    mods = core.list_all_mods()
+    cache_path = os.path.join(workdir, "pak_index_cache.json")
+
+    def cold():
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        scan_asset_conflicts(core, mods, PakIndexCache(cache_path))
+
+    _record(results, "pak.asset_conflicts_cold", _timed(cold, repeat))
+    _record(results, "pak.asset_conflicts_warm",
+            _timed(lambda: scan_asset_conflicts(core, mods, PakIndexCache(cache_path)), repeat))
+
+    cache = PakIndexCache(cache_path)
+    index = AssetSearchIndex(os.path.join(workdir, "asset_index.json"))
+    index.update(core, mods, cache)
+    queries = ["m000123", "mods/m0001", "asset_1.uasset", "zzz-no-match", "m00012 asset_3"]
+    samples = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            index.search(q, cache)
+            samples.append(time.perf_counter() - start)
+    _record(results, "pak.asset_search", samples)
+
+
+def bench_copy(results, workdir, repeat, copy_files, copy_mb):
+    src_dir = os.path.join(workdir, "copy_src")
+    game_dir = os.path.join(workdir, "copy_game")
+    os.makedirs(src_dir, exist_ok=True)
+
+    block = os.urandom(1024 * 1024)
+    mods = []
+    for i in range(copy_files):
+        name = f"copy_{i:03d}_P.pak"
+        with open(os.path.join(src_dir, name), "wb") as f:
+            for _ in range(copy_mb):
+                f.write(block)
+        mods.append(("", name))
+
+    total_mb = copy_files * copy_mb
+    journal = BatchJournal(os.path.join(workdir, "bench_journal.jsonl"))
+    samples = []
+    for _ in range(repeat):
+        shutil.rmtree(game_dir, ignore_errors=True)
+        os.makedirs(game_dir)
+        steps = plan_batch_steps(src_dir, mods, True)
+        start = time.perf_counter()
+        run_journaled(journal, game_dir, steps)
+        samples.append(total_mb / (time.perf_counter() - start))
+    _record(results, "batch.copy_throughput", samples, unit="MB/s", better="higher")
+
+
+# =========================
+# 内存文件系统
+# =========================
+def bench_memfs(results, repeat, mods, ops, latency_us, fault_rate, seed):
+    fs = MemoryFileSystem(seed=seed)
+    populate_memory_repository(fs, "/repo", mods=mods, seed=seed)
+    fs.add_dir("/game")
+    if latency_us:
+        fs.set_latency("*", latency_us / 1e6)
+    core = ModManagerCore("/repo", "/game", fs=fs)
+
+    _record(results, "memfs.list_all_mods", _timed(core.list_all_mods, repeat))
+    sample = core.list_all_mods()[:ops]
+
+    def toggle():
+        for rel, pak in sample:
+            src = os.path.join("/repo", rel, pak)
+            core.toggle_mod(src, pak, False)
+            core.toggle_mod(src, pak, True)
+
+    _record(results, f"memfs.toggle_{len(sample)}", _timed(toggle, repeat))
+
+    # 同名冲突的模组移入同一目录会失败，移动及之后的测试只取名称唯一的模组
+    unique = {}
+    for rel, pak in sample:
+        unique.setdefault(pak, rel)
+    sample = [(rel, pak) for pak, rel in unique.items()]
+
+    def move_and_back():
+        fs.makedirs("/repo/Moved", exist_ok=True)
+        for rel, pak in sample:
+            core.move_mod(rel, pak, "Moved")
+        for rel, pak in sample:
+            core.move_mod("Moved", pak, rel)
+
+    _record(results, f"memfs.move_{len(sample)}", _timed(move_and_back, repeat))
+
+    def rename_and_back():
+        for rel, pak in sample:
+            core.rename_mod(rel, pak, "r_" + pak)
+        for rel, pak in sample:
+            core.rename_mod(rel, "r_" + pak, pak)
+
+    _record(results, f"memfs.rename_{len(sample)}", _timed(rename_and_back, repeat))
+
+    # 故障注入：复制与替换按概率失败，失败的启用操作不应在游戏目录留下 .part 或半成品
+    fs.set_latency("*", 0)
+    fs.inject_fault("copy", "/game/*", times=None, rate=fault_rate)
+    fs.inject_fault("replace", "/game/*", times=None, rate=fault_rate)
+    failed = 0
+    for rel, pak in sample:
+        try:
+            core.toggle_mod(os.path.join("/repo", rel, pak), pak, False)
+        except RuntimeError:
+            failed += 1
+    fs.clear_faults()
+    leftovers = [name for name in fs.listdir("/game") if name.endswith(".part")]
+    deployed = len(fs.listdir("/game")) - len(leftovers)
+    _record(results, "memfs.fault_failed_toggles", [failed], unit="ops", better="lower")
+    _record(results, "memfs.fault_leftover_parts", [len(leftovers)], unit="files", better="lower")
+    if deployed + failed != len(sample):
+        raise RuntimeError(f"memfs fault run inconsistent: {deployed} deployed + {failed} failed != {len(sample)}")
+
+    def delete():
+        for rel, pak in sample:
+            core.delete_mod(rel, pak)
+
+    _record(results, f"memfs.delete_{len(sample)}", _timed(delete, 1))
+    print(f"memfs calls: {dict(fs.calls)}")
+
+
+# =========================
+# 界面层 (Qt offscreen)
+# =========================
+def _qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def bench_thumbnails(results, repo, repeat):
+    import PIL  # noqa: F401  缺少 PIL 时 worker 只会回传空图，结果没有意义
+    app = _qt_app()
+    from PyQt6.QtCore import QThreadPool
+    from core.workers import ImageLoadWorker, ImageReadWorker, ThumbnailQueue
+    from core.image_decode import ProcessDecoder
+
+    images = []
+    for dirpath, _, files in os.walk(repo):
+        images.extend(os.path.join(dirpath, f) for f in files if f.endswith(".png"))
+    if not images:
+        return
+
+    pool = QThreadPool()
+    io_pool, decode_pool = QThreadPool(), QThreadPool()
+    io_pool.setMaxThreadCount(2)
+    decode_pool.setMaxThreadCount(max(1, (os.cpu_count() or 2) - 1))
+    queue = ThumbnailQueue()
+
+    def drain():
+        received = 0
+        deadline = time.perf_counter() + 60
+        # 子进程解码的结果由回调线程放入队列，等到全部到达
+        while received < len(images) and time.perf_counter() < deadline:
+            if queue.take() is None:
+                time.sleep(0.001)
+                continue
+            received += 1
+        app.processEvents()
+        if received != len(images):
+            raise RuntimeError(f"thumbnail results lost: {received} / {len(images)}")
+
+    def measure(name, submit, wait):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tasks = [submit(i, path) for i, path in enumerate(images)]
+            wait()
+            drain()
+            samples.append(len(images) / (time.perf_counter() - start))
+            del tasks
+        _record(results, name, samples, unit="img/s", better="higher")
+
+    def split_wait():
+        io_pool.waitForDone()
+        decode_pool.waitForDone()
+
+    def split_submit(decoder):
+        def submit(i, path):
+            task = ImageReadWorker(path, os.path.basename(path)[:-4], str(i), queue, decode_pool,
+                                   process_decoder=decoder)
+            io_pool.start(task)
+            return task
+        return submit
+
+    measure("worker.image_load_throughput",
+            lambda i, path: pool.start(ImageLoadWorker(path, os.path.basename(path)[:-4], str(i), queue)),
+            pool.waitForDone)
+    measure("worker.image_split_pool_throughput", split_submit(None), split_wait)
+
+    decoder = ProcessDecoder()
+    try:
+        measure("worker.image_process_decode_throughput", split_submit(decoder), split_wait)
+    finally:
+        decoder.shutdown()
+
+
+def bench_window(results, repo, workdir, repeat):
+    app = _qt_app()
+    game_dir = os.path.join(workdir, "ui_game")
+    os.makedirs(game_dir, exist_ok=True)
+
+    # 窗口会在当前目录读写 config.json
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from UI import ModManager3
+        win = ModManager3()
+        win.resize(1200, 850)
+        win.repo_path, win.game_path = repo, game_dir
+
+        def refresh():
+            win.refresh_data()
+            win.io_pool.waitForDone()
+            win.decode_pool.waitForDone()
+            win.thread_pool.waitForDone()
+            app.processEvents()
+
+        _record(results, "ui.refresh_data", _timed(refresh, repeat))
+
+        queries = ["mod_00", "category 01", "_p.pak", "zzz-no-match", ""]
+        samples = []
+        for _ in range(repeat):
+            for q in queries:
+                start = time.perf_counter()
+                win.search_bar.setText(q)
+                samples.append(time.perf_counter() - start)
+        _record(results, "ui.filter_list", samples)
+
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+    finally:
+        os.chdir(cwd)
+
+
+def bench_polish(results, repeat, rows):
+    app = _qt_app()
+    from PyQt6.QtGui import QFont
+    from PyQt6.QtWidgets import QApplication, QTreeWidget, QTreeWidgetItem, QPushButton
+    from UI.styles import STYLE_TEMPLATE, ICON_CLOSED_PATH, ICON_OPEN_PATH
+    from UI.widgets import ZoomStyle
+    from constants import COL_ACTION
+
+    # 与主窗口 (ModManager3.__init__ / apply_zoom) 相同：应用级 ZoomStyle + 与缩放无关的样式表
+    zoom_style = ZoomStyle()
+    QApplication.setStyle(zoom_style)
+    qss = STYLE_TEMPLATE.format(branch_closed=ICON_CLOSED_PATH, branch_open=ICON_OPEN_PATH)
+
+    def build(style_button):
+        tree = QTreeWidget()
+        tree.setColumnCount(COL_ACTION + 1)
+        tree.setStyleSheet(qss)
+        buttons = []
+        for i in range(rows):
+            item = QTreeWidgetItem(tree)
+            btn = QPushButton("ON")
+            style_button(btn, i % 2 == 0)
+            tree.setItemWidget(item, COL_ACTION, btn)
+            buttons.append(btn)
+        return tree, buttons
+
+    def per_widget_qss(btn, en):
+        btn.setStyleSheet("background-color: #0078D4;" if en else "background-color: #3A3A3A; color: #AAA;")
+
+    def dynamic_property(btn, en):
+        btn.setProperty("modState", "enabled" if en else "disabled")
+
+    for name, style_button in (("per_widget_qss", per_widget_qss), ("dynamic_property", dynamic_property)):
+        samples = []
+        for _ in range(repeat):
+            tree, buttons = build(style_button)
+            start = time.perf_counter()
+            for btn in buttons:
+                btn.ensurePolished()
+            samples.append(time.perf_counter() - start)
+            tree.deleteLater()
+            app.processEvents()
+        _record(results, f"ui.polish_{rows}_rows.{name}", samples)
+
+    # 缩放一步：旧做法把字号写入样式表并重设 (整棵树重新 polish)；现做法只改 ZoomStyle 与字体
+    def zoom_by_stylesheet(tree, zoom):
+        tree.setStyleSheet(qss + f"QWidget {{ font-size: {int(14 * zoom)}px; }}")
+
+    def zoom_by_font(tree, zoom):
+        zoom_style.zoom = zoom
+        font = QFont(tree.font())
+        font.setPixelSize(int(14 * zoom))
+        tree.setFont(font)
+
+    for name, zoom_step in (("stylesheet", zoom_by_stylesheet), ("font", zoom_by_font)):
+        samples = []
+        tree, buttons = build(dynamic_property)
+        for btn in buttons:
+            btn.ensurePolished()
+        for i in range(repeat):
+            start = time.perf_counter()
+            zoom_step(tree, 1.1 if i % 2 == 0 else 1.0)
+            for btn in buttons:
+                btn.ensurePolished()
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+        zoom_style.zoom = 1.0
+        tree.deleteLater()
+        app.processEvents()
+        _record(results, f"ui.zoom_{rows}_rows.{name}", samples)
+
+
+# =========================
+# 基线比较
+# =========================
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"{'benchmark':<34} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base or base.get("skipped") or cur.get("skipped"):
+            continue
+        if not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = change > tolerance if cur["better"] == "lower" else change < -tolerance
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<34} {base['value']:>12.4f} {cur['value']:>12.4f} {change * 100:>+8.1f}%{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Snowbreak Mod Manager benchmarks")
+    parser.add_argument("--mods", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=2, choices=[0, 1, 2])
+    parser.add_argument("--collision-rate", type=float, default=0.02)
+    parser.add_argument("--pak-size", type=int, default=4096, help="每个合成 pak 的字节数")
+    parser.add_argument("--preview-rate", type=float, default=0.5)
+    parser.add_argument("--preview-size", type=int, default=256)
+    parser.add_argument("--copy-files", type=int, default=8)
+    parser.add_argument("--copy-mb", type=int, default=32, help="批量复制测试中每个文件的大小 (MB)")
+    parser.add_argument("--polish-rows", type=int, default=2000, help="polish 测试中的行数")
+    parser.add_argument("--memfs-mods", type=int, default=100000, help="内存文件系统测试中的模组数")
+    parser.add_argument("--memfs-ops", type=int, default=1000, help="内存文件系统测试中启用 / 移动 / 重命名 / 删除的模组数")
+    parser.add_argument("--memfs-latency-us", type=float, default=0, help="内存文件系统每次操作的模拟延迟 (微秒)")
+    parser.add_argument("--memfs-fault-rate", type=float, default=0.1, help="故障注入测试中复制 / 替换失败的概率")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="只运行指定项目：scan copy memfs thumbnails window polish")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="与该 JSON 基线比较")
+    parser.add_argument("--save-baseline", metavar="PATH", help="同时把结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时目录")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    only = set(args.only or ["scan", "copy", "memfs", "thumbnails", "window", "polish"])
+
+    workdir = tempfile.mkdtemp(prefix="smm_bench_")
+    repo = os.path.join(workdir, "repo")
+    results = {}
+    try:
+        start = time.perf_counter()
+        repo_stats = generate_repository(
+            repo,
+            mods=args.mods,
+            max_depth=args.depth,
+            collision_rate=args.collision_rate,
+            pak_size=args.pak_size,
+            preview_rate=args.preview_rate,
+            preview_size=args.preview_size,
+            seed=args.seed,
+        )
+        print(f"generated {repo_stats} in {time.perf_counter() - start:.1f}s -> {repo}")
+
+        suites = [
+            ("scan", lambda: bench_scan(results, repo, workdir, args.repeat)),
+            ("copy", lambda: bench_copy(results, workdir, args.repeat, args.copy_files, args.copy_mb)),
+            ("memfs", lambda: bench_memfs(results, args.repeat, args.memfs_mods, args.memfs_ops,
+                                          args.memfs_latency_us, args.memfs_fault_rate, args.seed)),
+            ("thumbnails", lambda: bench_thumbnails(results, repo, args.repeat)),
+            ("window", lambda: bench_window(results, repo, workdir, args.repeat)),
+            ("polish", lambda: bench_polish(results, args.repeat, args.polish_rows)),
+        ]
+        for name, run in suites:
+            if name not in only:
+                continue
+            try:
+                run()
+            except ImportError as e:
+                results[name] = {"skipped": f"missing dependency: {e.name}"}
+            print(f"{name}: done")
+    finally:
+        if args.keep:
+            print(f"kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "version": VERSION,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "save_baseline", "keep")},
+            "repo": repo_stats,
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for name, res in results.items():
+        if res.get("skipped"):
+            print(f"{name:<34} skipped ({res['skipped']})")
+        else:
+            print(f"{name:<34} {res['value']:>12.4f} {res['unit']}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+synthetic_repo.py
+
+包含：
+- 合成模组库生成器 (generate_repository)
+- 内存模组库生成器 (populate_memory_repository：写入 MemoryFileSystem，只记录文件大小，可生成 10 万级模组)
+- 纯 Python PNG 写入 (write_png，不依赖 PIL)
+- 最小 Unreal pak 写入 (write_pak，默认版本 11，带完整目录索引，数据区为填充字节；
+  version < 10 时写旧格式逐条索引，encrypted 时设置“索引已加密”标志)
+
+说明：
+- 模组分布在根目录、一级分类与二级分类中 (max_depth 取 0 / 1 / 2，与界面树层级一致)
+- collision_rate 比例的模组复用其它分类中已有的文件名，用于触发同名冲突
+- preview_rate 比例的模组带有同名 .png 预览图
+- 每个 pak 含 assets_per_mod 个资源路径，asset_overlap_rate 比例的模组额外覆盖一个其它模组的资源
+- 相同参数与 seed 生成的目录结构完全一致，便于与基线结果比较
+"""
+
+import os
+import random
+import struct
+import zlib
+
+
+def _png_chunk(tag, data):
+    return (
+        struct.pack(">I", len(data))
+        + tag
+        + data
+        + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+    )
+
+
+def write_png(path, width, height, rng):
+    r, g, b = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+    rows = []
+    for y in range(height):
+        # 每行颜色不同，解码时不会因整图纯色而走捷径
+        rows.append(b"\x00" + bytes(((r + y) % 256, (g + y * 3) % 256, b)) * width)
+
+    data = (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(b"".join(rows), 1))
+        + _png_chunk(b"IEND", b"")
+    )
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _fstring(s):
+    data = s.encode("utf-8") + b"\x00"
+    return struct.pack("<i", len(data)) + data
+
+
+def _legacy_index(mount_point, assets, version):
+    index = _fstring(mount_point) + struct.pack("<i", len(assets))
+    for asset in assets:
+        index += _fstring(asset) + struct.pack("<qqqI", 0, 0, 0, 0)   # 偏移 / 大小 / 原始大小 / 无压缩
+        if version == 1:
+            index += bytes(8)                                          # Timestamp
+        index += bytes(20)                                             # SHA1
+        if version >= 3:
+            index += b"\x00" + struct.pack("<I", 0)                    # Flags + CompressionBlockSize
+    return index
+
+
+def _full_directory_index(mount_point, assets, dir_offset):
+    dirs = {}
+    for asset in assets:
+        directory, _, name = asset.rpartition("/")
+        dirs.setdefault(directory + "/" if directory else "/", []).append(name)
+
+    dir_index = struct.pack("<i", len(dirs))
+    for directory, names in dirs.items():
+        dir_index += _fstring(directory) + struct.pack("<i", len(names))
+        for i, name in enumerate(names):
+            dir_index += _fstring(name) + struct.pack("<i", i)
+
+    index_offset = dir_offset + len(dir_index)
+    index = (
+        _fstring(mount_point)
+        + struct.pack("<iQ", len(assets), 0)
+        + struct.pack("<I", 0)                                         # 无 PathHashIndex
+        + struct.pack("<Iqq", 1, dir_offset, len(dir_index)) + bytes(20)
+        + struct.pack("<i", 0)                                         # 编码条目
+        + struct.pack("<i", 0)                                         # 未编码条目
+    )
+    return dir_index, index_offset, index
+
+
+def write_pak(path, mount_point, assets, payload, version=11, encrypted=False):
+    if version < 10:
+        index_offset = len(payload)
+        index = _legacy_index(mount_point, assets, version)
+        dir_index = b""
+    else:
+        dir_index, index_offset, index = _full_directory_index(mount_point, assets, len(payload))
+
+    footer = b""
+    if version >= 7:
+        footer += bytes(16) + (b"\x01" if encrypted else b"\x00")    # 加密密钥 GUID + 索引已加密
+    footer += struct.pack("<Iiqq", 0x5A6F12E1, version, index_offset, len(index)) + bytes(20)
+    if version >= 8:
+        footer += bytes(32 * 5)                                        # 压缩方式名称
+    with open(path, "wb") as f:
+        f.write(payload)
+        f.write(dir_index)
+        f.write(index)
+        f.write(footer)
+
+
+def generate_repository(
+    root,
+    mods=5000,
+    max_depth=2,
+    collision_rate=0.02,
+    pak_size=4096,
+    preview_rate=0.5,
+    preview_size=256,
+    seed=0,
+    assets_per_mod=4,
+    asset_overlap_rate=0.02,
+):
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    folders = [""]
+    if max_depth >= 1:
+        top_count = max(1, int(mods ** 0.5) // 2)
+        for i in range(top_count):
+            top = f"Category {i:03d}"
+            folders.append(top)
+            if max_depth >= 2:
+                for j in range(rng.randrange(0, 4)):
+                    folders.append(os.path.join(top, f"Sub {j}"))
+    for rel in folders:
+        os.makedirs(os.path.join(root, rel), exist_ok=True)
+
+    payload = rng.randbytes(pak_size)
+    used = []
+    stats = {"mods": 0, "previews": 0, "collisions": 0, "asset_overlaps": 0,
+             "folders": len(folders) - 1, "bytes": 0}
+
+    for i in range(mods):
+        rel = rng.choice(folders)
+        if used and rng.random() < collision_rate:
+            name = rng.choice(used)
+            if os.path.exists(os.path.join(root, rel, name)):
+                name = f"mod_{i:06d}_P.pak"
+            else:
+                stats["collisions"] += 1
+        else:
+            name = f"mod_{i:06d}_P.pak"
+            used.append(name)
+
+        pak_path = os.path.join(root, rel, name)
+        assets = [f"Content/Mods/M{i:06d}/Asset_{k}.uasset" for k in range(assets_per_mod)]
+        if i and assets_per_mod and rng.random() < asset_overlap_rate:
+            assets.append(f"Content/Mods/M{rng.randrange(i):06d}/Asset_0.uasset")
+            stats["asset_overlaps"] += 1
+        write_pak(pak_path, "../../../Game/", assets, payload)
+        stats["mods"] += 1
+        stats["bytes"] += os.path.getsize(pak_path)
+
+        if rng.random() < preview_rate:
+            write_png(pak_path[:-4] + ".png", preview_size, preview_size, rng)
+            stats["previews"] += 1
+
+    return stats
+
+
+def populate_memory_repository(fs, root, mods=100000, max_depth=2, collision_rate=0.02,
+                               pak_size=4096, preview_rate=0.5, seed=0):
+    """与 generate_repository 相同的目录结构与命名规则，文件只有大小没有内容。"""
+    rng = random.Random(seed)
+    fs.add_dir(root)
+
+    folders = [""]
+    if max_depth >= 1:
+        top_count = max(1, int(mods ** 0.5) // 2)
+        for i in range(top_count):
+            top = f"Category {i:03d}"
+            folders.append(top)
+            if max_depth >= 2:
+                for j in range(rng.randrange(0, 4)):
+                    folders.append(os.path.join(top, f"Sub {j}"))
+    for rel in folders:
+        fs.add_dir(os.path.join(root, rel))
+
+    used = []
+    existing = set()
+    stats = {"mods": 0, "previews": 0, "collisions": 0, "folders": len(folders) - 1}
+    for i in range(mods):
+        rel = rng.choice(folders)
+        if used and rng.random() < collision_rate:
+            name = rng.choice(used)
+            if (rel, name) in existing:
+                name = f"mod_{i:06d}_P.pak"
+            else:
+                stats["collisions"] += 1
+        else:
+            name = f"mod_{i:06d}_P.pak"
+            used.append(name)
+
+        existing.add((rel, name))
+        pak_path = os.path.join(root, rel, name)
+        fs.add_file(pak_path, pak_size)
+        stats["mods"] += 1
+        if rng.random() < preview_rate:
+            fs.add_file(pak_path[:-4] + ".png", pak_size // 4)
+            stats["previews"] += 1
+    return stats
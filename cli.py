@@ -0,0 +1,511 @@
+"""
+cli.py
+
+包含：
+- 无界面命令行入口 (argparse 子命令)
+- scan / list / enable / disable / move / conflicts / dedup / mirror / verify / profile / target / journal
+- JSON 结果输出 (stdout) 与退出码 (0 成功 / 1 部分失败 / 2 参数错误：argparse 用法错误与 CliError，
+  如路径无效、模组标识无法识别、缺少方案名称等)
+
+说明：
+- 仅导入 core.mod_manager 与 config，不加载 PyQt6 / PIL，便于启动器与定时任务调用
+- 路径默认读取 config.json，可用 --repo / --game 覆盖；--target 选用配置中的其它部署目标 (不改变当前目标)
+- 模组标识写作 "分类/子分类/名称.pak"；根目录模组直接写 "名称.pak"
+- 仅写名称时按名称匹配，名称在仓库中重复时需写完整路径
+- 启用 / 禁用 / 方案切换写入批量操作日志 (与 config.json 同目录)，中断后可用 journal resume 继续
+- conflicts --assets 额外读取各 pak 索引，列出被不同模组同时覆盖的游戏资源 (索引缓存与 config.json 同目录)
+- list --asset 按 pak 内的资源路径过滤，资源搜索索引与 config.json 同目录并增量更新
+- dedup 把内容相同的 pak 替换为指向同一份文件的 reflink / 硬链接 (--dry-run 只报告)
+- mirror 按清单把模组库增量备份到指定目录 (未指定时使用上次的备份目录)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from config import ConfigManager
+from constants import (CONFIG_FILE, JOURNAL_FILE, PAK_INDEX_CACHE_FILE, ASSET_INDEX_FILE,
+                       HASH_CACHE_FILE, VERSION)
+from core.mod_manager import ModManagerCore, mod_key, split_mod_key, set_deploy_links
+from core.profiles import enabled_mod_keys, plan_profile_switch, apply_profile_switch
+from core.move import plan_moves, move_units
+from core.journal import (BatchJournal, run_journaled, resume_journal, discard_journal,
+                          pending_step_count)
+
+
+class CliError(Exception):
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+
+def _split_mod_id(mod_id):
+    rel, pak = split_mod_key(mod_id)
+    if not pak.lower().endswith(".pak"):
+        pak += ".pak"
+    return rel, pak
+
+
+def _resolve(mods, mod_ids):
+    by_name = {}
+    for rel, pak in mods:
+        by_name.setdefault(pak, []).append((rel, pak))
+    mod_set = set(mods)
+
+    resolved, missing, ambiguous = [], [], []
+    for mod_id in mod_ids:
+        rel, pak = _split_mod_id(mod_id)
+        if "/" in mod_id.replace("\\", "/").strip("/"):
+            if (rel, pak) in mod_set:
+                resolved.append((rel, pak))
+            else:
+                missing.append(mod_id)
+            continue
+
+        candidates = by_name.get(pak, [])
+        if len(candidates) == 1:
+            resolved.append(candidates[0])
+        elif not candidates:
+            missing.append(mod_id)
+        else:
+            ambiguous.append({"id": mod_id, "candidates": [mod_key(r, p) for r, p in candidates]})
+
+    if missing or ambiguous:
+        raise CliError("无法识别的模组标识", missing=missing, ambiguous=ambiguous)
+    return resolved
+
+
+def _read_ids(args):
+    ids = list(args.mods)
+    if args.from_file:
+        try:
+            stream = sys.stdin if args.from_file == "-" else open(args.from_file, encoding="utf-8")
+            with stream:
+                ids.extend(line.strip() for line in stream if line.strip())
+        except (OSError, UnicodeDecodeError) as e:
+            raise CliError(f"无法读取模组列表: {e}")
+    return ids
+
+
+def _require_paths(core, need_game=True):
+    if not core.repo_path or not os.path.isdir(core.repo_path):
+        raise CliError(f"模组库路径无效: {core.repo_path!r}")
+    if need_game and (not core.game_path or not os.path.isdir(core.game_path)):
+        raise CliError(f"游戏 Pak 路径无效: {core.game_path!r}")
+
+
+# =========================
+# 子命令
+# =========================
+def cmd_scan(core, cfg, args):
+    _require_paths(core, need_game=False)
+    start = time.perf_counter()
+    mods = core.list_all_mods()
+    elapsed = time.perf_counter() - start
+
+    game_files = core.get_game_files()
+    folders = sorted({rel for rel, _ in mods if rel})
+    return {
+        "repo": core.repo_path,
+        "game": core.game_path,
+        "mods": len(mods),
+        "folders": len(folders),
+        "enabled": sum(1 for _, pak in mods if pak in game_files),
+        "conflicts": len(core.find_name_conflicts(mods)),
+        "new": sum(1 for _, pak in mods if pak not in cfg.known_mods),
+        "scan_ms": round(elapsed * 1000, 2),
+    }
+
+
+def cmd_list(core, cfg, args):
+    _require_paths(core, need_game=False)
+    mods = core.list_all_mods()
+    game_files = core.get_game_files()
+    conflicts = core.find_name_conflicts(mods)
+
+    asset_matches = None
+    if args.asset:
+        from core.pak_index import PakIndexCache
+        from core.asset_index import AssetSearchIndex
+        cache = PakIndexCache(_beside_config(args, PAK_INDEX_CACHE_FILE))
+        index = AssetSearchIndex(_beside_config(args, ASSET_INDEX_FILE))
+        index.update(core, mods, cache)
+        index.save()
+        cache.save()
+        asset_matches = index.search(args.asset, cache)
+
+    rows = []
+    for rel, pak in mods:
+        if asset_matches is not None and mod_key(rel, pak) not in asset_matches:
+            continue
+        is_en = pak in game_files
+        if args.enabled and not is_en:
+            continue
+        if args.disabled and is_en:
+            continue
+        if args.folder is not None and rel.replace(os.sep, "/") != args.folder.strip("/"):
+            continue
+        rows.append({
+            "id": mod_key(rel, pak),
+            "folder": rel.replace(os.sep, "/"),
+            "name": pak,
+            "enabled": is_en,
+            "conflict": pak in conflicts,
+            "known": pak in cfg.known_mods,
+        })
+    return {"mods": rows}
+
+
+def _beside_config(args, name):
+    return os.path.join(os.path.dirname(os.path.abspath(args.config)), name)
+
+
+def _journal(args):
+    return BatchJournal(_beside_config(args, JOURNAL_FILE))
+
+
+def _toggle_steps(core, targets, enable, game_files):
+    steps, skipped, seen = [], [], set()
+    for rel, pak in targets:
+        if (pak in game_files) == enable or pak in seen:
+            skipped.append(mod_key(rel, pak))
+            continue
+        seen.add(pak)
+        if enable:
+            steps.append({"op": "copy", "src": os.path.join(core.repo_path, rel, pak), "pak": pak})
+        else:
+            steps.append({"op": "remove", "pak": pak})
+        steps[-1]["key"] = mod_key(rel, pak)
+    return steps, skipped
+
+
+def _run_toggle_steps(core, cfg, args, steps):
+    completed, failed = run_journaled(_journal(args), core.game_path, steps)
+    cfg.known_mods.update(step["pak"] for step in completed)
+    cfg.save()
+    enabled = [step["key"] for step in completed if step["op"] == "copy"]
+    disabled = [step["key"] for step in completed if step["op"] == "remove"]
+    return enabled, disabled, failed
+
+
+def cmd_enable(core, cfg, args):
+    _require_paths(core)
+    mods = core.list_all_mods()
+    targets = _resolve(mods, _read_ids(args))
+
+    # 同名的两个模组会写入同一个游戏文件
+    names = {}
+    for rel, pak in targets:
+        names.setdefault(pak, []).append(mod_key(rel, pak))
+    clashes = {pak: ids for pak, ids in names.items() if len(ids) > 1}
+    if clashes:
+        raise CliError("同名模组不能同时启用", name_clash=clashes)
+
+    game_files = core.get_game_files()
+    steps = []
+    if args.exclusive:
+        keep = {pak for _, pak in targets}
+        others = [(rel, pak) for rel, pak in mods if pak not in keep]
+        steps, _ = _toggle_steps(core, others, False, game_files)
+
+    en_steps, skipped = _toggle_steps(core, targets, True, game_files)
+    enabled, disabled, failed = _run_toggle_steps(core, cfg, args, steps + en_steps)
+    return {
+        "enabled": enabled,
+        "already_enabled": skipped,
+        "disabled": disabled,
+        "failed": failed,
+    }
+
+
+def cmd_disable(core, cfg, args):
+    _require_paths(core)
+    mods = core.list_all_mods()
+    if args.all:
+        targets = mods
+    else:
+        targets = _resolve(mods, _read_ids(args))
+
+    steps, skipped = _toggle_steps(core, targets, False, core.get_game_files())
+    _, disabled, failed = _run_toggle_steps(core, cfg, args, steps)
+    return {"disabled": disabled, "already_disabled": skipped, "failed": failed}
+
+
+def cmd_move(core, cfg, args):
+    _require_paths(core, need_game=False)
+    dest_rel = args.dest.replace("\\", "/").strip("/").replace("/", os.sep)
+    if not os.path.isdir(os.path.join(core.repo_path, dest_rel)):
+        raise CliError(f"目标文件夹不存在: {args.dest!r}")
+
+    targets = _resolve(core.list_all_mods(), _read_ids(args))
+    units, failed = move_units(plan_moves(core.repo_path, targets, dest_rel))
+    for unit in units:
+        cfg.known_mods.add(unit.pak)
+    cfg.save()
+    moved = []
+    for unit in units:
+        entry = {"from": unit.key, "to": mod_key(dest_rel, unit.pak)}
+        if unit.leftovers:
+            entry["source_left"] = unit.leftovers
+        moved.append(entry)
+    return {"moved": moved, "failed": failed}
+
+
+def cmd_conflicts(core, cfg, args):
+    _require_paths(core, need_game=False)
+    mods = core.list_all_mods()
+    conflicts = core.find_name_conflicts(mods)
+    game_files = core.get_game_files()
+    result = {
+        "conflicts": [
+            {
+                "name": pak,
+                "enabled": pak in game_files,
+                "copies": [mod_key(rel, pak) for rel in rels],
+            }
+            for pak, rels in sorted(conflicts.items())
+        ]
+    }
+    if args.assets:
+        from core.pak_index import PakIndexCache, scan_asset_conflicts
+        asset_conflicts, errors = scan_asset_conflicts(
+            core, mods, PakIndexCache(_beside_config(args, PAK_INDEX_CACHE_FILE)))
+        result["asset_conflicts"] = [
+            {"asset": asset, "mods": keys} for asset, keys in sorted(asset_conflicts.items())
+        ]
+        result["unreadable"] = errors
+    return result
+
+
+def cmd_dedup(core, cfg, args):
+    _require_paths(core, need_game=False)
+    from core.dedup import HashCache, find_duplicates, apply_dedup
+    cache = HashCache(_beside_config(args, HASH_CACHE_FILE))
+    plan = find_duplicates(core, core.list_all_mods(), cache)
+    result = plan.to_dict()
+    if not args.dry_run:
+        reclaimed, linked, failed = apply_dedup(plan, cache)
+        result.update(reclaimed=reclaimed, linked=linked, failed=failed)
+    return result
+
+
+def cmd_mirror(core, cfg, args):
+    _require_paths(core, need_game=False)
+    dest = args.dest or cfg.mirror_path
+    if not dest:
+        raise CliError("缺少备份目录")
+    from core.dedup import HashCache
+    cache = HashCache(_beside_config(args, HASH_CACHE_FILE))
+    try:
+        result = core.mirror_to(os.path.abspath(dest), cache, dry_run=args.dry_run)
+    except RuntimeError as e:
+        raise CliError(str(e))
+    if args.dest and not args.dry_run:
+        cfg.mirror_path = os.path.abspath(args.dest)
+        cfg.save()
+    return result
+
+
+def cmd_verify(core, cfg, args):
+    _require_paths(core)
+    return core.verify_deployment(core.list_all_mods())
+
+
+def cmd_profile(core, cfg, args):
+    if args.action == "list":
+        return {"profiles": {name: len(keys) for name, keys in sorted(cfg.profiles.items())}}
+
+    if not args.name:
+        raise CliError("缺少方案名称")
+
+    if args.action == "delete":
+        if cfg.profiles.pop(args.name, None) is None:
+            raise CliError(f"方案不存在: {args.name!r}")
+        cfg.save()
+        return {"deleted": args.name}
+
+    if args.action == "save":
+        _require_paths(core)
+        mods = core.list_all_mods()
+        ids = _read_ids(args)
+        keys = [mod_key(rel, pak) for rel, pak in _resolve(mods, ids)] if ids else enabled_mod_keys(core, mods)
+        cfg.profiles[args.name] = keys
+        cfg.save()
+        return {"saved": args.name, "mods": keys}
+
+    # switch
+    _require_paths(core)
+    if args.name not in cfg.profiles:
+        raise CliError(f"方案不存在: {args.name!r}")
+    plan = plan_profile_switch(core, core.list_all_mods(), cfg.profiles[args.name])
+    result = plan.to_dict()
+    if args.dry_run:
+        return result
+
+    removed, deployed, failed = apply_profile_switch(core, plan, _journal(args))
+    cfg.known_mods.update(split_mod_key(key)[1] for key in deployed)
+    cfg.save()
+    result.update({"removed": removed, "deployed": deployed, "failed": failed})
+    return result
+
+
+def cmd_target(core, cfg, args):
+    if args.action == "list":
+        result = {"active": cfg.active_target, "targets": {}}
+        enabled = {}
+        if core.repo_path and os.path.isdir(core.repo_path):
+            # 仓库只扫描一次，各目标的启用状态由目录快照求交集
+            enabled = core.enabled_by_target(core.list_all_mods(), cfg.targets)
+        for name, path in sorted(cfg.targets.items()):
+            result["targets"][name] = {"path": path, "enabled": len(enabled.get(name, ()))}
+        return result
+
+    if not args.name:
+        raise CliError("缺少目标名称")
+
+    if args.action == "add":
+        if not args.path or not os.path.isdir(args.path):
+            raise CliError(f"游戏 Pak 路径无效: {args.path!r}")
+        cfg.set_target(args.name, os.path.abspath(args.path))
+        cfg.save()
+        return {"added": args.name, "path": cfg.targets[args.name], "active": cfg.active_target}
+
+    if args.name not in cfg.targets:
+        raise CliError(f"目标不存在: {args.name!r}")
+    if args.action == "remove":
+        cfg.remove_target(args.name)
+        cfg.save()
+        return {"removed": args.name, "active": cfg.active_target}
+
+    # use
+    cfg.use_target(args.name)
+    cfg.save()
+    return {"active": args.name, "path": cfg.game_path}
+
+
+def cmd_journal(core, cfg, args):
+    journal = _journal(args)
+    if not journal.exists():
+        return {"pending": 0}
+    if args.action == "status":
+        remaining, total = pending_step_count(journal)
+        return {"pending": remaining, "total": total}
+    if args.action == "discard":
+        discard_journal(journal)
+        return {"discarded": True}
+
+    completed, failed = resume_journal(journal)
+    cfg.known_mods.update(step["pak"] for step in completed)
+    cfg.save()
+    return {"resumed": [step["pak"] for step in completed], "failed": failed}
+
+
+def _add_id_args(p):
+    p.add_argument("mods", nargs="*", help="模组标识，如 分类/名称.pak")
+    p.add_argument("--from-file", metavar="PATH", help="逐行读取模组标识，- 表示标准输入")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description=f"Snowbreak Mod Manager {VERSION} (headless)")
+    parser.add_argument("--config", default=CONFIG_FILE, help="配置文件路径")
+    parser.add_argument("--repo", help="覆盖配置中的模组库路径")
+    parser.add_argument("--game", help="覆盖配置中的游戏 Pak 路径")
+    parser.add_argument("--target", metavar="NAME", help="本次使用配置中的指定部署目标")
+    parser.add_argument("--pretty", action="store_true", help="缩进输出 JSON")
+    parser.add_argument("--trace", metavar="PATH", help="启用追踪并导出 Chrome Trace JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("scan", help="扫描模组库并输出统计").set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("list", help="列出模组")
+    state = p.add_mutually_exclusive_group()
+    state.add_argument("--enabled", action="store_true")
+    state.add_argument("--disabled", action="store_true")
+    p.add_argument("--folder", help="仅列出该分类 (根目录用空字符串)")
+    p.add_argument("--asset", metavar="QUERY", help="仅列出包含匹配资源路径的模组")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("enable", help="启用模组")
+    _add_id_args(p)
+    p.add_argument("--exclusive", action="store_true", help="同时禁用其余仓库模组")
+    p.set_defaults(func=cmd_enable)
+
+    p = sub.add_parser("disable", help="禁用模组")
+    _add_id_args(p)
+    p.add_argument("--all", action="store_true", help="禁用全部仓库模组")
+    p.set_defaults(func=cmd_disable)
+
+    p = sub.add_parser("move", help="移动模组到分类")
+    p.add_argument("dest", help="目标分类，根目录用 /")
+    _add_id_args(p)
+    p.set_defaults(func=cmd_move)
+
+    p = sub.add_parser("conflicts", help="列出同名冲突")
+    p.add_argument("--assets", action="store_true", help="同时列出被多个模组覆盖的 pak 资源")
+    p.set_defaults(func=cmd_conflicts)
+
+    p = sub.add_parser("dedup", help="把内容相同的 pak 替换为链接")
+    p.add_argument("--dry-run", action="store_true", help="只列出重复组与可回收空间")
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser("mirror", help="增量备份模组库")
+    p.add_argument("dest", nargs="?", help="备份目录，省略时使用配置中的上次目录")
+    p.add_argument("--dry-run", action="store_true", help="只输出需复制 / 移动 / 删除的文件")
+    p.set_defaults(func=cmd_mirror)
+
+    sub.add_parser("verify", help="校验已启用文件与仓库是否一致").set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("profile", help="模组方案：list / save / switch / delete")
+    p.add_argument("action", choices=["list", "save", "switch", "delete"])
+    p.add_argument("name", nargs="?")
+    _add_id_args(p)
+    p.add_argument("--dry-run", action="store_true", help="switch 时仅输出差量计划")
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser("target", help="部署目标：list / add / remove / use")
+    p.add_argument("action", choices=["list", "add", "remove", "use"])
+    p.add_argument("name", nargs="?")
+    p.add_argument("path", nargs="?", help="add 时的游戏 Pak 目录")
+    p.set_defaults(func=cmd_target)
+
+    p = sub.add_parser("journal", help="未完成的批量操作：status / resume / discard")
+    p.add_argument("action", choices=["status", "resume", "discard"])
+    p.set_defaults(func=cmd_journal)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    cfg = ConfigManager(args.config)
+    cfg.load()
+    set_deploy_links(cfg.link_on_enable)
+
+    indent = 2 if args.pretty else None
+    if args.trace:
+        from core.tracing import tracer
+        tracer.enable()
+    try:
+        game_path = cfg.game_path
+        if args.target:
+            if args.target not in cfg.targets:
+                raise CliError(f"目标不存在: {args.target!r}", targets=sorted(cfg.targets))
+            game_path = cfg.targets[args.target]
+        core = ModManagerCore(args.repo or cfg.repo_path, args.game or game_path)
+        result = args.func(core, cfg, args)
+    except CliError as e:
+        print(json.dumps({"error": str(e), **e.details}, ensure_ascii=False, indent=indent))
+        return 2
+    finally:
+        # 出错时同样导出，便于查看失败前的耗时
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+
+    print(json.dumps(result, ensure_ascii=False, indent=indent))
+    return 1 if result.get("failed") or result.get("mismatch") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
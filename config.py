@@ -6,16 +6,30 @@ config.py
 import json
 import os
 
+from core.tracing import tracer
+
+DEFAULT_TARGET = "default"
+
 
 class ConfigManager:
     def __init__(self, config_file: str):
         self.config_file = config_file
         self.repo_path = ""
         self.game_path = ""
+        # 部署目标 {名称: 游戏 Pak 目录}；game_path 始终为当前目标的目录
+        self.targets = {}
+        self.active_target = ""
         self.lang = "zh_CN"
         self.folder_states = {}
         self.known_mods = set()
         self.window_size = [1200, 850]
+        self.profiles = {}
+        self.watchdog_ms = 0
+        # 屏幕外缩略图改由子进程解码时的进程数，0 为只用线程解码
+        self.decode_processes = 0
+        self.link_on_enable = True
+        self.mirror_path = ""
+        self.optional_columns = []
 
     def load(self):
         if not os.path.exists(self.config_file):
@@ -31,6 +45,47 @@ class ConfigManager:
             self.folder_states = data.get("folder_states", {})
             self.known_mods = set(data.get("known_mods", []))
 
+            watchdog_ms = data.get("watchdog_ms", 0)
+            if isinstance(watchdog_ms, int) and watchdog_ms >= 0:
+                self.watchdog_ms = watchdog_ms
+
+            decode_processes = data.get("decode_processes", 0)
+            if isinstance(decode_processes, int) and decode_processes >= 0:
+                self.decode_processes = decode_processes
+
+            targets = data.get("targets", {})
+            if isinstance(targets, dict):
+                self.targets = {str(name): path for name, path in targets.items() if isinstance(path, str)}
+            if not self.targets and self.game_path:
+                # 旧版配置只有一个游戏目录，迁移为默认目标
+                self.targets = {DEFAULT_TARGET: self.game_path}
+            active = data.get("active_target", "")
+            if active not in self.targets:
+                active = next(iter(self.targets), "")
+            self.active_target = active
+            if active:
+                self.game_path = self.targets[active]
+
+            mirror_path = data.get("mirror", "")
+            if isinstance(mirror_path, str):
+                self.mirror_path = mirror_path
+
+            optional_columns = data.get("optional_columns", [])
+            if isinstance(optional_columns, list):
+                self.optional_columns = [c for c in optional_columns if isinstance(c, str)]
+
+            link_on_enable = data.get("link_on_enable", True)
+            if isinstance(link_on_enable, bool):
+                self.link_on_enable = link_on_enable
+
+            profiles = data.get("profiles", {})
+            if isinstance(profiles, dict):
+                self.profiles = {
+                    str(name): [k for k in keys if isinstance(k, str)]
+                    for name, keys in profiles.items()
+                    if isinstance(keys, list)
+                }
+
             ws = data.get("window_size", [1200, 850])
             if (
                 isinstance(ws, list)
@@ -47,18 +102,51 @@ class ConfigManager:
         except OSError as e:
             print(f"读取配置失败: {e}")
 
+    def use_target(self, name):
+        if name not in self.targets:
+            return False
+        self.active_target = name
+        self.game_path = self.targets[name]
+        return True
+
+    def set_target(self, name, path):
+        self.targets[name] = path
+        if not self.active_target or name == self.active_target:
+            self.use_target(name)
+
+    def remove_target(self, name):
+        self.targets.pop(name, None)
+        if name == self.active_target:
+            self.active_target = ""
+            self.game_path = ""
+            self.use_target(next(iter(self.targets), ""))
+
+    @tracer.traced("config.save")
     def save(self):
+        if self.active_target:
+            self.targets[self.active_target] = self.game_path
+        elif self.game_path:
+            self.set_target(DEFAULT_TARGET, self.game_path)
         data = {
             "repo": self.repo_path,
             "game": self.game_path,
+            "targets": self.targets,
+            "active_target": self.active_target,
             "lang": self.lang,
             "folder_states": self.folder_states,
             "known_mods": list(self.known_mods),
             "window_size": self.window_size,
+            "profiles": self.profiles,
+            "watchdog_ms": self.watchdog_ms,
+            "decode_processes": self.decode_processes,
+            "link_on_enable": self.link_on_enable,
+            "mirror": self.mirror_path,
+            "optional_columns": self.optional_columns,
         }
 
         try:
             with open(self.config_file, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=4)
         except OSError as e:
+            tracer.instant("config.save_failed", error=str(e))
             print(f"保存配置失败: {e}")
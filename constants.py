@@ -1,19 +1,54 @@
-﻿from PyQt6.QtCore import Qt
-
-VERSION = "3.8.25"
+﻿VERSION = "3.8.25"
 CONFIG_FILE = "config.json"
+JOURNAL_FILE = "batch_journal.jsonl"
+STALL_LOG_FILE = "stall_log.txt"
+PAK_INDEX_CACHE_FILE = "pak_index_cache.json"
+ASSET_INDEX_FILE = "asset_index.json"
+HASH_CACHE_FILE = "hash_cache.json"
 MAX_PREVIEW_SIZE = 585
 HOVER_DELAY_MS = 200
+# 删除后可撤销的时间 (秒)，之后暂存目录中的文件在后台清理
+DELETE_UNDO_SECONDS = 10
+# 导入预览图时的 PNG 压缩级别 (0-9)；图片已缩小到 MAX_PREVIEW_SIZE，中等级别即可兼顾体积与写入耗时
+PREVIEW_COMPRESS_LEVEL = 3
+
+# 缩略图基准边长 (缩放 1.0 时) 与解码档位；缩放时从不低于目标尺寸的档位缩小，避免重新解码
+THUMB_BASE_SIZE = 60
+THUMB_TIERS = (64, 128, 160)
+# 缩略图结果按帧分批显示：定时器间隔与每帧用于 setPixmap 的时间预算 (毫秒)
+THUMB_FRAME_MS = 16
+THUMB_FRAME_BUDGET_MS = 6
+# 缩略图读取线程数 (解码线程数为 CPU 核心数 - 1)；可见行的任务优先于屏幕外的任务
+THUMB_IO_THREADS = 2
+THUMB_PRIORITY_VISIBLE = 10
+THUMB_PRIORITY_OFFSCREEN = 0
+# 滚动 / 展开后延迟多久提升可见行缩略图任务的优先级 (毫秒)
+THUMB_PRIORITIZE_DELAY_MS = 50
 
 COL_CAT = 0
 COL_CHECK = 1
 COL_PREVIEW = 2
 COL_NAME = 3
 COL_ACTION = 4
+# 其它部署目标中的启用状态，仅在配置了多个目标时显示
+COL_TARGETS = 5
+# 可选列：大小与修改时间，由表头右键菜单显示 / 隐藏
+COL_SIZE = 6
+COL_MODIFIED = 7
+OPTIONAL_COLUMNS = {"size": COL_SIZE, "modified": COL_MODIFIED}
 
 COLUMN_PROPORTIONS = [0.18, 0.05, 0.10, 0.47, 0.20]
 
-ROLE_REL_PATH = Qt.ItemDataRole.UserRole + 1
-ROLE_ITEM_TYPE = Qt.ItemDataRole.UserRole + 2
-ROLE_DEPTH = Qt.ItemDataRole.UserRole + 3
-
+# Qt.ItemDataRole.UserRole == 0x0100；此处不导入 PyQt6，命令行入口可直接复用本模块
+USER_ROLE = 0x0100
+
+# 分类行保存物理相对路径；根目录 (“未分类”) 为 ROOT_FOLDER，显示名只在建树 / 切换语言时设置
+ROOT_FOLDER = ""
+ROLE_REL_PATH = USER_ROLE + 1
+ROLE_ITEM_TYPE = USER_ROLE + 2
+ROLE_DEPTH = USER_ROLE + 3
+# 模组行保存 ModTable 中的整数编号，分类路径与名称从模组表查询
+ROLE_MOD_ID = USER_ROLE + 4
+# 各列的排序键 (大小、修改时间、是否有预览图、是否启用)；COL_CAT 上保存扫描时的逻辑排序位置
+ROLE_SORT_KEY = USER_ROLE + 5
+
@@ -1,3 +1,29 @@
 from .mod_manager import ModManagerCore
-from .workers import ImageLoadSignals, ImageLoadWorker
-from .image_utils import *
\ No newline at end of file
+
+# workers / image_utils 依赖 PyQt6 与 PIL，按需加载，避免命令行入口为此付出导入开销
+_LAZY_EXPORTS = {
+    "ImageLoadSignals": ".workers",
+    "ImageLoadWorker": ".workers",
+    "ImageReadWorker": ".workers",
+    "ImageDecodeWorker": ".workers",
+    "ThumbnailQueue": ".workers",
+    "PreviewImportWorker": ".workers",
+    "AssetConflictWorker": ".workers",
+    "MoveWorker": ".workers",
+    "DedupScanWorker": ".workers",
+    "MirrorWorker": ".workers",
+    "pil_to_qimage": ".image_utils",
+    "rgba_to_qimage": ".image_utils",
+    "decode_thumbnail": ".image_decode",
+    "ProcessDecoder": ".image_decode",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,192 @@
+"""
+asset_index.py
+
+包含：
+- pak 资源路径倒排索引 (AssetSearchIndex)：按资源路径中的词查找包含该资源的模组
+- 增量更新 (update)：只重新读取大小或修改时间变化的 pak，已删除的模组移出索引
+- 持久化 (load / save)：词表与每个模组的词编号列表保存为 JSON
+
+实现：
+- 资源路径转小写后按 / \\ _ . - 与空白切分为词，倒排表为 {词: {模组标识}}
+- 查询按空白拆成若干关键字，每个关键字再按同样规则切词；
+  每个词先在词表中做子串匹配得到候选模组 (词表远小于资源总数)，各词候选取交集
+- 关键字本身不含分隔符时词表匹配即为精确结果；否则候选模组再用 PakIndexCache 中的完整资源路径确认
+  (每个关键字都须是该模组某个资源路径的子串，资源路径以换行拼接后缓存，避免重复转小写)
+
+说明：
+- 资源路径本身只保存在 PakIndexCache 中，本索引只保存词表与编号，体积较小
+- update() 在后台线程调用，search() 在界面线程调用，内部以锁保护
+- memory_stats() 在锁内统计各表的大小，供界面的内存报告使用
+"""
+
+import json
+import os
+import re
+import threading
+
+from core.mod_manager import mod_key, PART_SUFFIX
+from core.tracing import tracer
+
+INDEX_FORMAT = 1
+
+_SPLIT = re.compile(r"[/\\_.\-\s]+")
+
+
+def tokenize(text):
+    return {t for t in _SPLIT.split(text.lower()) if t}
+
+
+class AssetSearchIndex:
+
+    def __init__(self, path):
+        self.path = path
+        self.stamps = {}
+        self.paths = {}
+        self.mod_tokens = {}
+        self.postings = {}
+        self._blobs = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def memory_stats(self):
+        """返回 [(名称, 字节数, 数量)]，供 MemoryReport.add_rows() 使用。"""
+        from core.memory import container_bytes
+        with self._lock:
+            return [
+                (name, container_bytes(table), len(table))
+                for name, table in (("asset_postings", self.postings),
+                                    ("asset_mod_tokens", self.mod_tokens),
+                                    ("asset_blobs", self._blobs))
+            ]
+
+    # ---------- 持久化 ----------
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != INDEX_FORMAT:
+                return
+            vocab = data["tokens"]
+            for key, (path, size, mtime, token_ids) in data["mods"].items():
+                self._add(key, path, (size, mtime), {vocab[i] for i in token_ids})
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            self.stamps, self.paths, self.mod_tokens, self.postings = {}, {}, {}, {}
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            vocab = sorted(self.postings)
+            ids = {t: i for i, t in enumerate(vocab)}
+            data = {
+                "format": INDEX_FORMAT,
+                "tokens": vocab,
+                "mods": {
+                    key: [self.paths[key], *self.stamps[key], sorted(ids[t] for t in tokens)]
+                    for key, tokens in self.mod_tokens.items()
+                },
+            }
+            self.dirty = False
+        part = self.path + PART_SUFFIX
+        try:
+            with open(part, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(part, self.path)
+        except OSError as e:
+            self.dirty = True
+            print(f"保存资源搜索索引失败: {e}")
+
+    # ---------- 更新 ----------
+    def _add(self, key, path, stamp, tokens):
+        self.stamps[key] = stamp
+        self.paths[key] = path
+        self.mod_tokens[key] = tokens
+        for t in tokens:
+            self.postings.setdefault(t, set()).add(key)
+
+    def _remove(self, key):
+        for t in self.mod_tokens.pop(key, ()):
+            owners = self.postings.get(t)
+            if owners is not None:
+                owners.discard(key)
+                if not owners:
+                    del self.postings[t]
+        self.stamps.pop(key, None)
+        self.paths.pop(key, None)
+        self._blobs.pop(key, None)
+
+    @tracer.traced("asset_index.update")
+    def update(self, core, mods, pak_cache):
+        """mods 为 (相对路径, pak) 列表；返回重新索引的模组数量。"""
+        current = {}
+        for rel, pak in mods:
+            current[mod_key(rel, pak)] = os.path.abspath(os.path.join(core.repo_path, rel, pak))
+
+        changed = 0
+        for key, path in current.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_size, st.st_mtime_ns)
+            if self.stamps.get(key) == stamp and self.paths.get(key) == path:
+                continue
+            try:
+                index, _ = pak_cache.get(path)
+            except OSError:
+                continue
+            tokens = set()
+            if index is not None:
+                for asset in index.assets:
+                    tokens |= tokenize(asset)
+            with self._lock:
+                self._remove(key)
+                self._add(key, path, stamp, tokens)
+                self.dirty = True
+            changed += 1
+
+        with self._lock:
+            for key in [k for k in self.stamps if k not in current]:
+                self._remove(key)
+                self.dirty = True
+        tracer.count("asset_index_reindexed", changed)
+        return changed
+
+    # ---------- 查询 ----------
+    @tracer.traced("asset_index.search")
+    def search(self, query, pak_cache=None):
+        """返回资源路径与查询匹配的模组标识集合。"""
+        terms = query.lower().split()
+        if not terms:
+            return set()
+
+        with self._lock:
+            candidates = None
+            for term in terms:
+                for token in tokenize(term):
+                    owners = set()
+                    for vocab_token, keys in self.postings.items():
+                        if token in vocab_token:
+                            owners |= keys
+                    candidates = owners if candidates is None else candidates & owners
+                    if not candidates:
+                        return set()
+            candidates = set(candidates or ())
+            paths = {key: self.paths[key] for key in candidates}
+
+        phrases = [term for term in terms if tokenize(term) != {term}]
+        if pak_cache is None or not phrases:
+            return candidates
+
+        matched = set()
+        for key, path in paths.items():
+            blob = self._blobs.get(key)
+            if blob is None:
+                entry = pak_cache.entries.get(path)
+                if not entry or "index" not in entry:
+                    continue
+                blob = self._blobs[key] = "\n".join(entry["index"]["assets"]).lower()
+            if all(term in blob for term in phrases):
+                matched.add(key)
+        return matched
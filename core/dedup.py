@@ -0,0 +1,201 @@
+"""
+dedup.py
+
+包含：
+- 文件内容哈希缓存 (HashCache)：按 (路径, 大小, 修改时间) 缓存 BLAKE2b，保存为 JSON
+- 重复内容查找 (find_duplicates)：先按大小分组，只对大小相同的 pak 计算哈希
+- 去重计划 (DedupPlan)：重复组、可回收字节数
+- 去重执行 (apply_dedup)：保留每组第一个文件，其余替换为指向它的 reflink / 硬链接
+
+说明：
+- 已经是同一 inode (此前已硬链接) 的副本不计入可回收空间，也不再处理
+- 替换时先在同目录创建 .part 链接，再 os.replace 覆盖重复文件，中断不会丢失数据
+- 硬链接要求同一文件系统；跨设备的副本记入失败列表并保持原样
+- 链接后的文件与保留文件共享修改时间，哈希缓存随之更新
+- 计划记录每个文件计算哈希时的 (大小, 修改时间)；执行前保留文件或被替换文件有任一变化 (例如扫描后被改写为同样大小的内容)
+  即跳过该文件并记入失败列表，不会把新内容替换为指向其它数据的链接
+"""
+
+import hashlib
+import json
+import os
+
+from core.mod_manager import mod_key, link_file, PART_SUFFIX
+from core.tracing import tracer
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def hash_file(path, progress=None):
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                return h.hexdigest()
+            h.update(block)
+            if progress:
+                progress(len(block))
+
+
+class HashCache:
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError):
+            pass
+
+    def get(self, path, st, progress=None):
+        path = os.path.abspath(path)
+        cached = self.entries.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            if progress:
+                progress(st.st_size)
+            return cached[2]
+        digest = hash_file(path, progress)
+        self.entries[path] = [st.st_size, st.st_mtime_ns, digest]
+        self.dirty = True
+        return digest
+
+    def save(self):
+        if not self.dirty:
+            return
+        part = self.path + PART_SUFFIX
+        try:
+            with open(part, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, separators=(",", ":"))
+            os.replace(part, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"保存哈希缓存失败: {e}")
+
+
+class DedupPlan:
+
+    def __init__(self):
+        # 每组为 [(模组标识, 绝对路径), ...]，第一个为保留的文件
+        self.groups = []
+        # {绝对路径: (大小, 修改时间 ns)}，计算哈希时的 stat 结果
+        self.stats = {}
+        self.reclaimable = 0
+        self.errors = []
+
+    @property
+    def redundant(self):
+        return sum(len(g) - 1 for g in self.groups)
+
+    def to_dict(self):
+        return {
+            "groups": [[key for key, _ in g] for g in self.groups],
+            "redundant": self.redundant,
+            "reclaimable": self.reclaimable,
+            "errors": list(self.errors),
+        }
+
+
+@tracer.traced("dedup.find_duplicates")
+def find_duplicates(core, mods, cache, progress=None):
+    """mods 为 (相对路径, pak) 列表；progress(done_bytes, total_bytes) 统计需要读取的字节数。"""
+    plan = DedupPlan()
+    by_size = {}
+    for rel, pak in mods:
+        path = os.path.join(core.repo_path, rel, pak)
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            plan.errors.append(f"{mod_key(rel, pak)}: {e}")
+            continue
+        by_size.setdefault(st.st_size, []).append((mod_key(rel, pak), path, st))
+
+    candidates = [group for size, group in by_size.items() if size > 0 and len(group) > 1]
+    total = sum(st.st_size for group in candidates for _, _, st in group)
+    done = 0
+
+    def advance(n):
+        nonlocal done
+        done += n
+        if progress:
+            progress(done, total)
+
+    for group in candidates:
+        by_hash = {}
+        for key, path, st in group:
+            try:
+                digest = cache.get(path, st, advance)
+            except OSError as e:
+                plan.errors.append(f"{key}: {e}")
+                continue
+            by_hash.setdefault(digest, []).append((key, path, st))
+            plan.stats[path] = (st.st_size, st.st_mtime_ns)
+
+        for same in by_hash.values():
+            same.sort(key=lambda x: x[0])
+            inodes = {(st.st_dev, st.st_ino) for _, _, st in same}
+            if len(inodes) < 2:
+                continue
+            plan.groups.append([(key, path) for key, path, _ in same])
+            plan.reclaimable += same[0][2].st_size * (len(inodes) - 1)
+    cache.save()
+    return plan
+
+
+@tracer.traced("dedup.apply")
+def _unchanged(plan, path, st):
+    return plan.stats.get(path) == (st.st_size, st.st_mtime_ns)
+
+
+def apply_dedup(plan, cache=None):
+    """返回 (回收的字节数, 已链接的模组标识列表, 失败说明列表)。"""
+    reclaimed, linked, failed = 0, [], []
+    for group in plan.groups:
+        _, keep_path = group[0]
+        try:
+            keep_st = os.stat(keep_path)
+            if not _unchanged(plan, keep_path, keep_st):
+                raise OSError(f"changed since scan: {keep_path}")
+        except OSError as e:
+            failed.append(f"{group[0][0]}: {e}")
+            continue
+
+        for key, path in group[1:]:
+            part = path + PART_SUFFIX
+            try:
+                st = os.stat(path)
+                if (st.st_dev, st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+                    continue
+                if not _unchanged(plan, path, st):
+                    raise OSError(f"changed since scan: {path}")
+                if os.path.exists(part):
+                    os.remove(part)
+                method = link_file(keep_path, part)
+                os.replace(part, path)
+            except OSError as e:
+                if os.path.exists(part):
+                    try:
+                        os.remove(part)
+                    except OSError:
+                        pass
+                failed.append(f"{key}: {e}")
+                continue
+
+            linked.append(key)
+            # 被替换的文件还有其它硬链接 (例如已部署到游戏目录) 时，数据仍被占用，不计入回收空间
+            if st.st_nlink == 1:
+                reclaimed += st.st_size
+            if cache is not None:
+                new_st = os.stat(path)
+                digest = cache.entries.get(os.path.abspath(keep_path), [None, None, None])[2]
+                if digest:
+                    cache.entries[os.path.abspath(path)] = [new_st.st_size, new_st.st_mtime_ns, digest]
+                    cache.dirty = True
+            tracer.count(f"dedup_{method}", 1)
+    if cache is not None:
+        cache.save()
+    return reclaimed, linked, failed
@@ -0,0 +1,402 @@
+"""
+fs_backend.py
+
+包含：
+- 本地磁盘后端 (LocalFileSystem)：直接转发到 os / shutil，部署、移动、目录快照沿用 mod_manager / move 中的实现
+- 内存后端 (MemoryFileSystem)：路径树保存在字典中，可为每种操作设置延迟并注入故障，统计各操作调用次数
+- 共用的本地后端实例 local_fs (ModManagerCore 未指定后端时使用)
+
+实现：
+- 两个后端提供相同的方法：scandir / listdir / stat / exists / open / remove / rename / replace /
+  makedirs / rmtree / copy_file / deploy / move_mod / snapshot
+- 内存后端的文件可以只有大小没有内容 (add_file(path, size))，读取时返回等长的零字节；
+  写入 (open(path, "wb")) 的内容在 close() 时保存，可被 PIL 等按文件对象读写的代码直接使用
+- 修改时间来自内部计数时钟，每次写入递增 1 ms；目录列举按名称排序，相同操作序列得到相同结果
+- 故障规则按操作名与路径通配符 (fnmatch) 匹配，可限定触发次数，或按概率触发 (随机数由 seed 决定)
+
+说明：
+- 内存后端的 rename 在目标已存在时抛出 FileExistsError (与 Windows 一致)；replace 覆盖已存在的文件
+- 内存后端的 deploy 按 .part 复制后 replace，不模拟 reflink / 硬链接；move_mod 只有同设备改名
+- 延迟通过 sleep 实现 (默认 time.sleep，可替换)；exists 与 stat 共用延迟和故障规则，故障时 exists 返回 False
+- 回收站暂存 (TrashBatch)、镜像备份、pak 索引等模块仍直接访问磁盘，只适用于本地后端
+"""
+
+import errno
+import fnmatch
+import io
+import os
+import random
+import shutil
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+
+class LocalFileSystem:
+
+    name = "local"
+
+    scandir = staticmethod(os.scandir)
+    listdir = staticmethod(os.listdir)
+    stat = staticmethod(os.stat)
+    exists = staticmethod(os.path.exists)
+    open = staticmethod(open)
+    remove = staticmethod(os.remove)
+    rename = staticmethod(os.rename)
+    replace = staticmethod(os.replace)
+    makedirs = staticmethod(os.makedirs)
+    rmtree = staticmethod(shutil.rmtree)
+    copy_file = staticmethod(shutil.copy2)
+
+    @staticmethod
+    def deploy(src, target):
+        from core.mod_manager import deploy_copy
+        deploy_copy(src, target)
+
+    @staticmethod
+    def move_mod(repo_path, src_rel, pak, dest_rel):
+        from core.move import plan_moves, move_units
+        _, failed = move_units(plan_moves(repo_path, [(src_rel, pak)], dest_rel))
+        if failed:
+            raise OSError(failed[0])
+
+    @staticmethod
+    def snapshot(path):
+        from core.mod_manager import dir_snapshots
+        return dir_snapshots.get(path)
+
+
+local_fs = LocalFileSystem()
+
+
+class MemStat:
+
+    __slots__ = ("st_size", "st_mtime_ns", "st_ino", "st_dev", "st_nlink", "is_dir")
+
+    def __init__(self, node):
+        self.st_size = node.size
+        self.st_mtime_ns = node.mtime_ns
+        self.st_ino = node.ino
+        self.st_dev = 0
+        self.st_nlink = 1
+        self.is_dir = node.is_dir
+
+    @property
+    def st_mtime(self):
+        return self.st_mtime_ns / 1e9
+
+
+class MemEntry:
+
+    __slots__ = ("name", "path", "_node")
+
+    def __init__(self, name, path, node):
+        self.name = name
+        self.path = path
+        self._node = node
+
+    def is_file(self):
+        return not self._node.is_dir
+
+    def is_dir(self):
+        return self._node.is_dir
+
+    def stat(self):
+        return MemStat(self._node)
+
+
+class _MemNode:
+
+    __slots__ = ("is_dir", "size", "mtime_ns", "ino", "data", "children")
+
+    def __init__(self, is_dir, ino, mtime_ns, size=0, data=None):
+        self.is_dir = is_dir
+        self.ino = ino
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.data = data
+        self.children = set() if is_dir else None
+
+
+class _MemWriter(io.BytesIO):
+
+    def __init__(self, fs, path):
+        super().__init__()
+        self._fs = fs
+        self._path = path
+
+    def close(self):
+        if not self.closed:
+            self._fs._write(self._path, self.getvalue())
+        super().close()
+
+
+class MemoryFileSystem:
+
+    name = "memory"
+
+    def __init__(self, seed=0):
+        self._nodes = {}
+        self._next_ino = 1
+        self._clock_ns = 1_600_000_000 * 1_000_000_000
+        self.latency = {}            # {操作名 或 "*": 秒}
+        self.faults = []             # [{"op", "path", "errno", "times", "rate"}]
+        self.calls = Counter()
+        self.sleep = time.sleep
+        self._rng = random.Random(seed)
+        self._add_node(os.sep, True)
+
+    # ---------- 配置 ----------
+    def set_latency(self, op, seconds):
+        self.latency[op] = seconds
+
+    def inject_fault(self, op, path="*", err=errno.EIO, times=1, rate=None):
+        """op 为操作名或 "*"；times 为 None 时不限次数；rate 为每次匹配时触发的概率。"""
+        self.faults.append({"op": op, "path": path, "errno": err, "times": times, "rate": rate})
+
+    def clear_faults(self):
+        self.faults.clear()
+
+    # ---------- 填充 (不计延迟与故障) ----------
+    def add_file(self, path, size=0, data=None, mtime_ns=None):
+        path = self._norm(path)
+        self._ensure_dirs(os.path.dirname(path))
+        if data is not None:
+            size = len(data)
+        node = self._add_node(path, False, size=size, data=data)
+        if mtime_ns is not None:
+            node.mtime_ns = mtime_ns
+        return node
+
+    def add_dir(self, path):
+        self._ensure_dirs(self._norm(path))
+
+    def file_count(self):
+        return sum(1 for node in self._nodes.values() if not node.is_dir)
+
+    # ---------- 内部 ----------
+    @staticmethod
+    def _norm(path):
+        return os.path.normpath(os.path.join(os.sep, path))
+
+    def _tick(self):
+        self._clock_ns += 1_000_000
+        return self._clock_ns
+
+    def _add_node(self, path, is_dir, size=0, data=None):
+        node = _MemNode(is_dir, self._next_ino, self._tick(), size, data)
+        self._next_ino += 1
+        self._nodes[path] = node
+        parent = os.path.dirname(path)
+        if parent != path:
+            parent_node = self._nodes[parent]
+            parent_node.children.add(os.path.basename(path))
+            parent_node.mtime_ns = node.mtime_ns
+        return node
+
+    def _ensure_dirs(self, path):
+        missing = []
+        while path not in self._nodes:
+            missing.append(path)
+            path = os.path.dirname(path)
+        if not self._nodes[path].is_dir:
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        for p in reversed(missing):
+            self._add_node(p, True)
+
+    def _detach(self, path):
+        node = self._nodes.pop(path)
+        parent = self._nodes[os.path.dirname(path)]
+        parent.children.discard(os.path.basename(path))
+        parent.mtime_ns = self._tick()
+        return node
+
+    def _subtree(self, path):
+        prefix = path.rstrip(os.sep) + os.sep
+        return [p for p in self._nodes if p == path or p.startswith(prefix)]
+
+    def _get(self, path):
+        node = self._nodes.get(path)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return node
+
+    def _get_dir(self, path):
+        node = self._get(path)
+        if not node.is_dir:
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        return node
+
+    def _parent_dir(self, path):
+        return self._get_dir(os.path.dirname(path))
+
+    def _enter(self, op, path):
+        self.calls[op] += 1
+        delay = self.latency.get(op, self.latency.get("*", 0))
+        if delay:
+            self.sleep(delay)
+        path = self._norm(path)
+        for rule in self.faults:
+            if rule["op"] not in (op, "*") or not fnmatch.fnmatch(path, rule["path"]):
+                continue
+            if rule["times"] == 0:
+                continue
+            if rule["rate"] is not None and self._rng.random() >= rule["rate"]:
+                continue
+            if rule["times"] is not None:
+                rule["times"] -= 1
+            raise OSError(rule["errno"], f"injected {op} fault", path)
+        return path
+
+    def _write(self, path, data):
+        self._parent_dir(path)
+        node = self._nodes.get(path)
+        if node is not None and node.is_dir:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        if node is None:
+            node = self._add_node(path, False)
+        node.data, node.size, node.mtime_ns = data, len(data), self._tick()
+
+    # ---------- 与 os / shutil 对应的操作 ----------
+    def scandir(self, path):
+        path = self._enter("scandir", path)
+        node = self._get_dir(path)
+        entries = [MemEntry(name, os.path.join(path, name), self._nodes[os.path.join(path, name)])
+                   for name in sorted(node.children)]
+        return nullcontext(entries)
+
+    def listdir(self, path):
+        path = self._enter("listdir", path)
+        return sorted(self._get_dir(path).children)
+
+    def stat(self, path):
+        path = self._enter("stat", path)
+        return MemStat(self._get(path))
+
+    def exists(self, path):
+        try:
+            self.stat(path)
+            return True
+        except OSError:
+            return False
+
+    def open(self, path, mode="r", *args, **kwargs):
+        path = self._enter("open", path)
+        if "w" in mode:
+            self._parent_dir(path)
+            writer = _MemWriter(self, path)
+            return writer if "b" in mode else io.TextIOWrapper(writer, *args, **kwargs)
+        node = self._get(path)
+        if node.is_dir:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        data = node.data if node.data is not None else bytes(node.size)
+        reader = io.BytesIO(data)
+        return reader if "b" in mode else io.TextIOWrapper(reader, *args, **kwargs)
+
+    def remove(self, path):
+        path = self._enter("remove", path)
+        if self._get(path).is_dir:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        self._detach(path)
+
+    def _move(self, src, dst):
+        parent = self._parent_dir(dst)
+        node = self._get(src)
+        if node.is_dir and (dst + os.sep).startswith(src + os.sep):
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL), dst)
+        # 文件只移动一个节点；目录需要把其下所有路径改为新前缀
+        descendants = self._subtree(src) if node.is_dir else [src]
+        self._detach(src)
+        for p in descendants:
+            if p != src:
+                self._nodes[dst + p[len(src):]] = self._nodes.pop(p)
+        self._nodes[dst] = node
+        parent.children.add(os.path.basename(dst))
+        parent.mtime_ns = self._tick()
+
+    def rename(self, src, dst):
+        src = self._enter("rename", src)
+        dst = self._norm(dst)
+        self._get(src)
+        if dst in self._nodes:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        self._move(src, dst)
+
+    def replace(self, src, dst):
+        src = self._enter("replace", src)
+        dst = self._norm(dst)
+        self._get(src)
+        existing = self._nodes.get(dst)
+        if existing is not None:
+            if existing.is_dir:
+                raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), dst)
+            self._detach(dst)
+        self._move(src, dst)
+
+    def makedirs(self, path, exist_ok=False):
+        path = self._enter("makedirs", path)
+        if path in self._nodes and not exist_ok:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+        self._ensure_dirs(path)
+
+    def rmtree(self, path):
+        path = self._enter("rmtree", path)
+        self._get_dir(path)
+        for p in sorted(self._subtree(path), key=len, reverse=True):
+            self._detach(p)
+
+    def copy_file(self, src, dst):
+        src = self._enter("copy", src)
+        dst = self._norm(dst)
+        node = self._get(src)
+        if node.is_dir:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), src)
+        self._parent_dir(dst)
+        if dst in self._nodes:
+            self._detach(dst)
+        copy = self._add_node(dst, False, size=node.size, data=node.data)
+        # 与 shutil.copy2 一致，保留源文件修改时间
+        copy.mtime_ns = node.mtime_ns
+
+    # ---------- 组合操作 ----------
+    def deploy(self, src, target):
+        part = target + ".part"
+        try:
+            if self.exists(part):
+                self.remove(part)
+            self.copy_file(src, part)
+            self.replace(part, target)
+        except OSError:
+            try:
+                self.remove(part)
+            except OSError:
+                pass
+            raise
+
+    def move_mod(self, repo_path, src_rel, pak, dest_rel):
+        png = pak[:-4] + ".png" if pak.lower().endswith(".pak") else pak + ".png"
+        src_pak = os.path.join(repo_path, src_rel, pak)
+        if not self.exists(src_pak):
+            raise FileNotFoundError(errno.ENOENT, "mod not found", src_pak)
+        files = [(os.path.join(repo_path, src_rel, name), os.path.join(repo_path, dest_rel, name))
+                 for name in (pak, png)]
+        done = []
+        try:
+            for src, dst in files:
+                if not self.exists(src):
+                    continue
+                self.rename(src, dst)
+                done.append((src, dst))
+        except OSError:
+            for src, dst in reversed(done):
+                try:
+                    self.rename(dst, src)
+                except OSError:
+                    pass
+            raise
+
+    def snapshot(self, path):
+        try:
+            return frozenset(self.listdir(path))
+        except OSError:
+            return frozenset()
@@ -0,0 +1,92 @@
+"""
+image_decode.py
+
+包含：
+- 缩略图解码函数 (decode_thumbnail)：从图片字节解码出原图、档位缩略图与显示尺寸缩略图
+- 进程池解码器 (ProcessDecoder)：在子进程中执行 decode_thumbnail，批量解码时可用满多个 CPU 核心
+
+实现：
+- decode_thumbnail 只依赖 PIL，不导入 PyQt6，子进程可直接导入本模块；
+  结果为 ((宽, 高, RGBA 字节), ...) 元组，可直接 pickle 回主进程，由调用方构造 QImage
+- 线程解码与进程解码共用同一函数，两种方式得到的图片一致
+- ProcessDecoder 首次提交时才创建 ProcessPoolExecutor；结果通过 Future 回调交给调用方
+
+说明：
+- PIL 解码与缩放的部分步骤持有 GIL，大量缩略图同时解码时线程池无法用满多核；
+  进程池适合首次扫描 / 预热缓存等批量任务，可见行仍在线程中解码，避免进程间传输的延迟
+- 进程间传递的是原始像素，原图越大传输开销越高
+- 回调在进程池的结果线程中执行，不能直接操作界面
+- 子进程固定以 spawn 方式启动：提交发生在 I/O 线程中，fork 一个带有 Qt 线程的进程可能使子进程死锁；
+  spawn 会重新导入入口模块，入口需把参数解析与界面导入放在 main() 中 (见 main.py)，
+  打包后的程序还需在入口调用 multiprocessing.freeze_support()
+"""
+
+import io
+import os
+import threading
+
+
+def _rgba(pil):
+    if pil.mode != "RGBA":
+        pil = pil.convert("RGBA")
+    return pil.size[0], pil.size[1], pil.tobytes("raw", "RGBA")
+
+
+def decode_thumbnail(data, thumb_size, display_size):
+    """返回 (原图, 档位缩略图, 显示尺寸缩略图)，各为 (宽, 高, RGBA 字节)；无法解码时返回 None。"""
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as pil:
+            pil.load()
+            full = _rgba(pil)
+
+            pil.thumbnail((thumb_size, thumb_size), Image.Resampling.LANCZOS)
+            thumb = _rgba(pil)
+
+            if display_size == thumb_size:
+                return full, thumb, thumb
+            # 按长边缩放到显示尺寸 (与 Qt KeepAspectRatio + SmoothTransformation 相同)
+            w, h = pil.size
+            scale = display_size / max(w, h)
+            display = pil.resize((max(1, round(w * scale)), max(1, round(h * scale))),
+                                 Image.Resampling.BILINEAR)
+            return full, thumb, _rgba(display)
+    except Exception:
+        return None
+
+
+class ProcessDecoder:
+
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, data, thumb_size, display_size, callback):
+        """callback(结果) 在解码完成后调用，结果同 decode_thumbnail；进程池不可用时抛出异常，由调用方改用线程解码。"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            future = self._executor.submit(decode_thumbnail, data, thumb_size, display_size)
+
+        def done(f):
+            if f.cancelled():
+                return
+            try:
+                raw = f.result()
+            except Exception:
+                raw = None
+            callback(raw)
+
+        future.add_done_callback(done)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
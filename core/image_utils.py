@@ -2,13 +2,14 @@
 image_utils.py
 
 包含：
-- 图像格式转换工具函数 (PIL.Image → QImage)
+- 图像格式转换工具函数 (PIL.Image → QImage；原始 RGBA 数据 → QImage)
 
 实现：
 - 统一转换为 RGBA 模式 (Image.convert)
 - 通过 tobytes("raw", "RGBA") 获取底层字节数据
 - 使用 QImage 构造函数创建 Format_RGBA8888 图像
 - 调用 .copy() 解除与原始内存的引用绑定
+- rgba_to_qimage 接收 core.image_decode 返回的 (宽, 高, RGBA 字节)，线程解码与进程解码的结果都经它转换
 
 """
 
@@ -26,4 +27,9 @@ def pil_to_qimage(pil_img):
         pil_img.size[0],
         pil_img.size[1],
         QImage.Format.Format_RGBA8888
-    ).copy()
\ No newline at end of file
+    ).copy()
+
+
+def rgba_to_qimage(raw):
+    w, h, data = raw
+    return QImage(data, w, h, QImage.Format.Format_RGBA8888).copy()
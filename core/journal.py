@@ -0,0 +1,193 @@
+"""
+journal.py
+
+包含：
+- 批量部署操作日志 (BatchJournal)
+- 批量启用 / 禁用的步骤生成 (plan_batch_steps)
+- 按步骤执行并逐步记录完成状态 (run_steps / run_journaled)
+- 未完成批量操作的检测、恢复与放弃 (pending_step_count / resume_journal / discard_journal)
+
+实现：
+- 日志为 JSON Lines 文件：首行记录游戏目录与全部计划步骤，其后每完成一步追加一行
+- 每次追加后 flush + os.fsync，进程被杀或崩溃后仍能知道哪些步骤已完成
+- 复制经 deploy_copy 写入 .part 临时文件再原子替换，目标文件要么完整要么不存在
+- 恢复时先清理残留的 .part 文件；目标已与源文件一致的复制步骤直接视为完成
+- 全部步骤成功后删除日志；仍有失败步骤时保留日志，下次启动可继续
+
+说明：
+- 步骤格式：{"op": "copy", "src": 源文件绝对路径, "pak": 文件名} 或 {"op": "remove", "pak": 文件名}
+- 日志首行损坏时视为无效日志，不做恢复
+"""
+
+import json
+import os
+import time
+
+from core.mod_manager import PART_SUFFIX, deploy_copy, is_same_copy
+from core.tracing import tracer
+
+
+class BatchJournal:
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def begin(self, game_path, steps):
+        self.close()
+        header = {"created": time.time(), "game": game_path, "steps": steps}
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def reopen(self):
+        self.close()
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                done = set()
+                for line in f:
+                    try:
+                        done.add(int(json.loads(line)["done"]))
+                    except (ValueError, KeyError, TypeError):
+                        # 最后一行可能只写了一半
+                        break
+        except (OSError, ValueError):
+            return None
+        if not isinstance(header, dict) or not isinstance(header.get("steps"), list):
+            return None
+        return header.get("game", ""), header["steps"], done
+
+    def mark_done(self, index):
+        if self._fh is None:
+            return
+        self._fh.write(json.dumps({"done": index}) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def finish(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def plan_batch_steps(repo_path, mods, enable):
+    steps = []
+    for rel, pak in mods:
+        src = os.path.join(repo_path, rel, pak)
+        if not os.path.exists(src):
+            continue
+        if enable:
+            steps.append({"op": "copy", "src": src, "pak": pak})
+        else:
+            steps.append({"op": "remove", "pak": pak})
+    return steps
+
+
+def _step_already_done(game_path, step):
+    target = os.path.join(game_path, step["pak"])
+    if step["op"] == "remove":
+        return not os.path.exists(target)
+    try:
+        return is_same_copy(os.stat(step["src"]), os.stat(target))
+    except OSError:
+        return False
+
+
+def run_steps(game_path, steps, journal=None, done=()):
+    completed, failed = [], []
+    for index, step in enumerate(steps):
+        if index in done:
+            continue
+        target = os.path.join(game_path, step["pak"])
+        try:
+            with tracer.span("batch.step", op=step["op"], pak=step["pak"]):
+                if step["op"] == "copy":
+                    # 已启用的模组 (同一文件或相同副本) 不重新部署
+                    if not _step_already_done(game_path, step):
+                        deploy_copy(step["src"], target)
+                elif os.path.exists(target):
+                    os.remove(target)
+        except (PermissionError, OSError) as e:
+            tracer.instant("batch.step_failed", pak=step["pak"], error=str(e))
+            failed.append(f"{step['pak']}: {str(e)}")
+            continue
+        completed.append(step)
+        if journal is not None:
+            journal.mark_done(index)
+    return completed, failed
+
+
+def run_journaled(journal, game_path, steps):
+    if not steps:
+        return [], []
+    journal.begin(game_path, steps)
+    completed, failed = run_steps(game_path, steps, journal)
+    if failed:
+        journal.close()
+    else:
+        journal.finish()
+    return completed, failed
+
+
+def _remove_part_files(game_path, steps):
+    # 中断时残留的 .part 临时文件
+    for step in steps:
+        part = os.path.join(game_path, step["pak"]) + PART_SUFFIX
+        if os.path.exists(part):
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+
+
+def resume_journal(journal):
+    loaded = journal.load()
+    if loaded is None:
+        journal.finish()
+        return [], []
+    game_path, steps, done = loaded
+    _remove_part_files(game_path, steps)
+
+    journal.reopen()
+    for index, step in enumerate(steps):
+        if index not in done and _step_already_done(game_path, step):
+            journal.mark_done(index)
+            done.add(index)
+
+    completed, failed = run_steps(game_path, steps, journal, done)
+    if failed:
+        journal.close()
+    else:
+        journal.finish()
+    return completed, failed
+
+
+def discard_journal(journal):
+    loaded = journal.load()
+    if loaded is not None:
+        _remove_part_files(loaded[0], loaded[1])
+    journal.finish()
+
+
+def pending_step_count(journal):
+    loaded = journal.load()
+    if loaded is None:
+        return 0, 0
+    _, steps, done = loaded
+    return len(steps) - len(done), len(steps)
@@ -0,0 +1,167 @@
+"""
+memory.py
+
+包含：
+- 内存报告 (MemoryReport)：按类别汇总各缓存 / 控件 / 索引持有的字节数与对象数量，格式化为文本表
+- 容器大小估算 (container_bytes)：递归累加 dict / list / set / tuple 及其中字符串、数字的 sys.getsizeof
+- 进程常驻内存读取 (process_rss)：Linux 读取 /proc/self/statm，Windows 调用 GetProcessMemoryInfo
+- tracemalloc 分配位置统计 (start_tracemalloc / top_allocations)
+
+说明：
+- 不依赖 PyQt6；QImage 字节数、控件数量等由界面层采集后通过 add() 加入报告
+- container_bytes 只是估算：同一对象只计一次，不包含 C 扩展对象内部的缓冲区
+- tracemalloc 只记录开始追踪之后的分配；追踪会拖慢分配并额外占用内存，默认关闭
+- 类别与名称是固定的标识 (也用于 tracer 瞬时值名称)；format() 可传入 label 把它们转换为界面语言的显示文字
+- 核心模块通过各自的 memory_stats() 在自己的锁内统计，报告不直接读取其内部状态
+- publish() 把各项字节数写入 tracer 瞬时值 (mem.类别.名称)，性能面板与导出的追踪文件中可见
+"""
+
+import os
+import sys
+import tracemalloc
+
+from core.mod_manager import format_size
+from core.tracing import tracer
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+
+
+def container_bytes(obj):
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, _ATOMIC):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return total
+
+
+def process_rss():
+    """返回当前进程常驻内存字节数；无法获取时返回 None。"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if os.name == "nt":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def start_tracemalloc(frames=1):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def _short_path(path):
+    parts = path.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+def top_allocations(limit=10):
+    """按源码行统计 tracemalloc 记录的分配；返回 [(位置, 字节数, 块数)]，未追踪时为空列表。"""
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ])
+    result = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        result.append((f"{_short_path(frame.filename)}:{frame.lineno}", stat.size, stat.count))
+    return result
+
+
+class MemoryReport:
+
+    def __init__(self):
+        # [(类别, 名称, 字节数或 None, 数量或 None)]
+        self.rows = []
+        self.allocations = []
+
+    def add(self, section, name, nbytes=None, count=None):
+        self.rows.append((section, name, nbytes, count))
+
+    def add_container(self, section, name, obj):
+        self.add(section, name, container_bytes(obj), len(obj))
+
+    def add_rows(self, section, rows):
+        for name, nbytes, count in rows:
+            self.add(section, name, nbytes, count)
+
+    def section_bytes(self, section):
+        return sum(nbytes or 0 for s, _, nbytes, _ in self.rows if s == section)
+
+    def to_dict(self):
+        return {
+            "rows": [
+                {"section": s, "name": n, "bytes": b, "count": c}
+                for s, n, b, c in self.rows
+            ],
+            "allocations": [
+                {"site": site, "bytes": size, "blocks": count}
+                for site, size, count in self.allocations
+            ],
+        }
+
+    def publish(self):
+        for section, name, nbytes, _ in self.rows:
+            if nbytes is not None:
+                tracer.gauge(f"mem.{section}.{name}", nbytes)
+
+    def format(self, label=None):
+        """label(标识) 返回显示文字；未给出时显示标识本身 (下划线换为空格)。"""
+        label = label or (lambda key: key.replace("_", " "))
+        width = max([len(label(name)) for _, name, _, _ in self.rows] + [24])
+        lines = []
+        current = None
+        for section, name, nbytes, count in self.rows:
+            if section != current:
+                current = section
+                total = self.section_bytes(section)
+                lines.append(f"[{label(section)}]  {format_size(total) if total else ''}".rstrip())
+            size_text = format_size(nbytes) if nbytes is not None else "-"
+            count_text = str(count) if count is not None else ""
+            lines.append(f"  {label(name):<{width}} {size_text:>10} {count_text:>8}")
+
+        lines.append(f"[{label('tracemalloc')}]")
+        if not self.allocations:
+            lines.append(f"  ({label('not_tracing' if not tracemalloc.is_tracing() else 'no_allocations')})")
+        for site, size, count in self.allocations:
+            lines.append(f"  {site:<{width}} {format_size(size):>10} {count:>8}")
+        return "\n".join(lines)
@@ -0,0 +1,233 @@
+"""
+mirror.py
+
+包含：
+- 仓库镜像清单 (MirrorManifest)：目标目录中 {相对路径: [大小, 修改时间, 哈希]}，保存为 JSON
+- 镜像计划 (plan_mirror)：对比源文件与清单，得出需复制、可在目标内改名、需删除的文件
+- 镜像执行 (apply_mirror)：按计划改名 / 复制 / 删除，并更新清单
+
+实现：
+- 源文件范围与界面树一致 (list_all_mods 的 .pak) 及其同名 .png 预览图
+- 未变化的文件 (大小与修改时间与清单一致) 只需一次 os.stat，不读取内容
+- 新增或变化的文件用 shutil.copy2 复制到 .part 后 os.replace；
+  copy2 在 Linux 下走 sendfile / copy_file_range，在 Windows 下走 CopyFile 等内核复制路径
+- 复制后由 HashCache 计算源文件哈希写入清单 (刚复制过，数据通常已在页缓存中)
+- 源中消失的旧路径若与某个新路径大小相同且哈希一致 (例如模组移动了分类)，在目标目录内直接改名，不重新复制
+
+说明：
+- 只删除清单中记录过的文件，目标目录中的其它文件不受影响；删除后清理变空的分类目录
+- 目标目录不能与仓库相同，也不能互相包含
+- 目标目录中的文件只按清单判断，不逐个 stat；在目标目录中手动改动的文件不会被发现
+- 清单在执行结束 (包括中途出错) 时写入；中断后已复制但未记入清单的文件下次会重新复制
+- progress(done_bytes, total_bytes) 只统计需要复制的字节数
+"""
+
+import json
+import os
+import shutil
+
+from core.mod_manager import PART_SUFFIX
+from core.tracing import tracer
+
+MANIFEST_NAME = ".smm_mirror.json"
+MANIFEST_FORMAT = 1
+
+
+def _preview_name(pak):
+    return pak[:-4] + ".png" if pak.lower().endswith(".pak") else pak + ".png"
+
+
+def _is_inside(path, root):
+    path, root = os.path.normcase(os.path.abspath(path)), os.path.normcase(os.path.abspath(root))
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class MirrorManifest:
+
+    def __init__(self, dest):
+        self.path = os.path.join(dest, MANIFEST_NAME)
+        self.entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == MANIFEST_FORMAT and isinstance(data.get("files"), dict):
+                self.entries = data["files"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        part = self.path + PART_SUFFIX
+        with open(part, "w", encoding="utf-8") as f:
+            json.dump({"format": MANIFEST_FORMAT, "files": self.entries}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(part, self.path)
+
+
+class MirrorPlan:
+
+    def __init__(self, repo_path, dest):
+        self.repo_path = repo_path
+        self.dest = dest
+        # 相对路径使用 / 分隔，与平台无关，清单可在不同系统间共用
+        self.copy = []          # [(相对路径, os.stat_result)]
+        self.rename = []        # [(旧相对路径, 新相对路径, os.stat_result, 哈希)]
+        self.delete = []        # [相对路径]
+        self.unchanged = 0
+        self.errors = []
+
+    @property
+    def bytes_to_copy(self):
+        return sum(st.st_size for _, st in self.copy)
+
+    def to_dict(self):
+        return {
+            "dest": self.dest,
+            "copy": [rel for rel, _ in self.copy],
+            "rename": [[old, new] for old, new, _, _ in self.rename],
+            "delete": list(self.delete),
+            "unchanged": self.unchanged,
+            "bytes_to_copy": self.bytes_to_copy,
+            "errors": list(self.errors),
+        }
+
+
+def _source_files(mods):
+    files = []
+    for rel, pak in mods:
+        for name in (pak, _preview_name(pak)):
+            files.append(f"{rel.replace(os.sep, '/')}/{name}" if rel else name)
+    return files
+
+
+@tracer.traced("mirror.plan")
+def plan_mirror(repo_path, mods, dest, manifest, hash_cache):
+    """mods 为 (相对路径, pak) 列表；manifest 为目标目录的 MirrorManifest。"""
+    if not dest or _is_inside(dest, repo_path) or _is_inside(repo_path, dest):
+        raise RuntimeError(f"备份目录不能与模组库相同或互相包含: {dest}")
+
+    plan = MirrorPlan(repo_path, dest)
+    seen = set()
+    changed = []
+    for rel in _source_files(mods):
+        if rel in seen:
+            continue
+        try:
+            st = os.stat(os.path.join(repo_path, rel))
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            plan.errors.append(f"{rel}: {e}")
+            continue
+        seen.add(rel)
+        entry = manifest.entries.get(rel)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            plan.unchanged += 1
+        else:
+            changed.append((rel, st))
+
+    plan.delete = sorted(rel for rel in manifest.entries if rel not in seen)
+
+    # 源中消失的旧路径按 (大小, 哈希) 索引，新路径命中时改为目标内改名
+    stale = {}
+    for rel in plan.delete:
+        size, _, digest = manifest.entries[rel]
+        stale.setdefault((size, digest), []).append(rel)
+    stale_sizes = {size for size, _ in stale}
+
+    for rel, st in changed:
+        if st.st_size in stale_sizes and rel not in manifest.entries:
+            try:
+                digest = hash_cache.get(os.path.join(repo_path, rel), st)
+            except OSError as e:
+                plan.errors.append(f"{rel}: {e}")
+                continue
+            olds = stale.get((st.st_size, digest))
+            if olds:
+                old = olds.pop()
+                plan.delete.remove(old)
+                plan.rename.append((old, rel, st, digest))
+                continue
+        plan.copy.append((rel, st))
+    hash_cache.save()
+    return plan
+
+
+def _copy_file(src, dst):
+    part = dst + PART_SUFFIX
+    try:
+        shutil.copy2(src, part)
+        os.replace(part, dst)
+    except OSError:
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_empty_dirs(dest, rels):
+    dirs = {os.path.dirname(rel) for rel in rels if os.path.dirname(rel)}
+    for d in sorted(dirs, key=len, reverse=True):
+        while d:
+            try:
+                os.rmdir(os.path.join(dest, d))
+            except OSError:
+                break
+            d = os.path.dirname(d)
+
+
+@tracer.traced("mirror.apply")
+def apply_mirror(plan, manifest, hash_cache, progress=None):
+    """返回 {"copied", "renamed", "deleted", "bytes_copied", "failed"}。"""
+    result = {"copied": [], "renamed": [], "deleted": [], "bytes_copied": 0, "failed": list(plan.errors)}
+    total = plan.bytes_to_copy
+    done = 0
+    os.makedirs(plan.dest, exist_ok=True)
+    try:
+        for old, new, st, digest in plan.rename:
+            dst = os.path.join(plan.dest, new)
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(os.path.join(plan.dest, old), dst)
+                # 目标文件的修改时间与源不同时按源更新，与 copy2 的结果保持一致
+                shutil.copystat(os.path.join(plan.repo_path, new), dst)
+            except OSError as e:
+                result["failed"].append(f"{new}: {e}")
+                continue
+            del manifest.entries[old]
+            manifest.entries[new] = [st.st_size, st.st_mtime_ns, digest]
+            result["renamed"].append([old, new])
+
+        for rel, st in plan.copy:
+            src = os.path.join(plan.repo_path, rel)
+            dst = os.path.join(plan.dest, rel)
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                _copy_file(src, dst)
+                digest = hash_cache.get(src, st)
+            except OSError as e:
+                result["failed"].append(f"{rel}: {e}")
+                continue
+            manifest.entries[rel] = [st.st_size, st.st_mtime_ns, digest]
+            result["copied"].append(rel)
+            result["bytes_copied"] += st.st_size
+            done += st.st_size
+            if progress:
+                progress(done, total)
+
+        for rel in plan.delete:
+            try:
+                os.remove(os.path.join(plan.dest, rel))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                result["failed"].append(f"{rel}: {e}")
+                continue
+            del manifest.entries[rel]
+            result["deleted"].append(rel)
+        _remove_empty_dirs(plan.dest, result["deleted"] + [old for old, _ in result["renamed"]])
+    finally:
+        manifest.save()
+        hash_cache.save()
+    tracer.count("mirror_bytes_copied", result["bytes_copied"])
+    return result
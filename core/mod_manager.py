@@ -3,25 +3,36 @@ mod_manager.py
 
 包含：
 - 模组仓库核心管理类 (ModManagerCore)
-- 仓库与游戏目录扫描 (os.scandir / os.listdir)
-- 模组启用 / 禁用切换 (shutil.copy2 / os.remove)
-- 模组移动与重命名 (os.rename)
-- 文件与文件夹删除 (os.remove / shutil.rmtree)
+- 仓库与游戏目录扫描 (os.scandir / os.listdir)；扫描时记录 .pak 的大小、修改时间与是否有预览图 (mod_stat)
+- 模组启用 / 禁用切换 (优先 reflink / 硬链接，否则 shutil.copy2；均写入 .part 临时文件后 os.replace / os.remove)
+- 模组移动与重命名 (os.rename；跨设备时由 core.move 流式复制 + 校验 + 删除)
+- 仓库增量镜像备份 (由 core.mirror 按清单只复制新增 / 变化的文件并删除源中已消失的文件)
+- 文件与文件夹删除 (os.remove / shutil.rmtree，或传入 TrashBatch 改名移入暂存目录)
 - 文件夹创建 (os.makedirs + 自动重名递增)
-- 预览图处理 (PIL.Image 打开与保存 PNG)
-- 游戏目录文件集合获取 (set + os.listdir)
+- 预览图处理 (PIL.Image 打开、按最大边长缩小、写入 .part 后替换为 PNG)
+- 游戏目录文件集合获取 (DirSnapshotCache：按目录修改时间缓存 os.listdir 结果，多个部署目标共用)
+- 全库模组列举、同名冲突统计、已部署文件校验 (供命令行入口复用)
 
 说明：
 - 所有操作基于文件系统路径拼接 (os.path.join)
-- 通过相对路径与物理路径转换控制分类结构
+- 扫描、启用 / 禁用、移动、重命名、删除、预览图读写经 self.fs 访问文件系统 (core.fs_backend)；
+  默认为本地磁盘，传入 MemoryFileSystem 可在内存中进行大规模基准与故障注入测试
+- 分类以仓库内的物理相对路径标识，根目录 (界面上的“未分类”) 为 ""，与界面语言无关
 - 自动同步 .pak 与对应 .png 预览图
 - 返回状态或新路径供 UI 层更新
 """
 
 import os
 import shutil
+import sys
+import threading
+import time
 from functools import cmp_to_key
 
+from core.fs_backend import local_fs
+from core.tracing import tracer
+from core.trash import TRASH_DIR_NAME
+
 if os.name == "nt":
     try:
         import ctypes
@@ -40,96 +51,339 @@ def _logical_sort(names):
     return sorted(names, key=cmp_to_key(_STR_CMP_LOGICAL_W))
 
 
+def mod_key(rel, pak):
+    # 模组标识："分类/子分类/名称.pak"，根目录模组为 "名称.pak"；分隔符统一为 /
+    return f"{rel.replace(os.sep, '/')}/{pak}" if rel else pak
+
+
+def split_mod_key(key):
+    rel, _, pak = key.replace("\\", "/").strip("/").rpartition("/")
+    return rel.replace("/", os.sep), pak
+
+
+def is_same_copy(src_st, dst_st):
+    # 大小一致且修改时间相差不超过 2 秒 (FAT/exFAT 精度)，视为同一份部署副本
+    return src_st.st_size == dst_st.st_size and abs(src_st.st_mtime - dst_st.st_mtime) <= 2
+
+
+PART_SUFFIX = ".part"
+
+# Linux FICLONE ioctl：在支持的文件系统 (btrfs / xfs 等) 上创建共享数据块的写时复制副本
+_FICLONE = 0x40049409
+
+_deploy_links = True
+
+
+def set_deploy_links(enabled):
+    # 启用模组时是否先尝试从仓库文件 reflink / 硬链接 (同一文件系统时无需复制数据)
+    global _deploy_links
+    _deploy_links = bool(enabled)
+
+
+def reflink_file(src, dst):
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    with open(src, "rb") as fin:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, _FICLONE, fin.fileno())
+        except OSError:
+            os.close(fd)
+            os.remove(dst)
+            return False
+        os.close(fd)
+    shutil.copystat(src, dst)
+    return True
+
+
+def link_file(src, dst):
+    """在 dst 创建与 src 共享数据的文件：优先 reflink，其次硬链接；返回使用的方式，均不可用时抛出 OSError。"""
+    if reflink_file(src, dst):
+        return "reflink"
+    os.link(src, dst)
+    return "hardlink"
+
+
+def deploy_copy(src, target):
+    # 先写入临时文件再原子替换，中断时游戏目录里不会留下写了一半的 pak
+    try:
+        # 已启用且为同一文件 (硬链接) 时无需部署；否则 part 会成为同一 inode 的又一个链接，
+        # POSIX 下 os.replace 对同一文件不做任何事，part 会留在游戏目录中
+        if os.path.samefile(src, target):
+            return
+    except OSError:
+        pass
+    part = target + PART_SUFFIX
+    try:
+        if os.path.exists(part):
+            os.remove(part)
+        linked = False
+        if _deploy_links:
+            try:
+                link_file(src, part)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            shutil.copy2(src, part)
+        os.replace(part, target)
+        if os.path.lexists(part):
+            os.remove(part)
+        if tracer.enabled:
+            tracer.count("bytes_linked" if linked else "bytes_copied", os.path.getsize(target))
+    except OSError:
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        raise
+
+
+def format_size(num_bytes):
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DirSnapshotCache:
+    """目录文件名快照：目录的 (inode, 修改时间) 未变时直接返回上次的 frozenset。
+
+    在目录中新增、删除或改名文件都会更新目录修改时间；修改时间距列举时过近 (文件系统时间精度内
+    可能还有后续修改) 的结果不缓存，下次重新列举。
+    """
+
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self):
+        self._entries = {}
+        # 扫描在后台线程、内存报告在界面线程访问，字典的读写以锁保护 (列举目录不持锁)
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._entries.pop(path, None)
+            return frozenset()
+        stamp = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None and cached[0] == stamp:
+            tracer.count("dir_snapshot_hit", 1)
+            return cached[1]
+
+        try:
+            names = frozenset(os.listdir(path))
+        except OSError:
+            return frozenset()
+        with self._lock:
+            if time.time_ns() - st.st_mtime_ns >= self.RACY_WINDOW_NS:
+                self._entries[path] = (stamp, names)
+            else:
+                self._entries.pop(path, None)
+        tracer.count("dir_snapshot_miss", 1)
+        return names
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def memory_stats(self):
+        """返回 [(名称, 字节数, 数量)]，供 MemoryReport.add_rows() 使用。"""
+        from core.memory import container_bytes
+        with self._lock:
+            return [("dir_snapshots", container_bytes(self._entries), len(self._entries))]
+
+
+# 进程内共用：界面每次刷新都会重建 ModManagerCore，快照仍可复用
+dir_snapshots = DirSnapshotCache()
+
+
 class ModManagerCore:
 
-    def __init__(self, repo_path, game_path):
+    def __init__(self, repo_path, game_path, fs=None):
         self.repo_path = repo_path
         self.game_path = game_path
+        self.fs = fs or local_fs
+        # {.pak 绝对路径: (大小, 修改时间 ns, 是否有同名 .png)}；由 scan_repository / scan_directory 填充
+        self.scan_stats = {}
 
     def logical_sort(self, names):
         return _logical_sort(names)
 
+    @tracer.traced("core.scan_repository")
     def scan_repository(self):
         root_paks = []
         root_dirs = []
 
-        if os.path.exists(self.repo_path):
-            with os.scandir(self.repo_path) as it:
-                for entry in it:
-                    if entry.is_file() and entry.name.lower().endswith(".pak"):
-                        root_paks.append(entry.name)
-                    elif entry.is_dir():
-                        root_dirs.append(entry.name)
+        if self.repo_path and self.fs.exists(self.repo_path):
+            with self.fs.scandir(self.repo_path) as it:
+                pak_entries, pngs = self._scan_entries(it, root_dirs)
+            root_paks = self._record_stats(pak_entries, pngs)
 
         root_paks = self.logical_sort(root_paks)
         root_dirs = self.logical_sort(root_dirs)
         return root_paks, root_dirs
 
+    def _scan_entries(self, it, dirs):
+        pak_entries, pngs = [], set()
+        for entry in it:
+            name = entry.name.lower()
+            if entry.is_file():
+                if name.endswith(".pak"):
+                    pak_entries.append(entry)
+                elif name.endswith(".png"):
+                    pngs.add(name)
+            elif entry.is_dir() and entry.name != TRASH_DIR_NAME:
+                dirs.append(entry.name)
+        return pak_entries, pngs
+
+    def _record_stats(self, pak_entries, pngs):
+        # Windows 下 DirEntry.stat() 直接使用目录枚举返回的数据；其它平台每个 .pak 一次 stat，只在扫描时发生
+        names = []
+        for entry in pak_entries:
+            try:
+                st = entry.stat()
+                size, mtime = st.st_size, st.st_mtime_ns
+            except OSError:
+                size, mtime = None, None
+            self.scan_stats[entry.path] = (size, mtime, entry.name[:-4].lower() + ".png" in pngs)
+            names.append(entry.name)
+        return names
+
+    def mod_stat(self, rel, pak):
+        """返回扫描时记录的 (大小, 修改时间 ns, 是否有预览图)；未扫描到时为 (None, None, False)。"""
+        return self.scan_stats.get(os.path.join(self.repo_path, rel, pak), (None, None, False))
+
+    @tracer.traced("core.scan_directory")
     def scan_directory(self, dir_path):
         paks = []
         dirs = []
         try:
-            entries = self.logical_sort(os.listdir(dir_path))
-            for e in entries:
-                ep = os.path.join(dir_path, e)
-                if os.path.isfile(ep) and e.lower().endswith(".pak"):
-                    paks.append(e)
-                elif os.path.isdir(ep):
-                    dirs.append(e)
+            with self.fs.scandir(dir_path) as it:
+                pak_entries, pngs = self._scan_entries(it, dirs)
+            paks = self._record_stats(pak_entries, pngs)
         except OSError:
             pass
-        return paks, dirs
+        return self.logical_sort(paks), self.logical_sort(dirs)
+
+    def list_all_mods(self):
+        # 与界面树相同的层级规则：根目录 (rel 为 "") + 一级分类 + 二级分类
+        mods = []
+        root_paks, root_dirs = self.scan_repository()
+        mods.extend(("", pak) for pak in root_paks)
+
+        for dir_name in root_dirs:
+            sub_paks, sub_dirs = self.scan_directory(os.path.join(self.repo_path, dir_name))
+            mods.extend((dir_name, pak) for pak in sub_paks)
+
+            for sub_dir in sub_dirs:
+                sub_rel_path = os.path.join(dir_name, sub_dir)
+                sub_paks2, _ = self.scan_directory(os.path.join(self.repo_path, sub_rel_path))
+                mods.extend((sub_rel_path, pak) for pak in sub_paks2)
+        return mods
+
+    def find_name_conflicts(self, mods):
+        groups = {}
+        for rel, pak in mods:
+            groups.setdefault(pak, []).append(rel)
+        return {pak: rels for pak, rels in groups.items() if len(rels) > 1}
+
+    def verify_deployment(self, mods):
+        # 已启用的 pak 与仓库源文件比较大小与修改时间 (copy2 会保留 mtime)
+        sources = {}
+        for rel, pak in mods:
+            sources.setdefault(pak, []).append(os.path.join(self.repo_path, rel, pak))
+
+        report = {"ok": [], "mismatch": [], "unmanaged": []}
+        for name in sorted(self.get_game_files()):
+            if not name.lower().endswith(".pak"):
+                continue
+            if name not in sources:
+                report["unmanaged"].append(name)
+                continue
+            try:
+                st = self.fs.stat(os.path.join(self.game_path, name))
+            except OSError:
+                report["mismatch"].append(name)
+                continue
+
+            matched = False
+            for src in sources[name]:
+                try:
+                    src_st = self.fs.stat(src)
+                except OSError:
+                    continue
+                if is_same_copy(src_st, st):
+                    matched = True
+                    break
+            report["ok" if matched else "mismatch"].append(name)
+        return report
 
     def toggle_mod(self, src, pak, is_en):
         target = os.path.join(self.game_path, pak)
         new_en = is_en
         try:
             if is_en:
-                if os.path.exists(target):
-                    os.remove(target)
+                if self.fs.exists(target):
+                    self.fs.remove(target)
                 new_en = False
             else:
-                shutil.copy2(src, target)
+                self.fs.deploy(src, target)
                 new_en = True
         except (PermissionError, OSError) as e:
             raise RuntimeError(f"操作失败: {e}")
         return new_en
 
-    def move_mod(self, src_rel, pak, dest_rel, uncat_key):
-        phys_src = "" if src_rel == uncat_key else src_rel
-        phys_dest = "" if dest_rel == uncat_key else dest_rel
-
-        old_p = os.path.join(self.repo_path, phys_src, pak)
-        new_p = os.path.join(self.repo_path, phys_dest, pak)
+    def move_mod(self, src_rel, pak, dest_rel):
         try:
-            if os.path.exists(old_p.replace(".pak", ".png")):
-                os.rename(
-                    old_p.replace(".pak", ".png"),
-                    new_p.replace(".pak", ".png")
-                )
-
-            os.rename(old_p, new_p)
-        except (PermissionError, OSError) as e:
+            self.fs.move_mod(self.repo_path, src_rel, pak, dest_rel)
+        except OSError as e:
             raise RuntimeError(f"移动失败: {e}")
 
-    def delete_mod(self, rel, pak, uncat_key):
-        phys_rel = "" if rel == uncat_key else rel
-        target_path = os.path.join(self.repo_path, phys_rel, pak)
+    def mirror_to(self, dest, hash_cache, progress=None, dry_run=False):
+        from core.mirror import MirrorManifest, plan_mirror, apply_mirror
+        manifest = MirrorManifest(dest)
+        plan = plan_mirror(self.repo_path, self.list_all_mods(), dest, manifest, hash_cache)
+        if dry_run:
+            return plan.to_dict()
+        result = apply_mirror(plan, manifest, hash_cache, progress)
+        result["unchanged"] = plan.unchanged
+        return result
+
+    def delete_mod(self, rel, pak, trash_batch=None):
+        target_path = os.path.join(self.repo_path, rel, pak)
         try:
-            if os.path.exists(target_path):
-                os.remove(target_path)
+            if trash_batch is not None:
+                trash_batch.stage(os.path.join(rel, pak))
+                trash_batch.stage(os.path.join(rel, pak.replace(".pak", ".png")))
+                return
+
+            if self.fs.exists(target_path):
+                self.fs.remove(target_path)
 
             png_path = target_path.replace(".pak", ".png")
-            if os.path.exists(png_path):
-                os.remove(png_path)
+            if self.fs.exists(png_path):
+                self.fs.remove(png_path)
         except (PermissionError, OSError) as e:
             raise RuntimeError(f"删除失败: {e}")
 
-    def delete_folder(self, folder_rel):
+    def delete_folder(self, folder_rel, trash_batch=None):
         folder_path = os.path.join(self.repo_path, folder_rel)
         try:
-            if os.path.exists(folder_path):
-                shutil.rmtree(folder_path)
+            if trash_batch is not None:
+                trash_batch.stage(folder_rel)
+                return
+
+            if self.fs.exists(folder_path):
+                self.fs.rmtree(folder_path)
         except (PermissionError, OSError) as e:
             raise RuntimeError(f"删除文件夹失败: {e}")
 
@@ -139,24 +393,22 @@ class ModManagerCore:
         src = os.path.join(self.repo_path, old_rel_path)
         dst = os.path.join(self.repo_path, parent_path, new_name)
         try:
-            os.rename(src, dst)
+            self.fs.rename(src, dst)
             return os.path.join(parent_path, new_name)
         except (PermissionError, OSError) as e:
             raise RuntimeError(f"重命名文件夹失败: {e}")
 
-    def rename_mod(self, old_rel, old_pak, new_pak, uncat_key):
-        phys_rel = "" if old_rel == uncat_key else old_rel
-
-        src = os.path.join(self.repo_path, phys_rel, old_pak)
-        dst = os.path.join(self.repo_path, phys_rel, new_pak)
+    def rename_mod(self, old_rel, old_pak, new_pak):
+        src = os.path.join(self.repo_path, old_rel, old_pak)
+        dst = os.path.join(self.repo_path, old_rel, new_pak)
         try:
-            os.rename(src, dst)
+            self.fs.rename(src, dst)
 
             img_old = src.replace(".pak", ".png")
             img_new = dst.replace(".pak", ".png")
 
-            if os.path.exists(img_old):
-                os.rename(img_old, img_new)
+            if self.fs.exists(img_old):
+                self.fs.rename(img_old, img_new)
         except (PermissionError, OSError) as e:
             raise RuntimeError(f"重命名模组失败: {e}")
 
@@ -164,19 +416,45 @@ class ModManagerCore:
         target_path = os.path.join(target_dir, base_name)
         counter = 1
 
-        while os.path.exists(target_path):
+        while self.fs.exists(target_path):
             counter += 1
             target_path = os.path.join(target_dir, f"{base_name} ({counter})")
 
-        os.makedirs(target_path, exist_ok=True)
+        self.fs.makedirs(target_path, exist_ok=True)
         return target_path
 
-    def save_preview_image(self, src_img_path, dest_img_path):
+    def save_preview_image(self, src_img_path, dest_img_path, max_size=None, compress_level=6):
         from PIL import Image
-        with Image.open(src_img_path) as img:
-            img.convert("RGB").save(dest_img_path, "PNG")
+        with self.fs.open(src_img_path, "rb") as f, Image.open(f) as img:
+            if max_size:
+                # draft() 让 JPEG 在解码阶段直接按比例缩小，其余格式忽略
+                img.draft("RGB", (max_size, max_size))
+            out = img.convert("RGB")
+        if max_size:
+            out.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+        part = dest_img_path + PART_SUFFIX
+        try:
+            with self.fs.open(part, "wb") as f:
+                out.save(f, "PNG", compress_level=compress_level)
+            self.fs.replace(part, dest_img_path)
+        except OSError:
+            if self.fs.exists(part):
+                self.fs.remove(part)
+            raise
+        return out
 
     def get_game_files(self):
-        if os.path.exists(self.game_path):
-            return set(os.listdir(self.game_path))
-        return set()
+        # 返回可修改的副本，调用方会在禁用文件后就地更新
+        return set(self.get_target_files(self.game_path))
+
+    def get_target_files(self, target_path):
+        """任意部署目标目录的文件名集合 (只读 frozenset，来自共用快照)。"""
+        if not target_path:
+            return frozenset()
+        return self.fs.snapshot(target_path)
+
+    def enabled_by_target(self, mods, targets):
+        """targets 为 {名称: 目录}；返回 {名称: 已启用的 pak 名集合}，仓库只需扫描一次。"""
+        names = {pak for _, pak in mods}
+        return {name: names & self.get_target_files(path) for name, path in targets.items()}
@@ -0,0 +1,178 @@
+"""
+mod_table.py
+
+包含：
+- 模组记录 (ModRecord，__slots__)：整数编号、分类相对路径、pak 文件名，以及扫描时记录的大小 / 修改时间 / 是否有预览图
+- 模组表 (ModTable)：(相对路径, pak) 与整数编号的双向映射，按分类建立编号索引
+
+实现：
+- 编号即记录在 _records 列表中的下标，查找为 O(1)；移除的模组留下 None 空位，编号不复用；
+  retain() 后空位多于现存记录时整体压缩，返回 {旧编号: 新编号} 供调用方更新其保存的编号
+- 分类相对路径经 intern_folder() 驻留，同一分类下的所有记录共用一个字符串对象
+- 按分类保存编号集合 (_by_folder)，整个分类及其子分类的查询不必遍历全部模组
+- retain() 用一次扫描结果更新表：已存在的模组保留原编号 (除非发生压缩)，消失的模组移除
+
+说明：
+- 相对路径为物理路径 (根目录为 "")，不含界面上的“未分类”显示名
+- 编号只在本进程内有效，不写入配置；界面的勾选状态、行数据都以编号引用模组，压缩后需按返回的映射更新
+- 同一 (相对路径, pak) 在表中只出现一次；重命名 / 移动后通过 rename() / rename_folder() 更新，编号不变
+"""
+
+import os
+import sys
+
+
+class ModRecord:
+
+    __slots__ = ("id", "rel", "pak", "size", "mtime", "preview")
+
+    def __init__(self, mod_id, rel, pak):
+        self.id = mod_id
+        self.rel = rel
+        self.pak = pak
+        self.size = None
+        self.mtime = None
+        self.preview = False
+
+    @property
+    def key(self):
+        return f"{self.rel.replace(os.sep, '/')}/{self.pak}" if self.rel else self.pak
+
+
+class ModTable:
+
+    def __init__(self):
+        self._records = []
+        self._holes = 0
+        self._ids = {}
+        self._by_folder = {}
+        self._folders = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, mod_id):
+        return 0 <= mod_id < len(self._records) and self._records[mod_id] is not None
+
+    def intern_folder(self, rel):
+        return self._folders.setdefault(rel, rel)
+
+    # ---------- 增删改 ----------
+    def add(self, rel, pak):
+        """返回 (相对路径, pak) 的编号，不存在时新建。"""
+        mod_id = self._ids.get((rel, pak))
+        if mod_id is not None:
+            return mod_id
+        rel = self.intern_folder(rel)
+        mod_id = len(self._records)
+        self._records.append(ModRecord(mod_id, rel, pak))
+        self._ids[(rel, pak)] = mod_id
+        self._by_folder.setdefault(rel, set()).add(mod_id)
+        return mod_id
+
+    def remove(self, mod_id):
+        rec = self._records[mod_id]
+        if rec is None:
+            return
+        self._records[mod_id] = None
+        self._holes += 1
+        del self._ids[(rec.rel, rec.pak)]
+        ids = self._by_folder[rec.rel]
+        ids.discard(mod_id)
+        if not ids:
+            del self._by_folder[rec.rel]
+            self._folders.pop(rec.rel, None)
+
+    def rename(self, mod_id, rel=None, pak=None):
+        rec = self._records[mod_id]
+        new_rel = rec.rel if rel is None else self.intern_folder(rel)
+        new_pak = rec.pak if pak is None else pak
+        del self._ids[(rec.rel, rec.pak)]
+        if new_rel != rec.rel:
+            self._by_folder[rec.rel].discard(mod_id)
+            if not self._by_folder[rec.rel]:
+                del self._by_folder[rec.rel]
+                self._folders.pop(rec.rel, None)
+            self._by_folder.setdefault(new_rel, set()).add(mod_id)
+        rec.rel, rec.pak = new_rel, new_pak
+        self._ids[(new_rel, new_pak)] = mod_id
+
+    def rename_folder(self, old_rel, new_rel):
+        """分类改名后更新其中及各级子分类下的模组，编号不变。"""
+        for mod_id in self.in_folder(old_rel):
+            rel = self._records[mod_id].rel
+            self.rename(mod_id, rel=new_rel + rel[len(old_rel):])
+
+    def set_stat(self, mod_id, size, mtime, preview):
+        rec = self._records[mod_id]
+        rec.size, rec.mtime, rec.preview = size, mtime, preview
+
+    def retain(self, live):
+        """移除不在 live 中的模组 (扫描时已用 add() 取得全部现存模组的编号)。
+
+        移动 / 重命名会留下空位，空位多于现存记录时压缩并返回 {旧编号: 新编号}，否则返回 None。
+        """
+        for mod_id in [i for i in self._ids.values() if i not in live]:
+            self.remove(mod_id)
+        if self._holes > len(self._ids):
+            return self._compact()
+        return None
+
+    def _compact(self):
+        remap = {}
+        records = []
+        for rec in self._records:
+            if rec is None:
+                continue
+            remap[rec.id] = rec.id = len(records)
+            records.append(rec)
+        self._records = records
+        self._holes = 0
+        self._ids = {key: remap[i] for key, i in self._ids.items()}
+        self._by_folder = {rel: {remap[i] for i in ids} for rel, ids in self._by_folder.items()}
+        return remap
+
+    # ---------- 查询 ----------
+    def get(self, mod_id):
+        return self._records[mod_id]
+
+    def find(self, rel, pak):
+        return self._ids.get((rel, pak))
+
+    def ids(self):
+        return set(self._ids.values())
+
+    def pairs(self, ids):
+        records = self._records
+        return [(records[i].rel, records[i].pak) for i in ids]
+
+    def keys(self, ids):
+        return [self._records[i].key for i in ids]
+
+    def in_folder(self, rel, recursive=True):
+        """分类 rel 下的模组编号；recursive 时包含各级子分类。"""
+        result = set(self._by_folder.get(rel, ()))
+        if recursive:
+            prefix = rel + os.sep if rel else ""
+            for folder, ids in self._by_folder.items():
+                if folder and folder.startswith(prefix) and folder != rel:
+                    result |= ids
+        return result
+
+    def memory_bytes(self):
+        # 记录对象与 pak 名各计一次，分类字符串已驻留，只计一次
+        size = sys.getsizeof(self._records) + sys.getsizeof(self._ids) + sys.getsizeof(self._by_folder)
+        for rec in self._records:
+            if rec is not None:
+                size += sys.getsizeof(rec) + sys.getsizeof(rec.pak)
+        for key in self._ids:
+            size += sys.getsizeof(key)
+        for folder, ids in self._by_folder.items():
+            size += sys.getsizeof(folder) + sys.getsizeof(ids)
+        return size
+
+    def name_counts(self):
+        counts = {}
+        for rel, pak in self._ids:
+            counts[pak] = counts.get(pak, 0) + 1
+        return counts
@@ -0,0 +1,219 @@
+"""
+move.py
+
+包含：
+- 模组移动单元 (MoveUnit)：.pak 与同名 .png 预览图作为一个整体移动
+- 移动计划 (plan_moves)：按源 / 目标目录的 st_dev 分为同设备与跨设备两组
+- 流式复制 (stream_copy)：分块复制到 .part 临时文件，同时计算 BLAKE2b，完成后重读校验
+- 批量执行 (move_units)：同设备单元直接 os.rename；跨设备 (或改名返回 EXDEV) 时复制 + 校验 + 删除源文件
+
+说明：
+- 跨设备单元先把 .pak 与 .png 都复制并校验完成，再依次 os.replace 到最终位置，最后才删除源文件；
+  中途失败会清理 .part 文件并删除已替换到目标位置的文件，源文件保持不变，不会出现两处各有一份的模组；
+  源 .pak 无法删除 (文件被占用 / 无权限) 时同样撤销目标文件并记为失败；
+  .pak 已删除而源 .png 无法删除时，模组视为已移动，未删除的源文件记入 MoveUnit.leftovers 供调用方提示
+- 同设备单元先改名 .pak，再改名 .png；.png 改名失败时把 .pak 改回原位置
+- progress(done_bytes, total_bytes) 只统计跨设备复制的字节数，同设备改名不计入
+- 返回值与 run_steps 一致：(成功列表, 失败说明列表)
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+
+from core.mod_manager import PART_SUFFIX, mod_key
+from core.tracing import tracer
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class MoveUnit:
+
+    def __init__(self, repo_path, src_rel, pak, dest_rel):
+        self.src_rel = src_rel
+        self.pak = pak
+        self.dest_rel = dest_rel
+        png = pak[:-4] + ".png" if pak.lower().endswith(".pak") else pak + ".png"
+        self.files = [
+            (os.path.join(repo_path, src_rel, name), os.path.join(repo_path, dest_rel, name))
+            for name in (pak, png)
+        ]
+        self.cross_device = False
+        # 跨设备移动后未能删除的源文件 (只可能是预览图，见 _copy_unit)
+        self.leftovers = []
+
+    @property
+    def key(self):
+        return mod_key(self.src_rel, self.pak)
+
+    def existing_files(self):
+        pak_src = self.files[0][0]
+        if not os.path.exists(pak_src):
+            raise FileNotFoundError(errno.ENOENT, "mod not found", pak_src)
+        return [(src, dst) for src, dst in self.files if os.path.exists(src)]
+
+    def size(self):
+        return sum(os.path.getsize(src) for src, _ in self.existing_files())
+
+
+def _device(path):
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+def plan_moves(repo_path, mods, dest_rel):
+    """mods 为 (相对路径, pak) 列表；源与目标相同的模组跳过。"""
+    dest_dev = _device(os.path.join(repo_path, dest_rel))
+    devices = {}
+    units = []
+    for src_rel, pak in mods:
+        if src_rel == dest_rel:
+            continue
+        unit = MoveUnit(repo_path, src_rel, pak, dest_rel)
+        if src_rel not in devices:
+            devices[src_rel] = _device(os.path.join(repo_path, src_rel))
+        unit.cross_device = devices[src_rel] != dest_dev
+        units.append(unit)
+    return units
+
+
+def _file_hash(path):
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                return h.digest()
+            h.update(block)
+
+
+@tracer.traced("move.stream_copy")
+def stream_copy(src, dst, progress=None):
+    """复制到 dst + .part 并校验，成功后返回临时文件路径 (由调用方 os.replace)。"""
+    part = dst + PART_SUFFIX
+    h = hashlib.blake2b(digest_size=20)
+    try:
+        with open(src, "rb") as fin, open(part, "wb") as fout:
+            while True:
+                block = fin.read(CHUNK_SIZE)
+                if not block:
+                    break
+                fout.write(block)
+                h.update(block)
+                if progress:
+                    progress(len(block))
+            fout.flush()
+            os.fsync(fout.fileno())
+        shutil.copystat(src, part)
+        if os.path.getsize(part) != os.path.getsize(src) or _file_hash(part) != h.digest():
+            raise OSError(errno.EIO, "verification failed after copy", dst)
+        return part
+    except OSError:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+
+def _rename_unit(unit):
+    files = unit.existing_files()
+    done = []
+    try:
+        for src, dst in files:
+            if os.path.exists(dst):
+                raise FileExistsError(errno.EEXIST, "target exists", dst)
+            os.rename(src, dst)
+            done.append((src, dst))
+    except OSError:
+        for src, dst in reversed(done):
+            try:
+                os.rename(dst, src)
+            except OSError:
+                pass
+        raise
+
+
+def _copy_unit(unit, progress=None):
+    files = unit.existing_files()
+    parts = []
+    placed = []
+    try:
+        for src, dst in files:
+            if os.path.exists(dst):
+                raise FileExistsError(errno.EEXIST, "target exists", dst)
+            parts.append((stream_copy(src, dst, progress), dst))
+        for part, dst in parts:
+            os.replace(part, dst)
+            placed.append(dst)
+    except OSError:
+        # 目标文件事先不存在 (见上)，已替换到位的副本直接删除，源文件仍完整
+        for dst in placed:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        for part, _ in parts:
+            if os.path.exists(part):
+                os.remove(part)
+        raise
+
+    # 先删除源 .pak：失败时撤销目标文件，模组仍只在原位置
+    try:
+        os.remove(files[0][0])
+    except OSError:
+        for dst in placed:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        raise
+    for src, _ in files[1:]:
+        try:
+            os.remove(src)
+        except OSError:
+            unit.leftovers.append(src)
+
+
+def move_units(units, progress=None):
+    """progress(done_bytes, total_bytes)；返回 (成功的 MoveUnit 列表, 失败说明列表)。"""
+    moved, failed, slow = [], [], []
+
+    # 同设备：只改名，整批快速完成；改名返回 EXDEV (例如目录是指向其它磁盘的链接) 时转入复制
+    with tracer.span("move.rename_batch"):
+        for unit in units:
+            if unit.cross_device:
+                slow.append(unit)
+                continue
+            try:
+                _rename_unit(unit)
+                moved.append(unit)
+            except OSError as e:
+                if e.errno == errno.EXDEV:
+                    unit.cross_device = True
+                    slow.append(unit)
+                else:
+                    failed.append(f"{unit.key}: {e}")
+
+    total = 0
+    for unit in slow:
+        try:
+            total += unit.size()
+        except OSError:
+            pass
+    done = 0
+
+    def advance(n):
+        nonlocal done
+        done += n
+        if progress:
+            progress(done, total)
+
+    for unit in slow:
+        try:
+            _copy_unit(unit, advance)
+            moved.append(unit)
+        except OSError as e:
+            failed.append(f"{unit.key}: {e}")
+    return moved, failed
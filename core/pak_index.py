@@ -0,0 +1,340 @@
+"""
+pak_index.py
+
+包含：
+- Unreal .pak 索引读取 (read_pak_index)：只内存映射文件尾部信息与索引区，不读取资源数据
+- 索引结果 (PakIndex)：版本、挂载点、资源路径列表
+- 按 (路径, 大小, 修改时间) 缓存的索引读取器 (PakIndexCache)，结果保存为 JSON
+- 跨模组资源覆盖冲突统计 (find_asset_conflicts / conflicts_by_mod / scan_asset_conflicts)
+
+实现：
+- 在文件末尾映射的区域中倒序查找 magic (0x5A6F12E1)，解析版本、索引偏移与长度
+- 版本 < 10：索引中逐条读取文件名并跳过旧格式条目
+- 版本 >= 10：读取主索引头部后，再映射完整目录索引 (FullDirectoryIndex) 获取文件名
+- 映射起点按 mmap.ALLOCATIONGRANULARITY 对齐
+
+说明：
+- 索引加密的 pak 无法列出资源，encrypted 为 True，assets 为空
+- 资源路径由挂载点与文件名拼接，去掉开头的 "../" 与 "/"；比较时不区分大小写 (与引擎一致)
+- 同名 pak (不同分类下的副本) 之间的覆盖已由同名冲突提示，不再重复统计
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from core.mod_manager import mod_key, split_mod_key, PART_SUFFIX
+from core.tracing import tracer
+
+PAK_MAGIC = 0x5A6F12E1
+FOOTER_SCAN_SIZE = 1024
+MAX_INDEX_SIZE = 256 * 1024 * 1024
+MAX_ENTRIES = 10_000_000
+
+# 版本 10 起主索引只保存路径哈希与编码条目，文件名移到完整目录索引
+VERSION_PATH_HASH_INDEX = 10
+# 版本 7 起 magic 之前有加密密钥 GUID 与“索引已加密”标志
+VERSION_ENCRYPTION_KEY_GUID = 7
+
+
+class PakIndexError(RuntimeError):
+    pass
+
+
+class PakIndex:
+
+    def __init__(self, version=0, mount_point="", assets=None, encrypted=False):
+        self.version = version
+        self.mount_point = mount_point
+        self.assets = assets or []
+        self.encrypted = encrypted
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "mount": self.mount_point,
+            "assets": self.assets,
+            "encrypted": self.encrypted,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["version"], data["mount"], list(data["assets"]), data["encrypted"])
+
+
+# =========================
+# 二进制读取
+# =========================
+class _Reader:
+
+    def __init__(self, buf, pos=0, end=None):
+        self.buf = buf
+        self.pos = pos
+        self.end = len(buf) if end is None else end
+
+    def _take(self, fmt, size):
+        if self.pos + size > self.end:
+            raise PakIndexError("index truncated")
+        value = struct.unpack_from(fmt, self.buf, self.pos)[0]
+        self.pos += size
+        return value
+
+    def i32(self):
+        return self._take("<i", 4)
+
+    def u32(self):
+        return self._take("<I", 4)
+
+    def i64(self):
+        return self._take("<q", 8)
+
+    def skip(self, n):
+        if n < 0 or self.pos + n > self.end:
+            raise PakIndexError("index truncated")
+        self.pos += n
+
+    def fstring(self):
+        n = self.i32()
+        if n == 0:
+            return ""
+        if n > 0:
+            raw = self.buf[self.pos:self.pos + n]
+            self.skip(n)
+            return bytes(raw).rstrip(b"\x00").decode("utf-8", "replace")
+        raw = self.buf[self.pos:self.pos - n * 2]
+        self.skip(-n * 2)
+        return bytes(raw).decode("utf-16-le", "replace").rstrip("\x00")
+
+    def count(self):
+        n = self.i32()
+        if n < 0 or n > MAX_ENTRIES:
+            raise PakIndexError(f"bad entry count {n}")
+        return n
+
+
+class _Region:
+    """映射文件中的 [offset, offset + length) 区间，对齐部分通过 base 偏移跳过。"""
+
+    def __init__(self, f, offset, length):
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self.base = offset - aligned
+        self.mm = mmap.mmap(f.fileno(), length + self.base, offset=aligned, access=mmap.ACCESS_READ)
+
+    def reader(self, length):
+        return _Reader(self.mm, self.base, self.base + length)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.mm.close()
+        return False
+
+
+def _find_footer(f, file_size):
+    scan = min(file_size, FOOTER_SCAN_SIZE)
+    with _Region(f, file_size - scan, scan) as region:
+        tail = bytes(region.mm[region.base:region.base + scan])
+
+    magic = struct.pack("<I", PAK_MAGIC)
+    pos = tail.rfind(magic)
+    while pos >= 0:
+        if pos + 44 <= len(tail):
+            version, index_offset, index_size = struct.unpack_from("<iqq", tail, pos + 4)
+            if 1 <= version <= 64 and 0 <= index_offset and 0 < index_size <= MAX_INDEX_SIZE \
+                    and index_offset + index_size <= file_size:
+                encrypted = version >= VERSION_ENCRYPTION_KEY_GUID and pos >= 1 and tail[pos - 1] != 0
+                return version, index_offset, index_size, encrypted
+        pos = tail.rfind(magic, 0, pos)
+    raise PakIndexError("pak footer not found")
+
+
+def _skip_legacy_entry(r, version):
+    r.skip(24)                      # Offset / Size / UncompressedSize
+    compression = r.u32()
+    if version == 1:
+        r.skip(8)                   # Timestamp
+    r.skip(20)                      # SHA1
+    if version >= 3:
+        if compression != 0:
+            r.skip(r.count() * 16)  # CompressionBlocks
+        r.skip(5)                   # Flags + CompressionBlockSize
+
+
+def _join_asset(mount, name):
+    path = (mount + name).replace("\\", "/")
+    while path.startswith("../"):
+        path = path[3:]
+    return path.lstrip("/")
+
+
+@tracer.traced("pak.read_index")
+def read_pak_index(path):
+    file_size = os.path.getsize(path)
+    if file_size < 44:
+        raise PakIndexError("file too small")
+
+    with open(path, "rb") as f:
+        version, index_offset, index_size, encrypted = _find_footer(f, file_size)
+        if encrypted:
+            return PakIndex(version, "", [], True)
+
+        with _Region(f, index_offset, index_size) as region:
+            r = region.reader(index_size)
+            mount = r.fstring()
+            entries = r.count()
+
+            if version < VERSION_PATH_HASH_INDEX:
+                assets = []
+                for _ in range(entries):
+                    assets.append(_join_asset(mount, r.fstring()))
+                    _skip_legacy_entry(r, version)
+                tracer.count("pak_index_bytes", index_size)
+                return PakIndex(version, mount, assets)
+
+            r.skip(8)                           # PathHashSeed
+            if r.u32():
+                r.skip(8 + 8 + 20)              # PathHashIndex 偏移 / 长度 / SHA1
+            if not r.u32():
+                raise PakIndexError("pak has no full directory index")
+            dir_offset, dir_size = r.i64(), r.i64()
+
+        if dir_offset < 0 or dir_size <= 0 or dir_size > MAX_INDEX_SIZE or dir_offset + dir_size > file_size:
+            raise PakIndexError("bad directory index location")
+
+        assets = []
+        with _Region(f, dir_offset, dir_size) as region:
+            r = region.reader(dir_size)
+            for _ in range(r.count()):
+                directory = r.fstring()
+                if directory == "/":
+                    directory = ""
+                for _ in range(r.count()):
+                    assets.append(_join_asset(mount, directory + r.fstring()))
+                    r.skip(4)                   # 编码条目位置
+        tracer.count("pak_index_bytes", index_size + dir_size)
+        return PakIndex(version, mount, assets)
+
+
+# =========================
+# 缓存
+# =========================
+class PakIndexCache:
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        part = self.path + PART_SUFFIX
+        try:
+            with open(part, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(part, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"保存 pak 索引缓存失败: {e}")
+
+    def get(self, path):
+        """返回 (PakIndex 或 None, 错误信息)；文件大小与修改时间未变时直接使用缓存。"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self.entries.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime_ns:
+            self.hits += 1
+            if cached.get("error"):
+                return None, cached["error"]
+            return PakIndex.from_dict(cached["index"]), ""
+
+        self.misses += 1
+        entry = {"size": st.st_size, "mtime": st.st_mtime_ns}
+        try:
+            index = read_pak_index(path)
+            entry["index"] = index.to_dict()
+            error = ""
+        except (PakIndexError, OSError, ValueError) as e:
+            index, error = None, str(e)
+            entry["error"] = error
+        self.entries[path] = entry
+        self.dirty = True
+        return index, error
+
+    def prune(self, keep_paths):
+        keep = {os.path.abspath(p) for p in keep_paths}
+        stale = [p for p in self.entries if p not in keep]
+        for p in stale:
+            del self.entries[p]
+        if stale:
+            self.dirty = True
+
+
+# =========================
+# 冲突统计
+# =========================
+def find_asset_conflicts(indexes):
+    """indexes: {模组标识: PakIndex}；返回 {资源路径: [模组标识, ...]}，只包含被不同名 pak 同时覆盖的资源。"""
+    owners = {}
+    display = {}
+    for key in sorted(indexes):
+        for asset in indexes[key].assets:
+            lower = asset.lower()
+            owners.setdefault(lower, []).append(key)
+            display.setdefault(lower, asset)
+
+    conflicts = {}
+    for lower, keys in owners.items():
+        if len(keys) > 1 and len({split_mod_key(k)[1] for k in keys}) > 1:
+            conflicts[display[lower]] = keys
+    return conflicts
+
+
+def conflicts_by_mod(conflicts):
+    """返回 {模组标识: {冲突模组标识: [资源路径, ...]}}。"""
+    result = {}
+    for asset, keys in conflicts.items():
+        for key in keys:
+            others = result.setdefault(key, {})
+            own_pak = split_mod_key(key)[1]
+            for other in keys:
+                if other != key and split_mod_key(other)[1] != own_pak:
+                    others.setdefault(other, []).append(asset)
+    return result
+
+
+@tracer.traced("pak.scan_asset_conflicts")
+def scan_asset_conflicts(core, mods, cache):
+    """mods 为 (相对路径, pak) 列表；返回 (资源冲突, 无法读取的模组 {标识: 错误})。"""
+    indexes, errors, paths = {}, {}, []
+    for rel, pak in mods:
+        path = os.path.join(core.repo_path, rel, pak)
+        paths.append(path)
+        key = mod_key(rel, pak)
+        try:
+            index, error = cache.get(path)
+        except OSError as e:
+            index, error = None, str(e)
+        if index is None:
+            errors[key] = error
+        elif index.encrypted:
+            errors[key] = "index encrypted"
+        else:
+            indexes[key] = index
+    cache.prune(paths)
+    cache.save()
+    return find_asset_conflicts(indexes), errors
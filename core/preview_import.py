@@ -0,0 +1,86 @@
+"""
+preview_import.py
+
+包含：
+- 预览图批量导入的匹配计划 (PreviewMatchPlan)
+- 文件名规范化 (normalize_stem)：忽略大小写、空白与 - _ . 分隔符，以及 Unreal 补丁包的 _P 后缀
+- 图片收集 (collect_images)：展开拖入或选择的文件 / 文件夹
+- 图片与模组匹配 (match_previews)
+
+说明：
+- 不依赖 Qt / PIL，实际的缩小与保存由 PreviewImportWorker 在线程池中完成
+- 同一规范化名称对应多个模组 (不同分类中的同名 pak) 时，每个模组都会写入自己的预览图
+- 多张图片规范化后同名时只取排序后的第一张，其余记入 duplicates
+"""
+
+import os
+import re
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif")
+
+_SEPARATORS = re.compile(r"[\s\-_.]+")
+
+
+class PreviewMatchPlan:
+
+    def __init__(self):
+        self.matches = []
+        self.unmatched = []
+        self.duplicates = []
+
+    @property
+    def mod_count(self):
+        return len(self.matches)
+
+    @property
+    def image_count(self):
+        return len({src for src, _, _ in self.matches})
+
+    def to_dict(self):
+        return {
+            "matches": [{"image": src, "rel": rel, "pak": pak} for src, rel, pak in self.matches],
+            "unmatched": list(self.unmatched),
+            "duplicates": list(self.duplicates),
+        }
+
+
+def normalize_stem(name):
+    stem = os.path.splitext(os.path.basename(name))[0].lower()
+    if stem.endswith("_p"):
+        stem = stem[:-2]
+    return _SEPARATORS.sub("", stem)
+
+
+def collect_images(paths):
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, files in os.walk(path):
+                images.extend(
+                    os.path.join(dirpath, f) for f in files if f.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        elif path.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+            images.append(path)
+    return sorted(images)
+
+
+def match_previews(images, mods):
+    """mods 为 (物理相对路径, pak 文件名) 列表，根目录的相对路径为 ""。"""
+    by_stem = {}
+    for rel, pak in mods:
+        by_stem.setdefault(normalize_stem(pak), []).append((rel, pak))
+
+    plan = PreviewMatchPlan()
+    used = set()
+    for src in images:
+        stem = normalize_stem(src)
+        targets = by_stem.get(stem)
+        if not targets:
+            plan.unmatched.append(src)
+            continue
+        if stem in used:
+            plan.duplicates.append(src)
+            continue
+        used.add(stem)
+        plan.matches.extend((src, rel, pak) for rel, pak in targets)
+    return plan
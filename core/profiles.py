@@ -0,0 +1,130 @@
+"""
+profiles.py
+
+包含：
+- 模组方案切换计划 (ProfileSwitchPlan)
+- 当前已启用模组的标识收集 (enabled_mod_keys)
+- 切换计划生成 (plan_profile_switch)：对比游戏 Paks 目录现状计算差量
+- 切换计划执行 (apply_profile_switch)：只删除离开的模组，只复制新加入的模组；可写入批量操作日志
+
+说明：
+- 方案是模组标识 ("分类/名称.pak") 的列表，保存在 config.json 的 profiles 中
+- 只处理仓库中存在同名文件的游戏 pak，游戏自带或手动放入的 pak 不受影响
+- 目标文件与源文件大小、修改时间一致即视为已部署，不再复制 (copy2 会保留 mtime)
+- copy_bytes 为实际复制字节数，naive_bytes 为“全部禁用再全部启用”所需的复制字节数
+"""
+
+import os
+
+from core.mod_manager import mod_key, split_mod_key, is_same_copy
+from core.journal import run_steps, run_journaled
+
+
+class ProfileSwitchPlan:
+
+    def __init__(self):
+        self.to_remove = []
+        self.to_deploy = []
+        self.kept = []
+        self.missing = []
+        self.clashes = []
+        self.copy_bytes = 0
+        self.naive_bytes = 0
+
+    @property
+    def bytes_avoided(self):
+        return self.naive_bytes - self.copy_bytes
+
+    def to_dict(self):
+        return {
+            "remove": list(self.to_remove),
+            "deploy": [mod_key(rel, pak) for rel, pak, _ in self.to_deploy],
+            "kept": [mod_key(rel, pak) for rel, pak in self.kept],
+            "missing": list(self.missing),
+            "clashes": list(self.clashes),
+            "copy_bytes": self.copy_bytes,
+            "naive_bytes": self.naive_bytes,
+            "bytes_avoided": self.bytes_avoided,
+        }
+
+
+def enabled_mod_keys(core, mods):
+    game_files = core.get_game_files()
+    candidates = {}
+    for rel, pak in mods:
+        if pak in game_files:
+            candidates.setdefault(pak, []).append(rel)
+
+    keys = []
+    for pak, rels in candidates.items():
+        chosen = rels[0]
+        if len(rels) > 1:
+            # 同名模组：取与游戏目录中副本一致的那一个
+            try:
+                dst_st = os.stat(os.path.join(core.game_path, pak))
+                for rel in rels:
+                    if is_same_copy(os.stat(os.path.join(core.repo_path, rel, pak)), dst_st):
+                        chosen = rel
+                        break
+            except OSError:
+                pass
+        keys.append(mod_key(chosen, pak))
+    return sorted(keys)
+
+
+def plan_profile_switch(core, mods, keys):
+    plan = ProfileSwitchPlan()
+    mod_set = set(mods)
+    repo_names = {pak for _, pak in mods}
+    game_files = core.get_game_files()
+
+    wanted = {}
+    for key in keys:
+        rel, pak = split_mod_key(key)
+        if (rel, pak) not in mod_set:
+            plan.missing.append(key)
+        elif pak in wanted:
+            plan.clashes.append(key)
+        else:
+            wanted[pak] = rel
+
+    for name in sorted(game_files):
+        if name in repo_names and name not in wanted:
+            plan.to_remove.append(name)
+
+    for pak, rel in wanted.items():
+        try:
+            src_st = os.stat(os.path.join(core.repo_path, rel, pak))
+        except OSError:
+            plan.missing.append(mod_key(rel, pak))
+            continue
+        plan.naive_bytes += src_st.st_size
+
+        if pak in game_files:
+            try:
+                if is_same_copy(src_st, os.stat(os.path.join(core.game_path, pak))):
+                    plan.kept.append((rel, pak))
+                    continue
+            except OSError:
+                pass
+        plan.to_deploy.append((rel, pak, src_st.st_size))
+        plan.copy_bytes += src_st.st_size
+
+    return plan
+
+
+def apply_profile_switch(core, plan, journal=None):
+    steps = [{"op": "remove", "pak": name} for name in plan.to_remove]
+    steps.extend(
+        {"op": "copy", "src": os.path.join(core.repo_path, rel, pak), "pak": pak, "key": mod_key(rel, pak)}
+        for rel, pak, _ in plan.to_deploy
+    )
+
+    if journal is not None:
+        completed, failed = run_journaled(journal, core.game_path, steps)
+    else:
+        completed, failed = run_steps(core.game_path, steps)
+
+    removed = [step["pak"] for step in completed if step["op"] == "remove"]
+    deployed = [step["key"] for step in completed if step["op"] == "copy"]
+    return removed, deployed, failed
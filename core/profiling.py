@@ -0,0 +1,50 @@
+"""
+profiling.py
+
+包含：
+- 启动阶段计时器 (StartupProfiler)
+- 全局实例 startup_profiler
+
+实现：
+- time.perf_counter() 记录各阶段结束时刻，相邻两次 mark() 之差即阶段耗时
+- 未启用时 mark() / finish() 直接返回，不产生额外开销
+- finish() 打印阶段耗时表，此后不再记录
+"""
+
+import time
+
+
+class StartupProfiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.finished = False
+        self.t0 = time.perf_counter()
+        self.last = self.t0
+        self.phases = []
+
+    def enable(self):
+        self.enabled = True
+
+    def mark(self, phase):
+        if not self.enabled or self.finished:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def finish(self):
+        if not self.enabled or self.finished:
+            return
+        self.finished = True
+
+        total = self.last - self.t0
+        width = max([len(name) for name, _ in self.phases] + [5])
+        print(f"{'phase':<{width}}  {'ms':>9}  {'%':>6}")
+        for name, dt in self.phases:
+            pct = dt / total * 100 if total > 0 else 0.0
+            print(f"{name:<{width}}  {dt * 1000:>9.1f}  {pct:>5.1f}%")
+        print(f"{'total':<{width}}  {total * 1000:>9.1f}")
+
+
+startup_profiler = StartupProfiler()
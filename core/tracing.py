@@ -0,0 +1,176 @@
+"""
+tracing.py
+
+包含：
+- 轻量追踪器 (Tracer) 与全局实例 tracer
+- 命名耗时区间 span() / 装饰器 traced()
+- 计数器 count()、瞬时值 gauge()、瞬时事件 instant()
+- 滚动分位数统计 (p50 / p90 / p99) 与 Chrome Trace JSON 导出
+
+实现：
+- 未启用时 span() 返回共享的空上下文，traced() 包装函数只多一次属性判断
+- 启用后事件写入有界 deque (超出上限丢弃最早的事件)，耗时另存每个名称最近 512 个样本
+- 导出格式为 chrome://tracing / Perfetto 可读取的 {"traceEvents": [...]}
+- 时间戳使用 time.perf_counter_ns()，单位换算为微秒
+
+说明：
+- 可在任意线程中调用；计数器更新加锁，事件追加依赖 deque.append 的原子性
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_EVENTS = 200_000
+MAX_SAMPLES = 512
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer._add_span(self.name, self.start, end, self.args, exc_type is not None)
+        return False
+
+
+class Tracer:
+
+    def __init__(self):
+        self.enabled = False
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.samples = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.samples.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    # ---------- 记录 ----------
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def traced(self, name):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*a, **kw):
+                if not self.enabled:
+                    return fn(*a, **kw)
+                with _Span(self, name, {}):
+                    return fn(*a, **kw)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+        self.events.append({
+            "name": name, "ph": "C", "ts": time.perf_counter_ns() / 1000,
+            "pid": self._pid, "tid": 0, "args": {name: total},
+        })
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        self.gauges[name] = value
+        self.events.append({
+            "name": name, "ph": "C", "ts": time.perf_counter_ns() / 1000,
+            "pid": self._pid, "tid": 0, "args": {name: value},
+        })
+
+    def instant(self, name, **args):
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name, "ph": "i", "s": "p", "ts": time.perf_counter_ns() / 1000,
+            "pid": self._pid, "tid": threading.get_ident(), "args": args,
+        })
+
+    def _add_span(self, name, start, end, args, failed):
+        dur_us = (end - start) / 1000
+        event = {
+            "name": name, "ph": "X", "ts": start / 1000, "dur": dur_us,
+            "pid": self._pid, "tid": threading.get_ident(),
+        }
+        if args or failed:
+            event["args"] = dict(args, error=True) if failed else args
+        self.events.append(event)
+
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, deque(maxlen=MAX_SAMPLES))
+        samples.append(dur_us / 1000)
+
+    # ---------- 统计与导出 ----------
+    def percentiles(self, name):
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return None
+        last = len(values) - 1
+        return {
+            "count": len(values),
+            "p50": values[int(last * 0.50)],
+            "p90": values[int(last * 0.90)],
+            "p99": values[int(last * 0.99)],
+            "max": values[last],
+        }
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "spans": {name: self.percentiles(name) for name in sorted(self.samples)},
+            "counters": counters,
+            "gauges": dict(self.gauges),
+        }
+
+    def export_chrome_trace(self, path):
+        names = [{
+            "name": "thread_name", "ph": "M", "pid": self._pid, "tid": t.ident,
+            "args": {"name": t.name},
+        } for t in threading.enumerate()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": names + list(self.events), "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
@@ -0,0 +1,245 @@
+"""
+trash.py
+
+包含：
+- 仓库内隐藏暂存目录 (TrashBin)：删除时先 os.rename 移入，O(1) 完成
+- 一次删除操作的暂存批次 (TrashBatch)：stage / restore / purge，清单写入 manifest.json
+- 后台清理线程 (TrashPurger)：延迟到撤销期结束后以低优先级 shutil.rmtree，可在开始前取消
+
+说明：
+- 暂存目录位于仓库根目录 (TRASH_DIR_NAME)，与被删除文件处于同一文件系统，因此移动只是改名；
+  分类文件夹是指向其它磁盘的链接 / 联接点时改名返回 EXDEV，改为复制后删除源 (恢复时同样处理)
+- 删除前已启用的模组记入批次 (deployed，连同游戏目录写入清单)，撤销时 redeploy() 重新部署到游戏目录
+- 扫描仓库时跳过暂存目录；Windows 下额外设置隐藏属性
+- 上次运行留下的批次 (撤销期已过或程序中途退出) 由 leftover_batches() 列出，启动后直接清理
+- 清理线程在 Linux 下调低本线程 nice 值，在 Windows 下进入后台模式 (同时降低 I/O 优先级)
+"""
+
+import errno
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from core.tracing import tracer
+
+TRASH_DIR_NAME = ".smm_trash"
+MANIFEST_NAME = "manifest.json"
+
+
+def _hide_dir(path):
+    if os.name != "nt":
+        return
+    try:
+        import ctypes
+        FILE_ATTRIBUTE_HIDDEN = 0x02
+        ctypes.windll.kernel32.SetFileAttributesW(path, FILE_ATTRIBUTE_HIDDEN)
+    except Exception:
+        pass
+
+
+def _lower_thread_priority():
+    try:
+        if os.name == "nt":
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif hasattr(os, "setpriority"):
+            # Linux 的 nice 值按线程生效，这里只影响清理线程
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (OSError, AttributeError):
+        pass
+
+
+def _remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _move(src, dst):
+    """改名；跨设备 (EXDEV) 时复制到 dst 后删除 src，复制失败时清理 dst，src 保持不变。"""
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    try:
+        if os.path.isdir(src) and not os.path.islink(src):
+            shutil.copytree(src, dst, symlinks=True)
+        else:
+            shutil.copy2(src, dst, follow_symlinks=False)
+    except OSError:
+        if os.path.lexists(dst):
+            try:
+                _remove_path(dst)
+            except OSError:
+                pass
+        raise
+    tracer.count("trash_cross_device", 1)
+    _remove_path(src)
+
+
+class TrashBatch:
+
+    def __init__(self, repo_path, path, entries=None, deployed=None, game_path=""):
+        self.repo_path = repo_path
+        self.path = path
+        self.id = os.path.basename(path)
+        self.entries = entries or []
+        # 删除前已启用、已从游戏目录移除的模组 [(相对路径, pak)]
+        self.deployed = deployed or []
+        self.game_path = game_path
+
+    def stage(self, rel_path):
+        """把仓库内的文件或文件夹移入本批次；目标不存在时返回 False。"""
+        src = os.path.join(self.repo_path, rel_path)
+        if not os.path.lexists(src):
+            return False
+        stored = str(len(self.entries))
+        try:
+            _move(src, os.path.join(self.path, stored))
+        except OSError:
+            # 复制已完成、只是删除源失败时，暂存副本仍记入批次，撤销时可以恢复
+            if os.path.lexists(os.path.join(self.path, stored)):
+                self.entries.append((stored, rel_path))
+            raise
+        self.entries.append((stored, rel_path))
+        return True
+
+    def record_deployed(self, game_path, rel, pak):
+        self.game_path = game_path
+        self.deployed.append((rel, pak))
+
+    def save_manifest(self):
+        with open(os.path.join(self.path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries, "deployed": self.deployed, "game": self.game_path},
+                      f, ensure_ascii=False)
+
+    def redeploy(self):
+        """把删除前已启用的模组重新部署到游戏目录；返回失败说明列表。"""
+        from core.mod_manager import deploy_copy
+
+        failed = []
+        if not self.game_path:
+            return failed
+        for rel, pak in self.deployed:
+            src = os.path.join(self.repo_path, rel, pak)
+            if not os.path.exists(src):
+                continue
+            try:
+                deploy_copy(src, os.path.join(self.game_path, pak))
+            except OSError as e:
+                failed.append(f"{pak}: {e}")
+        return failed
+
+    def restore(self):
+        """按相反顺序改名回原位置；返回无法恢复的原相对路径列表 (原位置已被占用或改名失败)。"""
+        failed = []
+        for stored, rel_path in reversed(self.entries):
+            dst = os.path.join(self.repo_path, rel_path)
+            if os.path.lexists(dst):
+                failed.append(rel_path)
+                continue
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                _move(os.path.join(self.path, stored), dst)
+            except OSError:
+                failed.append(rel_path)
+        if not failed:
+            shutil.rmtree(self.path, ignore_errors=True)
+        return failed
+
+    @tracer.traced("trash.purge")
+    def purge(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TrashBin:
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self.root = os.path.join(repo_path, TRASH_DIR_NAME)
+
+    def new_batch(self):
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            _hide_dir(self.root)
+        path = os.path.join(self.root, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(path)
+        return TrashBatch(self.repo_path, path)
+
+    def leftover_batches(self):
+        if not os.path.isdir(self.root):
+            return []
+        batches = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            entries, deployed, game_path = [], [], ""
+            try:
+                with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                entries = [tuple(e) for e in data["entries"]]
+                deployed = [tuple(e) for e in data.get("deployed", [])]
+                game_path = data.get("game", "")
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+            batches.append(TrashBatch(self.repo_path, path, entries, deployed, game_path))
+        return batches
+
+
+class TrashPurger:
+    """单个守护线程按到期时间依次清理批次；未开始的批次可以取消 (用于撤销)。"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = []
+        self._stopped = False
+        self._thread = None
+
+    def submit(self, batch, delay=0.0):
+        with self._cond:
+            self._queue.append((time.monotonic() + delay, batch))
+            self._queue.sort(key=lambda x: x[0])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TrashPurger", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, batch):
+        with self._cond:
+            for i, (_, queued) in enumerate(self._queue):
+                if queued is batch:
+                    del self._queue[i]
+                    return True
+        return False
+
+    def stop(self):
+        # 未到期的批次留在暂存目录中，下次启动时作为遗留批次清理
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        _lower_thread_priority()
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._queue:
+                        wait = self._queue[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                _, batch = self._queue.pop(0)
+            batch.purge()
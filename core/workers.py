@@ -3,71 +3,340 @@ workers.py
 
 包含：
 - 图片加载信号类 (QObject + pyqtSignal)
-- 图片异步加载任务 (QRunnable 子类)
+- 缩略图结果队列 (ThumbnailQueue：工作线程追加结果，界面线程按帧分批取出)
+- 图片异步加载任务 (ImageLoadWorker：读取与解码在同一线程中完成)
+- 缩略图两段式加载任务 (ImageReadWorker 在 I/O 池中读取文件，ImageDecodeWorker 在解码池中解码；
+  后台任务可改交 ProcessDecoder 在子进程中解码)
+- 预览图异步导入任务 (PreviewImportWorker，缩小并保存后直接回传缩略图与原图)
+- 批量移动任务 (MoveWorker，同设备改名 / 跨设备流式复制，按千分比回传字节进度)
+- 重复内容扫描任务 (DedupScanWorker，后台计算哈希并回传去重计划)
+- 仓库增量镜像任务 (MirrorWorker，按清单复制变化的文件，按千分比回传字节进度)
+- pak 资源覆盖冲突扫描任务 (AssetConflictWorker，读取各 pak 索引后回传冲突表，并增量更新资源搜索索引)
 
 实现：
 - 在线程池中执行 run()
-- 使用 PIL.Image 打开与处理图片
-- 生成原图与缩略图
-- 通过 pyqtSignal.emit() 将 QImage 回传主线程
+- 使用 PIL.Image 打开与处理图片 (首次执行时在工作线程中导入，不占用启动时间)
+- 生成原图与缩略图 (缩略图按调用方给定的档位边长生成，并在工作线程中平滑缩放到显示尺寸)；
+  解码由 core.image_decode.decode_thumbnail 完成，线程与子进程得到相同结果
+- 读取与解码分在两个线程池：磁盘慢时读取线程阻塞在 I/O 上，不占用解码线程；
+  两段任务都带优先级，界面可用 QThreadPool.tryTake() 取回尚未开始的任务并以更高优先级重新提交
+- 图片加载结果放入 ThumbnailQueue，不逐个发出信号；队列由空变为非空时才发出一次 ready，
+  界面线程收到后用定时器按帧取出，避免成千上万个排队事件挤占事件循环
+- 其它任务通过 pyqtSignal.emit() 将结果回传主线程
 - 异常处理与空图回退
 """
 
-import os
+import threading
+from collections import deque
 
 from PyQt6.QtCore import QRunnable, pyqtSignal, QObject
 from PyQt6.QtGui import QImage
-from PIL import Image
 
-from core.image_utils import pil_to_qimage
+from core.image_decode import decode_thumbnail
+from core.image_utils import pil_to_qimage, rgba_to_qimage
+from core.tracing import tracer
 
 
 
 class ImageLoadSignals(QObject):
-    image_loaded = pyqtSignal(str, QImage, QImage, str)
+    # tid, 缩略图, 原图, 错误信息 (成功时为空字符串)
+    preview_imported = pyqtSignal(str, QImage, QImage, str)
+
+
+
+class ThumbnailQueue(QObject):
+    # 队列由空变为非空时发出；界面线程取空队列 (take() 返回 None) 后才会再次发出
+    ready = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._signalled = False
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, result):
+        with self._lock:
+            self._items.append(result)
+            if self._signalled:
+                return
+            self._signalled = True
+        self.ready.emit()
+
+    def take(self):
+        with self._lock:
+            if self._items:
+                return self._items.popleft()
+            self._signalled = False
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+
+class AssetScanSignals(QObject):
+    # 扫描序号, {资源路径: [模组标识]}, {模组标识: 错误信息}
+    finished = pyqtSignal(int, object, object)
+
+
+
+class MoveSignals(QObject):
+    # 已复制字节, 总字节 (跨设备部分)；可能超过 32 位整数范围，使用 object
+    progress = pyqtSignal(object, object)
+    # 成功的 MoveUnit 列表, 失败说明列表
+    finished = pyqtSignal(object, object)
+
+
+
+class DedupSignals(QObject):
+    # 已读取字节, 需读取的总字节
+    progress = pyqtSignal(object, object)
+    # DedupPlan
+    finished = pyqtSignal(object)
+
+
+
+class MirrorSignals(QObject):
+    # 已复制字节, 需复制的总字节
+    progress = pyqtSignal(object, object)
+    # 结果字典 (见 core.mirror.apply_mirror)
+    finished = pyqtSignal(object)
+
+
+
+def _read_image(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _thumb_result(raw_name, tid, display_size, raw):
+    """把 decode_thumbnail 的结果转为放入 ThumbnailQueue 的元组；raw 为 None 时图片均为空 QImage。"""
+    if raw is None:
+        empty = QImage()
+        return raw_name, empty, empty, display_size, empty, tid
+    full, thumb, display = raw
+    thumb_img = rgba_to_qimage(thumb)
+    display_img = thumb_img if display is thumb else rgba_to_qimage(display)
+    tracer.count("thumbnails_decoded")
+    return raw_name, thumb_img, display_img, display_size, rgba_to_qimage(full), tid
 
 
 
 class ImageLoadWorker(QRunnable):
+    """结果为 (名称, 档位缩略图, 显示尺寸缩略图, 显示尺寸, 原图, tid)，放入 queue；失败时图片均为空 QImage。"""
 
-    def __init__(self, path, raw_name, tid, callback_signal):
+    def __init__(self, path, raw_name, tid, queue, thumb_size=60, display_size=None):
         super().__init__()
         self.path = path
         self.raw_name = raw_name
         self.tid = tid
+        self.queue = queue
+        self.thumb_size = thumb_size
+        self.display_size = display_size or thumb_size
+
+    @tracer.traced("worker.image_load")
+    def run(self):
+        data = _read_image(self.path)
+        raw = decode_thumbnail(data, self.thumb_size, self.display_size) if data else None
+        self.queue.put(_thumb_result(self.raw_name, self.tid, self.display_size, raw))
+
+
+
+class ImageReadWorker(QRunnable):
+    """缩略图加载的读取阶段，结果与 ImageLoadWorker 相同。
+
+    读取完成后以 priority 提交 ImageDecodeWorker 到 decode_pool；设置了 process_decoder 时改交子进程解码，
+    进程池不可用时退回线程解码。任务不自动删除，由调用方持有，以便 tryTake() 后调整优先级重新提交。
+    """
+
+    def __init__(self, path, raw_name, tid, queue, decode_pool, thumb_size=60, display_size=None,
+                 priority=0, process_decoder=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.raw_name = raw_name
+        self.tid = tid
+        self.queue = queue
+        self.decode_pool = decode_pool
+        self.thumb_size = thumb_size
+        self.display_size = display_size or thumb_size
+        self.priority = priority
+        self.process_decoder = process_decoder
+        # 已提交到解码池的任务，尚未开始时同样可以 tryTake()
+        self.decode_task = None
+
+    def _put(self, raw):
+        self.queue.put(_thumb_result(self.raw_name, self.tid, self.display_size, raw))
+
+    @tracer.traced("worker.image_read")
+    def run(self):
+        data = _read_image(self.path)
+        if not data:
+            self._put(None)
+            return
+
+        decoder = self.process_decoder
+        if decoder is not None:
+            try:
+                decoder.submit(data, self.thumb_size, self.display_size, self._put)
+                tracer.count("thumbnails_process_decode")
+                return
+            except Exception:
+                pass
+
+        self.decode_task = ImageDecodeWorker(data, self)
+        self.decode_pool.start(self.decode_task, self.priority)
+
+
+
+class ImageDecodeWorker(QRunnable):
+
+    def __init__(self, data, read_task):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.data = data
+        self.read_task = read_task
+
+    @tracer.traced("worker.image_decode")
+    def run(self):
+        task = self.read_task
+        data, self.data = self.data, None
+        task._put(decode_thumbnail(data, task.thumb_size, task.display_size))
+
+
+
+class PreviewImportWorker(QRunnable):
+
+    def __init__(self, core, src_path, dest_path, tid, callback_signal, max_size, compress_level, thumb_size=60):
+        super().__init__()
+        self.core = core
+        self.src_path = src_path
+        self.dest_path = dest_path
+        self.tid = tid
         self.callback_signal = callback_signal
+        self.max_size = max_size
+        self.compress_level = compress_level
+        self.thumb_size = thumb_size
 
+    @tracer.traced("worker.preview_import")
     def run(self):
         try:
-            if os.path.exists(self.path):
-
-                with Image.open(self.path) as pil:
-                    pil.load()
-
-                    # 原图
-                    full_qimg = pil_to_qimage(pil)
-
-                    # 缩略图
-                    pil.thumbnail((60, 60), Image.Resampling.LANCZOS)
-
-                    self.callback_signal.emit(
-                        self.raw_name,
-                        pil_to_qimage(pil),
-                        full_qimg,
-                        self.tid
-                    )
-            else:
-                self.callback_signal.emit(
-                    self.raw_name,
-                    QImage(),
-                    QImage(),
-                    self.tid
-                )
-
-        except Exception:
-            self.callback_signal.emit(
-                self.raw_name,
-                QImage(),
-                QImage(),
-                self.tid
+            from PIL import Image
+
+            pil = self.core.save_preview_image(
+                self.src_path, self.dest_path, self.max_size, self.compress_level
             )
+            full_qimg = pil_to_qimage(pil)
+            pil.thumbnail((self.thumb_size, self.thumb_size), Image.Resampling.LANCZOS)
+            self.callback_signal.emit(self.tid, pil_to_qimage(pil), full_qimg, "")
+
+        except Exception as e:
+            self.callback_signal.emit(self.tid, QImage(), QImage(), str(e))
+
+
+
+class AssetConflictWorker(QRunnable):
+
+    def __init__(self, core, mods, cache, generation, signals, search_index=None):
+        super().__init__()
+        self.core = core
+        self.mods = mods
+        self.cache = cache
+        self.generation = generation
+        self.signals = signals
+        self.search_index = search_index
+
+    def run(self):
+        from core.pak_index import scan_asset_conflicts
+        try:
+            conflicts, errors = scan_asset_conflicts(self.core, self.mods, self.cache)
+            if self.search_index is not None:
+                self.search_index.update(self.core, self.mods, self.cache)
+                self.search_index.save()
+        except Exception as e:
+            conflicts, errors = {}, {"": str(e)}
+        self.signals.finished.emit(self.generation, conflicts, errors)
+
+
+
+class MoveWorker(QRunnable):
+
+    def __init__(self, units, signals):
+        super().__init__()
+        self.units = units
+        self.signals = signals
+        self._last_permille = -1
+
+    def _progress(self, done, total):
+        permille = done * 1000 // total if total else 1000
+        if permille != self._last_permille:
+            self._last_permille = permille
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        from core.move import move_units
+        try:
+            moved, failed = move_units(self.units, self._progress)
+        except Exception as e:
+            moved, failed = [], [str(e)]
+        self.signals.finished.emit(moved, failed)
+
+
+
+class DedupScanWorker(QRunnable):
+
+    def __init__(self, core, mods, cache, signals):
+        super().__init__()
+        self.core = core
+        self.mods = mods
+        self.cache = cache
+        self.signals = signals
+        self._last_permille = -1
+
+    def _progress(self, done, total):
+        permille = done * 1000 // total if total else 1000
+        if permille != self._last_permille:
+            self._last_permille = permille
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        from core.dedup import find_duplicates, DedupPlan
+        try:
+            plan = find_duplicates(self.core, self.mods, self.cache, self._progress)
+        except Exception as e:
+            plan = DedupPlan()
+            plan.errors.append(str(e))
+        self.signals.finished.emit(plan)
+
+
+
+class MirrorWorker(QRunnable):
+
+    def __init__(self, core, dest, cache, signals):
+        super().__init__()
+        self.core = core
+        self.dest = dest
+        self.cache = cache
+        self.signals = signals
+        self._last_permille = -1
+
+    def _progress(self, done, total):
+        permille = done * 1000 // total if total else 1000
+        if permille != self._last_permille:
+            self._last_permille = permille
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.core.mirror_to(self.dest, self.cache, self._progress)
+        except Exception as e:
+            result = {"copied": [], "renamed": [], "deleted": [], "unchanged": 0,
+                      "bytes_copied": 0, "failed": [str(e)]}
+        self.signals.finished.emit(result)
@@ -32,11 +32,41 @@ class I18nManager:
             "btn_refresh": "Refresh",
             "btn_lang_toggle": "中文",
             "conflict_warn": "⚠ {} Name Conflicts",
+            "progress_move": "Moving mods...",
+            "btn_dedup": "Deduplicate",
+            "dialog_dedup_title": "Deduplicate Library",
+            "progress_dedup_scan": "Hashing paks with matching sizes...",
+            "msg_no_duplicates": "No byte-identical paks were found.",
+            "confirm_dedup": "{0} redundant copies in {1} groups of identical paks.\nReplace them with links to a single shared copy? About {2} can be reclaimed.",
+            "msg_dedup_done": "Linked {0} copies, reclaimed {1}. {2} failed.",
+            "log_dedup_failed": "Deduplication: {}",
+            "btn_mirror": "Backup",
+            "dialog_mirror_title": "Backup Library",
+            "progress_mirror": "Copying new and changed files to the backup...",
+            "msg_mirror_done": "Copied {0} files ({4}), moved {1}, deleted {2}, {3} unchanged. {5} failed.",
+            "log_mirror_failed": "Backup: {}",
+            "btn_undo_delete": "↶ Undo Delete ({})",
+            "log_undo_delete_failed": "Could not restore {} item(s), the original location is occupied: {}",
+            "log_trash_unavailable": "Staging directory unavailable, deleting permanently: {}",
+            "btn_search_assets": "Assets",
+            "tip_search_assets": "Search the asset paths stored inside each pak instead of file names",
+            "search_assets_placeholder": "🔍 Search asset paths inside paks... (e.g. Character/Outfit texture)",
+            "asset_conflict_warn": "⚠ {} Overridden Assets",
+            "asset_clash_tooltip": "Overrides the same game assets as:",
+            "log_pak_index_unreadable": "Could not read the asset index of {} pak(s)",
             "selected_count": "{} Mods Selected",
             "header_folder": "Category",
             "header_preview": "Preview",
             "header_name": "Mod Name",
             "header_action": "Status",
+            "header_targets": "Other Targets",
+            "header_size": "Size",
+            "header_modified": "Modified",
+            "btn_add_target": "Add Target",
+            "btn_remove_target": "Remove Target",
+            "tip_target": "Deployment target: enabling and disabling apply to this game directory",
+            "dialog_target_title": "Add Deployment Target",
+            "dialog_target_label": "Target name:",
             "cat_uncategorized": "Uncategorized",
             "mod_enabled": "Enabled",
             "mod_disabled": "Disabled",
@@ -54,11 +84,62 @@ class I18nManager:
             "msg_create_folder_fail_detail": "Failed to create folder: {}",
             "log_style_format_failed": "Stylesheet formatting failed, missing placeholder: {}",
             "log_move_failed": "Move failed: {} item(s) affected: {}",
+            "log_move_source_left": "Moved, but {} source file(s) could not be removed: {}",
             "log_folder_delete_failed": "Folder delete failed: {} item(s) affected: {}",
             "log_file_delete_failed": "File delete failed: {}: {}",
             "log_batch_failed": "Batch operation failed: {} item(s) affected: {}",
             "log_preview_failed": "Preview processing failed: {}",
             "log_preview_exception": "Preview processing exception: {}",
+            "profile_label": "Profile:",
+            "btn_profile_save": "Save Profile",
+            "btn_profile_switch": "Switch Profile",
+            "btn_profile_delete": "Delete Profile",
+            "dialog_profile_title": "Save Profile",
+            "dialog_profile_label": "Profile name (saves selected mods, or enabled mods if none selected):",
+            "profile_switched": "Removed {}, deployed {}, kept {} · {} copy avoided",
+            "btn_import_previews": "Import Previews",
+            "dialog_import_previews_title": "Import Previews",
+            "confirm_import_previews": "{0} images match {1} mods ({2} images not matched).\nImport them as previews? Existing previews will be replaced.",
+            "msg_no_preview_matches": "No image matched a mod name ({0} images checked).",
+            "progress_import_previews": "Importing previews...",
+            "log_previews_imported": "Previews imported: {} succeeded, {} failed",
+            "log_profile_failed": "Profile switch failed: {} item(s) affected: {}",
+            "confirm_resume_title": "Unfinished Operation",
+            "btn_export_trace": "Export Trace",
+            "btn_reset_trace": "Reset",
+            "perf_header_span": "Span",
+            "log_trace_export_failed": "Trace export failed: {}",
+            "dialog_memory_title": "Memory Report",
+            "mem_process": "Process",
+            "mem_images": "Images",
+            "mem_widgets": "Widgets",
+            "mem_mods": "Mods",
+            "mem_indexes": "Indexes",
+            "mem_tracemalloc": "Allocation sites (tracemalloc)",
+            "mem_not_tracing": "not tracing",
+            "mem_no_allocations": "no allocations",
+            "mem_rss": "Resident memory",
+            "mem_qimage_cache": "Full image cache",
+            "mem_thumb_queue": "Thumbnail result queue",
+            "mem_thumb_tasks": "Pending thumbnail tasks",
+            "mem_thumbnail_tiers": "Thumbnail tiers",
+            "mem_label_pixmaps": "Preview pixmaps",
+            "mem_live_widgets": "Live widgets",
+            "mem_tree_items": "Tree items",
+            "mem_item_map": "Thumbnail label map",
+            "mem_pending_imports": "Pending preview imports",
+            "mem_mod_table": "Mod table",
+            "mem_repo_mod_ids": "Repository mod IDs",
+            "mem_selected_ids": "Selected mod IDs",
+            "mem_known_mods": "Known mods",
+            "mem_folder_states": "Folder states",
+            "mem_pak_index_cache": "Pak index cache",
+            "mem_asset_postings": "Asset search postings",
+            "mem_asset_mod_tokens": "Asset search tokens per mod",
+            "mem_asset_blobs": "Asset search path cache",
+            "mem_dir_snapshots": "Directory snapshots",
+            "msg_memory_summary": "Process: {0}  Images: {1}  Indexes: {2}",
+            "confirm_resume_batch": "The last batch operation was interrupted ({0} of {1} steps remaining).\nResume it now? Choosing No discards the remaining steps.",
         }
 
         self.default_zh = {
@@ -80,11 +161,41 @@ class I18nManager:
             "btn_refresh": "刷新",
             "btn_lang_toggle": "EN",
             "conflict_warn": "⚠ {} 处名称冲突",
+            "progress_move": "正在移动模组...",
+            "btn_dedup": "去重",
+            "dialog_dedup_title": "仓库去重",
+            "progress_dedup_scan": "正在计算大小相同的 pak 的哈希...",
+            "msg_no_duplicates": "没有发现内容完全相同的 pak。",
+            "confirm_dedup": "发现 {1} 组内容相同的 pak，共 {0} 个多余副本。\n是否替换为指向同一份文件的链接？预计可回收 {2}。",
+            "msg_dedup_done": "已链接 {0} 个副本，回收 {1}。失败 {2} 个。",
+            "log_dedup_failed": "去重: {}",
+            "btn_mirror": "备份",
+            "dialog_mirror_title": "备份模组库",
+            "progress_mirror": "正在把新增与变化的文件复制到备份目录...",
+            "msg_mirror_done": "复制 {0} 个文件 ({4})，移动 {1} 个，删除 {2} 个，{3} 个未变化。失败 {5} 个。",
+            "log_mirror_failed": "备份: {}",
+            "btn_undo_delete": "↶ 撤销删除 ({})",
+            "log_undo_delete_failed": "有 {} 项无法恢复，原位置已被占用: {}",
+            "log_trash_unavailable": "暂存目录不可用，将直接删除: {}",
+            "btn_search_assets": "资源",
+            "tip_search_assets": "按 pak 内部的资源路径搜索，而不是文件名",
+            "search_assets_placeholder": "🔍 搜索 pak 内的资源路径... (例如 Character/Outfit texture)",
+            "asset_conflict_warn": "⚠ {} 个资源被重复覆盖",
+            "asset_clash_tooltip": "与以下模组覆盖了相同的游戏资源：",
+            "log_pak_index_unreadable": "有 {} 个 pak 的资源索引无法读取",
             "selected_count": "已选择 {} 个模组文件",
             "header_folder": "分类",
             "header_preview": "预览",
             "header_name": "模组名称",
             "header_action": "状态",
+            "header_targets": "其它目标",
+            "header_size": "大小",
+            "header_modified": "修改时间",
+            "btn_add_target": "添加目标",
+            "btn_remove_target": "移除目标",
+            "tip_target": "部署目标：启用 / 禁用作用于此游戏目录",
+            "dialog_target_title": "添加部署目标",
+            "dialog_target_label": "目标名称：",
             "cat_uncategorized": "未分类",
             "mod_enabled": "已启用",
             "mod_disabled": "已禁用",
@@ -102,11 +213,62 @@ class I18nManager:
             "msg_create_folder_fail_detail": "创建文件夹失败: {}",
             "log_style_format_failed": "样式表格式化失败，缺少占位符: {}",
             "log_move_failed": "移动失败: {} 个项目受影响: {}",
+            "log_move_source_left": "已移动，但有 {} 个源文件无法删除: {}",
             "log_folder_delete_failed": "文件夹删除失败: {} 个项目受影响: {}",
             "log_file_delete_failed": "文件删除失败: {}: {}",
             "log_batch_failed": "批量操作失败: {} 个项目受影响: {}",
             "log_preview_failed": "预览图处理失败: {}",
             "log_preview_exception": "预览图处理异常: {}",
+            "profile_label": "方案:",
+            "btn_profile_save": "保存方案",
+            "btn_profile_switch": "切换方案",
+            "btn_profile_delete": "删除方案",
+            "dialog_profile_title": "保存方案",
+            "dialog_profile_label": "方案名称（保存选中的模组，未选中时保存已启用的模组）:",
+            "profile_switched": "移除 {} 个，部署 {} 个，保留 {} 个 · 节省复制 {}",
+            "btn_import_previews": "导入预览图",
+            "dialog_import_previews_title": "导入预览图",
+            "confirm_import_previews": "{0} 张图片匹配到 {1} 个模组（{2} 张未匹配）。\n是否导入为预览图？已有的预览图将被替换。",
+            "msg_no_preview_matches": "没有图片与模组名称匹配（共检查 {0} 张）。",
+            "progress_import_previews": "正在导入预览图...",
+            "log_previews_imported": "预览图导入完成：成功 {} 个，失败 {} 个",
+            "log_profile_failed": "方案切换失败: {} 个项目受影响: {}",
+            "confirm_resume_title": "未完成的操作",
+            "btn_export_trace": "导出追踪",
+            "btn_reset_trace": "重置",
+            "perf_header_span": "区间",
+            "log_trace_export_failed": "追踪导出失败: {}",
+            "dialog_memory_title": "内存报告",
+            "mem_process": "进程",
+            "mem_images": "图片",
+            "mem_widgets": "控件",
+            "mem_mods": "模组",
+            "mem_indexes": "索引",
+            "mem_tracemalloc": "分配位置 (tracemalloc)",
+            "mem_not_tracing": "未追踪",
+            "mem_no_allocations": "无分配记录",
+            "mem_rss": "常驻内存",
+            "mem_qimage_cache": "原图缓存",
+            "mem_thumb_queue": "缩略图结果队列",
+            "mem_thumb_tasks": "未完成的缩略图任务",
+            "mem_thumbnail_tiers": "缩略图档位",
+            "mem_label_pixmaps": "预览图像素图",
+            "mem_live_widgets": "存活控件",
+            "mem_tree_items": "树节点",
+            "mem_item_map": "缩略图标签映射",
+            "mem_pending_imports": "待完成的预览图导入",
+            "mem_mod_table": "模组表",
+            "mem_repo_mod_ids": "仓库模组编号",
+            "mem_selected_ids": "已勾选模组编号",
+            "mem_known_mods": "已知模组",
+            "mem_folder_states": "分类展开状态",
+            "mem_pak_index_cache": "pak 索引缓存",
+            "mem_asset_postings": "资源搜索倒排表",
+            "mem_asset_mod_tokens": "资源搜索模组词表",
+            "mem_asset_blobs": "资源搜索路径缓存",
+            "mem_dir_snapshots": "目录快照",
+            "msg_memory_summary": "进程: {0}  图片: {1}  索引: {2}",
+            "confirm_resume_batch": "上次的批量操作被中断（剩余 {0} / {1} 步）。\n是否继续执行？选择“否”将放弃剩余步骤。",
         }
 
         self.load_language(default_lang)
@@ -115,6 +277,9 @@ class I18nManager:
         self.current_lang = lang_code
         self.translations = self.default_zh if lang_code == "zh_CN" else self.default_en
 
+    def all_translations(self, key):
+        return {d[key] for d in (self.default_zh, self.default_en) if key in d}
+
     def t(self, key, *args):
         fallback = self.default_zh if self.current_lang == "zh_CN" else self.default_en
         text = self.translations.get(key, fallback.get(key, key))
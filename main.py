@@ -6,19 +6,75 @@ main.py
 - Qt 高 DPI 缩放策略设置
 - QApplication 初始化与窗口启动
 - 主窗口 ModManager3 启动与事件循环管理
+- --profile-startup：打印启动各阶段耗时
+- --trace PATH：启用追踪，退出时导出 Chrome Trace JSON (运行中 Ctrl+Shift+P 打开性能面板)
+- --watchdog [MS]：启用事件循环卡顿监测，超过阈值 (默认 500 ms) 时记录主线程调用栈
+- --memory-log [SECONDS]：启动时开始 tracemalloc，并定期 (默认 60 秒) 打印内存报告 (运行中 Ctrl+Shift+M 随时查看)
+- --decode-processes [N]：屏幕外的缩略图改由 N 个子进程解码 (默认 CPU 核心数 - 1)，大量模组首次加载时可用满多核
+- multiprocessing.freeze_support()：打包后的程序启动解码子进程时需要
+- 参数解析与 PyQt6 / 界面的导入都在 main() 中进行，解码子进程 (spawn) 重新导入本模块时不会加载界面
 """
 
+import multiprocessing
 import sys
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
-from UI import ModManager3
+from core.profiling import startup_profiler
+from core.tracing import tracer
+
+def _pop_flag(name, default):
+    """移除 argv 中的 name [数值]；未给出时返回 None，只给出开关时返回 default。"""
+    if name not in sys.argv:
+        return None
+    idx = sys.argv.index(name)
+    has_value = idx + 1 < len(sys.argv) and sys.argv[idx + 1].isdigit()
+    value = int(sys.argv[idx + 1]) if has_value else default
+    del sys.argv[idx:idx + (2 if has_value else 1)]
+    return value
+
 
 def main():
+    # 参数解析与 PyQt6 / 界面的导入都放在 main() 中：解码子进程以 spawn 方式启动时会重新导入本模块，
+    # 不应因此加载整个界面
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        startup_profiler.enable()
+
+    trace_path = None
+    if "--trace" in sys.argv:
+        idx = sys.argv.index("--trace")
+        trace_path = sys.argv[idx + 1] if idx + 1 < len(sys.argv) else "trace.json"
+        del sys.argv[idx:idx + 2]
+        tracer.enable()
+
+    watchdog_ms = _pop_flag("--watchdog", 500) or 0
+    memory_log_s = _pop_flag("--memory-log", 60)
+    if memory_log_s is not None:
+        import tracemalloc
+        tracemalloc.start()
+    decode_processes = _pop_flag("--decode-processes", 0)
+
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    startup_profiler.mark("import PyQt6")
+
+    from UI import ModManager3
+    startup_profiler.mark("import UI")
+
     QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
     app = QApplication(sys.argv)
+    if trace_path:
+        app.aboutToQuit.connect(lambda: tracer.export_chrome_trace(trace_path))
+    startup_profiler.mark("QApplication")
     win = ModManager3()
+    if watchdog_ms:
+        win.start_watchdog(watchdog_ms)
+    if memory_log_s:
+        win.start_memory_log(memory_log_s)
+    if decode_processes is not None:
+        win.start_process_decode(decode_processes)
     win.show()
+    startup_profiler.mark("window.show")
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
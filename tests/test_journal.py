@@ -0,0 +1,98 @@
+"""
+test_journal.py
+
+包含：
+- 批量部署在中途被杀 (留下 .part 临时文件) 后，通过日志恢复的测试
+
+说明：
+- 用 KeyboardInterrupt 模拟进程被杀：run_steps 只捕获 OSError，中断会直接穿出，日志不会被删除
+"""
+
+import os
+
+import pytest
+
+import core.journal as journal_module
+from core.journal import BatchJournal, pending_step_count, plan_batch_steps, resume_journal, run_journaled
+from core.mod_manager import PART_SUFFIX, deploy_copy
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    repo = tmp_path / "repo"
+    game = tmp_path / "game"
+    (repo / "Category").mkdir(parents=True)
+    game.mkdir()
+    mods = []
+    for i in range(4):
+        rel = "Category" if i % 2 else ""
+        pak = f"mod_{i}_P.pak"
+        (repo / rel / pak).write_bytes(bytes([i]) * (1000 + i))
+        mods.append((rel, pak))
+    return str(repo), str(game), mods
+
+
+def test_resume_after_kill_with_leftover_part(dirs, tmp_path, monkeypatch):
+    repo, game, mods = dirs
+    journal = BatchJournal(str(tmp_path / "batch.journal"))
+    steps = plan_batch_steps(repo, mods, True)
+    calls = []
+
+    def killed_copy(src, target):
+        calls.append(target)
+        if len(calls) == 3:
+            # 第三个模组写到一半时进程被杀
+            with open(target + PART_SUFFIX, "wb") as f:
+                f.write(b"\x00" * 10)
+            raise KeyboardInterrupt
+        deploy_copy(src, target)
+
+    monkeypatch.setattr(journal_module, "deploy_copy", killed_copy)
+    with pytest.raises(KeyboardInterrupt):
+        run_journaled(journal, game, steps)
+    journal.close()
+
+    assert journal.exists()
+    assert pending_step_count(journal) == (2, 4)
+    part = os.path.join(game, mods[2][1]) + PART_SUFFIX
+    assert os.path.exists(part)
+    assert not os.path.exists(os.path.join(game, mods[2][1]))
+
+    monkeypatch.setattr(journal_module, "deploy_copy", deploy_copy)
+    completed, failed = resume_journal(journal)
+
+    assert failed == []
+    assert [s["pak"] for s in completed] == [mods[2][1], mods[3][1]]
+    assert not os.path.exists(part)
+    assert not journal.exists()
+    for rel, pak in mods:
+        with open(os.path.join(repo, rel, pak), "rb") as a, open(os.path.join(game, pak), "rb") as b:
+            assert a.read() == b.read()
+    assert sorted(os.listdir(game)) == sorted(pak for _, pak in mods)
+
+
+def test_resume_skips_step_finished_before_it_was_logged(dirs, tmp_path, monkeypatch):
+    repo, game, mods = dirs
+    journal = BatchJournal(str(tmp_path / "batch.journal"))
+    steps = plan_batch_steps(repo, mods, True)
+
+    def killed_after_copy(src, target):
+        deploy_copy(src, target)
+        if target.endswith(mods[1][1]):
+            # 复制完成但还没来得及写入日志
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(journal_module, "deploy_copy", killed_after_copy)
+    with pytest.raises(KeyboardInterrupt):
+        run_journaled(journal, game, steps)
+    journal.close()
+    assert pending_step_count(journal) == (3, 4)
+
+    copied = []
+    monkeypatch.setattr(journal_module, "deploy_copy", lambda src, target: copied.append(target) or deploy_copy(src, target))
+    completed, failed = resume_journal(journal)
+
+    assert failed == []
+    assert [os.path.basename(t) for t in copied] == [mods[2][1], mods[3][1]]
+    assert len(completed) == 2
+    assert not journal.exists()
@@ -0,0 +1,91 @@
+"""
+test_pak_index.py
+
+包含：
+- read_pak_index / _find_footer 针对旧格式、版本 11、索引加密与截断 pak 的测试
+
+说明：
+- pak 由 benchmarks.synthetic_repo.write_pak 生成，不依赖真实游戏文件
+"""
+
+import os
+import struct
+
+import pytest
+
+from benchmarks.synthetic_repo import write_pak
+from core.pak_index import PAK_MAGIC, PakIndexError, _find_footer, read_pak_index
+
+ASSETS = ["Content/Mods/A/Asset_0.uasset", "Content/Mods/A/Asset_1.uasset", "Content/Root.uasset"]
+PAYLOAD = bytes(range(256)) * 8
+
+
+def _pak(tmp_path, name="mod_P.pak", **kwargs):
+    path = str(tmp_path / name)
+    write_pak(path, "../../../Game/", ASSETS, PAYLOAD, **kwargs)
+    return path
+
+
+@pytest.mark.parametrize("version", [3, 8])
+def test_legacy_version_lists_assets(tmp_path, version):
+    index = read_pak_index(_pak(tmp_path, version=version))
+    assert index.version == version
+    assert index.mount_point == "../../../Game/"
+    assert index.assets == ["Game/" + a for a in ASSETS]
+    assert not index.encrypted
+
+
+def test_v11_reads_full_directory_index(tmp_path):
+    index = read_pak_index(_pak(tmp_path))
+    assert index.version == 11
+    assert sorted(index.assets) == sorted("Game/" + a for a in ASSETS)
+    assert not index.encrypted
+
+
+def test_find_footer_locates_index(tmp_path):
+    path = _pak(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        version, index_offset, index_size, encrypted = _find_footer(f, size)
+    assert version == 11
+    assert len(PAYLOAD) < index_offset < index_offset + index_size <= size
+    assert not encrypted
+
+
+def test_encrypted_index_returns_no_assets(tmp_path):
+    index = read_pak_index(_pak(tmp_path, encrypted=True))
+    assert index.encrypted
+    assert index.assets == []
+
+
+def test_truncated_footer_raises(tmp_path):
+    path = _pak(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 200)
+    with pytest.raises(PakIndexError, match="footer not found"):
+        read_pak_index(path)
+
+
+def test_truncated_index_raises(tmp_path):
+    path = _pak(tmp_path, version=8)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        _, index_offset, index_size, _ = _find_footer(f, size)
+    # 尾部记录的索引长度截短到只剩挂载点与条目数，读取条目时越界
+    footer = struct.pack("<Iiqq", PAK_MAGIC, 8, index_offset, index_size)
+    short = struct.pack("<Iiqq", PAK_MAGIC, 8, index_offset, 4 + len("../../../Game/") + 1 + 4 + 10)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.count(footer) == 1
+    with open(path, "wb") as f:
+        f.write(data.replace(footer, short))
+    with pytest.raises(PakIndexError, match="index truncated"):
+        read_pak_index(path)
+
+
+def test_tiny_file_raises(tmp_path):
+    path = tmp_path / "tiny_P.pak"
+    path.write_bytes(b"\x00" * 10)
+    with pytest.raises(PakIndexError, match="too small"):
+        read_pak_index(str(path))